@@ -12,7 +12,7 @@ class BaseDbDataGen(ABC):
         self.logger = Logger.get_instance()
 
     @abstractmethod
-    def get_data(self):
+    def get_data(self, num):
         pass
 
     @abstractmethod
@@ -24,7 +24,7 @@ class BaseDbDataGen(ABC):
         pass
 
     @abstractmethod
-    def create_user(self, j_son, user_role):
+    def create_user(self, user_json, user_role):
         pass
 
     @abstractmethod
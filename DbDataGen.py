@@ -8,11 +8,11 @@ from tables.Administrator import Administrator
 from tables.Airline_Company import Airline_Company
 from datetime import timedelta
 import random
-import httpx
 import json
 import trio
 from faker import Faker
 from BaseDbDataGen import BaseDbDataGen
+from UserSource import RandomUserApiSource
 
 
 class DbDataGen(BaseDbDataGen):
@@ -24,9 +24,9 @@ class DbDataGen(BaseDbDataGen):
     max_hours_delta_t = 15
     remaining_tickets_per_flight = 200
 
-    def __init__(self):
+    def __init__(self, user_source=None):
         super().__init__()
-        self.url = 'https://randomuser.me/api/?nat=us'
+        self.user_source = user_source or RandomUserApiSource()  # e.g. a FileUserSource works without network
         self.fake = Faker()
 
     @staticmethod
@@ -37,97 +37,123 @@ class DbDataGen(BaseDbDataGen):
         return ccn
 
     @staticmethod
-    def get_user_data(j_son):
-        username = j_son['results'][0]['login']['username']
-        pw = j_son['results'][0]['login']['password']
-        email = j_son['results'][0]['email']
+    def get_user_data(user_json):
+        username = user_json['login']['username']
+        pw = user_json['login']['password']
+        email = user_json['email']
 
         return username, pw, email
 
     @staticmethod
-    def get_customer_data(j_son):
-        first_name = j_son['results'][0]['name']['first'],
-        last_name = j_son['results'][0]['name']['last'],
-        address = str(j_son['results'][0]['location']['street']['number']) + " " + \
-                      j_son['results'][0]['location']['street']['name'] + j_son['results'][0]['location']['state'] + \
-                      j_son['results'][0]['location']['country']
-        phone_no = j_son['results'][0]['phone']
+    def get_customer_data(user_json):
+        first_name = user_json['name']['first']
+        last_name = user_json['name']['last']
+        address = str(user_json['location']['street']['number']) + " " + \
+                      user_json['location']['street']['name'] + user_json['location']['state'] + \
+                      user_json['location']['country']
+        phone_no = user_json['phone']
 
         return first_name, last_name, address, phone_no
 
-    async def get_data(self):
-        async with httpx.AsyncClient() as client:
-            r = await client.get(self.url)
-            return r.json()
+    def get_data(self, num):  # num users of the user source, the unique columns are made unique in the batch
+        users = trio.run(self.user_source.fetch, num)
+        seen = set()
+        unique_users = []
+        for i, user_json in enumerate(users):
+            username, pw, email = self.get_user_data(user_json)
+            if username in seen or email in seen or user_json['phone'] in seen:  # the api repeats some of them
+                user_json = dict(user_json, login=dict(user_json['login'], username=f'{username}_{i}'),
+                                 email=f'{i}_{email}', phone=f'{user_json["phone"]} #{i}')
+            seen.update((user_json['login']['username'], user_json['email'], user_json['phone']))
+            unique_users.append(user_json)
+        return unique_users
 
     def generate_countries(self):
-        countries_ls = []
         with open(r"countries.json") as f:
             countries = json.load(f)
-        for country in countries:
-            countries_ls.append(Country(name=country['name']))
-        self.repo.add_all(countries_ls)
-        self.number_of_countries_in_db = len(countries_ls)
+        self.number_of_countries_in_db = len(self.repo.bulk_load(Country, [(country['name'],) for country in countries]))
+        return self.number_of_countries_in_db
 
     def generate_user_roles(self):
-        self.repo.add(User_Role(role_name='Customer'))
-        self.repo.add(User_Role(role_name='Airline Company'))
-        self.repo.add(User_Role(role_name='Administrator'))
+        return len(self.repo.bulk_load(User_Role, [('Customer',), ('Airline Company',), ('Administrator',)]))
 
-    def create_user(self, j_son, user_role):
-        username, pw, email = self.get_user_data(j_son)
-        inserted_user = User(username=username, password=pw, email=email, user_role=user_role)
-        self.repo.add(inserted_user)
-        return inserted_user
+    def create_user(self, user_json, user_role):  # not committed yet, the caller adds it
+        username, pw, email = self.get_user_data(user_json)
+        return User(username=username, password=pw, email=email, user_role=user_role)
 
     def generate_admin(self):
-        data = trio.run(self.get_data)
-        user = self.create_user(data, self.admin_role)
-        self.repo.add(Administrator(first_name='Admin', last_name='istrator', user_id=user.id))
+        user = self.create_user(self.get_data(1)[0], self.admin_role)
+        with self.repo.transaction():
+            self.repo.add(user)
+            self.repo.add(Administrator(first_name='Admin', last_name='istrator', user_id=user.id))
+        return 2  # the user and the administrator
+
+    def load_users(self, users_json, user_role):  # returns the ids of the users, in order
+        return self.repo.bulk_load(User, ((*self.get_user_data(user_json), user_role) for user_json in users_json),
+                                   ['username', 'password', 'email', 'user_role'])
 
     def generate_customers(self, num):
-        for i in range(num):
-            data = trio.run(self.get_data)
-            user = self.create_user(data, self.customer_role)
-            first_name, last_name, address, phone_no = self.get_customer_data(data)
-            new_customer = Customer(first_name=first_name,
-                                    last_name=last_name,
-                                    address=address, phone_no=phone_no,
-                                    credit_card_no=self.generate_credit_card_num(), user_id=user.id)
-            self.repo.add(new_customer)
+        users_json = self.get_data(num)  # all the users at once, in concurrent batches
+        with self.repo.transaction():  # the users first, their ids are the user_id of the customers
+            user_ids = self.load_users(users_json, self.customer_role)
+            self.repo.bulk_load(Customer, ((*self.get_customer_data(user_json), self.generate_credit_card_num(), user_id)
+                                           for user_json, user_id in zip(users_json, user_ids)),
+                                ['first_name', 'last_name', 'address', 'phone_no', 'credit_card_no', 'user_id'])
+        return 2 * len(user_ids)  # the users and the customers
 
     def generate_airline_companies(self, num):
         if num > 150:  # cant be more than 150 airline_companies
-            return
+            return 0
         with open(r"airline_companies.json") as f:
             airlines = json.load(f)
-        for i in range(num):
-            data = trio.run(self.get_data)
-            user = self.create_user(data, self.airline_role)
-            new_airline = Airline_Company(name=airlines[i]["name"],
-                                          country_id=random.randint(1, self.number_of_countries_in_db),
-                                          user_id=user.id)
-            self.repo.add(new_airline)
-
-    def generate_flights_per_company(self, num):
-        airlines = self.repo.get_all(Airline_Company)
-        for a in airlines:
+        with self.repo.transaction():
+            user_ids = self.load_users(self.get_data(num), self.airline_role)
+            self.repo.bulk_load(Airline_Company, [(airlines[i]["name"], random.randint(1, self.number_of_countries_in_db), user_id)
+                                                  for i, user_id in enumerate(user_ids)], ['name', 'country_id', 'user_id'])
+        return 2 * len(user_ids)  # the users and the airlines
+
+    def flights_rows(self, airline_ids, num):  # a generator, bulk_load streams the flights without holding them all
+        for airline_company_id in airline_ids:
             for i in range(num):
-                airline_company_id = a.id
                 origin_country_id = random.randint(1, self.number_of_countries_in_db)
                 destination_country_id = random.randint(1, self.number_of_countries_in_db)
                 departure_time = self.fake.date_time_between(start_date='now', end_date='+2y')
                 landing_time = departure_time + timedelta(hours=random.randint(2, self.max_hours_delta_t))  # min delta t is 2 hours
-                remaining_tickets = self.remaining_tickets_per_flight
-                self.repo.add(Flight(airline_company_id=airline_company_id, origin_country_id=origin_country_id,
-                                     destination_country_id=destination_country_id, departure_time=departure_time,
-                                     landing_time=landing_time, remaining_tickets=remaining_tickets))
+                yield (airline_company_id, origin_country_id, destination_country_id, departure_time, landing_time,
+                       self.remaining_tickets_per_flight)
+
+    def generate_flights_per_company(self, num):
+        airline_ids = [a.id for a in self.repo.get_all(Airline_Company)]
+        return len(self.repo.bulk_load(Flight, self.flights_rows(airline_ids, num),
+                            ['airline_company_id', 'origin_country_id', 'destination_country_id', 'departure_time',
+                             'landing_time', 'remaining_tickets']))
+
+    @staticmethod
+    def tickets_rows(customer_ids, flights_capacity, num, sold):
+        # num tickets of different flights per customer, only of flights with remaining tickets - O(tickets)
+        # available holds the flights that are not sold out, a full flight is swapped with the last one and popped
+        available = [flight_id for flight_id, remaining_tickets in flights_capacity]
+        remaining = dict(flights_capacity)
+        position = {flight_id: i for i, flight_id in enumerate(available)}
+        for customer_id in customer_ids:
+            if not available:
+                return
+            picked = [available[i] for i in random.sample(range(len(available)), min(num, len(available)))]
+            for flight_id in picked:
+                sold[flight_id] = sold.get(flight_id, 0) + 1
+                remaining[flight_id] -= 1
+                if remaining[flight_id] == 0:
+                    i, last = position.pop(flight_id), available.pop()
+                    if last != flight_id:
+                        available[i] = last
+                        position[last] = i
+                yield flight_id, customer_id
 
     def generate_tickets_per_customer(self, num):
-        customers = self.repo.get_all(Customer)
-        flights = self.repo.get_all(Flight)
-        for c in customers:
-            shuffled_flights = random.sample(flights, len(flights))
-            flights_for_tickets = shuffled_flights[0:num]
-            for f in flights_for_tickets:
-                self.repo.add(Ticket(flight_id=f.id, customer_id=c.id))
+        sold = {}  # flight_id -> tickets, filled while bulk_load consumes the generator
+        with self.repo.transaction():  # the tickets and the remaining_tickets of their flights are committed together
+            ticket_ids = self.repo.bulk_load(Ticket, self.tickets_rows(self.repo.get_ids(Customer),
+                                                                       self.repo.get_flights_capacity(), num, sold),
+                                             ['flight_id', 'customer_id'])
+            self.repo.sell_tickets(sold)
+        return len(ticket_ids)
@@ -1,18 +1,36 @@
 from custom_errors.DbGenDataNotValidError import DbGenDataNotValidError
 from DbDataGen import DbDataGen
+from ShardedDataGen import ShardedDataGen
 from RabbitProducerObject import RabbitProducerObject
+from data_access_objects.DbRepoPool import DbRepoPool
+from tables.Generation_Job import Generation_Job
+from configparser import ConfigParser
 import json
+import time
+import uuid
 
 
 class DbDataObject:
 
-    def __init__(self, customers: int, airlines: int, flights_per_airline: int, tickets_per_customer: int):
+    config = ConfigParser()
+    config.read("config.conf")
+    ENGINE = config["data_gen"]["engine"]
+
+    def __init__(self, customers: int, airlines: int, flights_per_airline: int, tickets_per_customer: int, job_id=None,
+                 seed=0, progress=None, engine=None):
+        self.job_id = job_id or str(uuid.uuid4())
+        self.seed = seed
         self.customers = customers
         self.airlines = airlines
         self.flights_per_airline = flights_per_airline
         self.tickets_per_customer = tickets_per_customer
-        self.db_gen = DbDataGen()
-        self.rabbit_producer = RabbitProducerObject('GeneratedData')
+        self.engine = engine or self.ENGINE
+        self.db_gen = DbDataGen() if self.engine == 'api' else None
+        if progress is None:  # the progress messages go to the GeneratedData queue
+            rabbit_producer = RabbitProducerObject('GeneratedData')
+            progress = lambda message: rabbit_producer.publish(json.dumps(message))
+        self.progress = progress
+        self.timings = {}  # stage -> [seconds, rows]
 
     def validate_data(self):
         try:
@@ -27,27 +45,69 @@ class DbDataObject:
         except ValueError:
             raise DbGenDataNotValidError
 
+    def publish_progress(self, message):
+        self.progress({'job_id': self.job_id, **message})
+
+    def cancelled(self):  # a fresh read, cancel() is called by another thread or process
+        with DbRepoPool.get_instance().connection() as repo:
+            return repo.local_session.query(Generation_Job.status).filter(Generation_Job.id == self.job_id).scalar() \
+                == 'cancelled'
+
+    def timed_stage(self, stage, percent, generate, *args):  # one stage of the api engine, generate returns its rows
+        start = time.perf_counter()
+        rows = generate(*args)
+        self.timings[stage] = [time.perf_counter() - start, rows]
+        self.publish_progress({'stage': stage, 'percent': percent})
+
     def generate_data(self):
-        self.db_gen.generate_countries()
-        self.rabbit_producer.publish(json.dumps({'Countries': 10}))
-        self.db_gen.generate_user_roles()
-        self.rabbit_producer.publish(json.dumps({'User Roles': 20}))
-        self.db_gen.generate_admin()
-        self.rabbit_producer.publish(json.dumps({'Admins': 30}))
-        self.db_gen.generate_airline_companies(self.airlines)
-        self.rabbit_producer.publish(json.dumps({'Airlines': 50}))
-        self.db_gen.generate_customers(self.customers)
-        self.rabbit_producer.publish(json.dumps({'Customers': 70}))
-        self.db_gen.generate_flights_per_company(self.flights_per_airline)
-        self.rabbit_producer.publish(json.dumps({'Flights': 90}))
-        self.db_gen.generate_tickets_per_customer(self.tickets_per_customer)
-        self.rabbit_producer.publish(json.dumps({'Tickets': 100}))
+        if self.engine == 'sharded':
+            with DbRepoPool.get_instance().connection() as repo:
+                if not repo.get_by_column_value(Generation_Job, Generation_Job.id, self.job_id):  # else it is resumed
+                    repo.add(Generation_Job(id=self.job_id, params=json.dumps(self.__dict__())))
+            gen = ShardedDataGen(self.job_id, self.airlines, self.customers, self.flights_per_airline,
+                                 self.tickets_per_customer, seed=self.seed)
+            self.timings = gen.timings
+            return gen.generate(self.publish_progress)
+        # the api engine is not checkpointed - the data tables are truncated first, so a job that was stopped and is
+        # redelivered starts again from an empty db (its rows would break the unique constraints). it has no job row,
+        # a cancel adds a cancelled one - checked before every stage, the stage that runs is finished
+        stages = [('Countries', 10, self.db_gen.generate_countries),
+                  ('User Roles', 20, self.db_gen.generate_user_roles),
+                  ('Admins', 30, self.db_gen.generate_admin),
+                  ('Airlines', 50, self.db_gen.generate_airline_companies, self.airlines),
+                  ('Customers', 70, self.db_gen.generate_customers, self.customers),
+                  ('Flights', 90, self.db_gen.generate_flights_per_company, self.flights_per_airline),
+                  ('Tickets', 100, self.db_gen.generate_tickets_per_customer, self.tickets_per_customer)]
+        if self.cancelled():  # a job cancelled in the queue leaves the db as it is
+            return 'cancelled'
+        with DbRepoPool.get_instance().connection() as repo:
+            repo.reset_all_tables_auto_inc(jobs=False)  # the jobs table has the cancels of this and the queued jobs
+        for stage in stages:
+            if self.cancelled():
+                return 'cancelled'
+            self.timed_stage(*stage)
+        return 'done'
+
+    @staticmethod
+    def cancel(job_id):  # the running job stops after its current batches, a job that did not start yet never starts
+        with DbRepoPool.get_instance().connection() as repo:
+            jobs = repo.get_by_column_value(Generation_Job, Generation_Job.id, job_id)
+            if not jobs:  # still in the queue
+                repo.add(Generation_Job(id=job_id, params='{}', status='cancelled'))
+            elif jobs[0].status == 'running':
+                repo.update_by_id(Generation_Job, Generation_Job.id, job_id, {'status': 'cancelled'})
+
+    @staticmethod
+    def unfinished_jobs():  # the jobs a stopped consumer did not finish, to be resumed
+        with DbRepoPool.get_instance().connection() as repo:
+            jobs = repo.get_by_column_value(Generation_Job, Generation_Job.status, 'running')
+            return [DbDataObject(**json.loads(job.params), engine='sharded') for job in jobs]  # only it is resumable
 
     def __str__(self):
-        return f'{{"customers": {self.customers}, "airlines": {self.airlines}, ' \
+        return f'{{"job_id": "{self.job_id}", "customers": {self.customers}, "airlines": {self.airlines}, ' \
                f'"flights_per_airline": {self.flights_per_airline},' \
                f' "tickets_per_customer": {self.tickets_per_customer}}}'
 
     def __dict__(self):
-        return {'customers': self.customers, 'airlines': self.airlines, 'flights_per_airline': self.flights_per_airline,
+        return {'job_id': self.job_id, 'seed': self.seed, 'customers': self.customers, 'airlines': self.airlines, 'flights_per_airline': self.flights_per_airline,
                 'tickets_per_customer': self.tickets_per_customer}
@@ -63,10 +63,11 @@ class MyApp(App):
 
 
 def callback(ch, method, properties, body):
-    data = json.loads(body)
-    progress_bar_value = list(data.values())[0]
+    data = json.loads(body)  # {'job_id', 'stage', 'percent'} and, of the batches, 'rows_done', 'rows_total', 'eta_s'...
+    progress_bar_value = data['percent']
     kivy_app = get_db_gen()
-    kivy_app.ids.alerts_label.text = f'Generating {list(data.keys())[0]}'
+    kivy_app.ids.alerts_label.text = f'Generating {data["stage"]}' + \
+        (f' - {data["rows_done"]:,} of {data["rows_total"]:,} rows, ETA {data["eta_s"]}s' if data.get('eta_s') else '')
     kivy_app.update_progress_bar(progress_bar_value)  # updating the progress bar
     if progress_bar_value == 100:
         kivy_app.ids.alerts_label.text = 'The data was successfully generated!'
@@ -76,7 +77,7 @@ if __name__ == "__main__":
     repo = DbRepo(local_session)
     repo_thread = Thread(target=repo.reset_all_tables_auto_inc)
     repo_thread.start()
-    rabbit_consumer = RabbitConsumerObject(q_name='GeneratedData', callback=callback)
+    rabbit_consumer = RabbitConsumerObject(q_name='GeneratedData', callback=callback, workers=1)  # in order
     t1 = Thread(target=rabbit_consumer.consume)
     t1.setDaemon(True)
     t1.start()
@@ -1,15 +1,76 @@
+from logger.Logger import Logger
+from configparser import ConfigParser
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import pika
+import time
 
 
 class RabbitConsumerObject:
+    # the I/O thread only receives the messages (and answers heartbeats), the callbacks run on a pool of workers and a
+    # message is acked after its callback returned - a consumer that dies before that leaves it to be redelivered
+    # at most prefetch messages are taken at once, so the pool queue is bounded too
 
-    def __init__(self, q_name, callback):
+    config = ConfigParser()
+    config.read("config.conf")
+    HOST = config["rabbitmq"]["host"]
+    HEARTBEAT = int(config["rabbitmq"]["heartbeat"])
+    PREFETCH = int(config["rabbitmq"]["prefetch"])
+    WORKERS = int(config["rabbitmq"]["workers"])
+    RECONNECT_DELAY = float(config["rabbitmq"]["reconnect_delay"])
+    DURABLE = config["rabbitmq"].getboolean("durable")
+
+    def __init__(self, q_name, callback, prefetch=None, workers=None, requeue_on=()):
         self.q_name = q_name
-        self.callback = callback
-        self.connection = pika.BlockingConnection(pika.ConnectionParameters('localhost'))
+        self.callback = callback  # callback(ch, method, properties, body), on a worker thread
+        self.requeue_on = requeue_on  # exception types of passing failures (e.g. the db is down), their message is requeued
+        self.workers = workers or self.WORKERS
+        self.prefetch = max(prefetch or self.PREFETCH, self.workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f'{q_name} worker')
+        self.logger = Logger.get_instance()
+        self._stopped = False
+        self.connection = None
+        self._connect()
+
+    def _connect(self):
+        self.connection = pika.BlockingConnection(pika.ConnectionParameters(self.HOST, heartbeat=self.HEARTBEAT))
         self.channel = self.connection.channel()
-        self.channel.queue_declare(queue=self.q_name)
+        self.channel.queue_declare(queue=self.q_name, durable=self.DURABLE)
+        self.channel.basic_qos(prefetch_count=self.prefetch)
+        self.channel.basic_consume(queue=self.q_name, on_message_callback=self._on_message)
+
+    def _on_message(self, ch, method, properties, body):  # the I/O thread
+        self.executor.submit(self._work, self.connection, ch, method, properties, body)
+
+    def _work(self, connection, ch, method, properties, body):
+        try:
+            self.callback(ch, method, properties, body)
+            answer = functools.partial(ch.basic_ack, delivery_tag=method.delivery_tag)
+        except Exception as e:  # else not requeued, a message that fails every time would be redelivered forever
+            requeue = isinstance(e, self.requeue_on)
+            self.logger.logger.error(f'A message of {self.q_name} failed and was {"requeued" if requeue else "dropped"}: {e}')
+            answer = functools.partial(ch.basic_nack, delivery_tag=method.delivery_tag, requeue=requeue)
+        try:
+            connection.add_callback_threadsafe(answer)  # a channel is used only by its I/O thread
+        except pika.exceptions.AMQPError:  # the connection was lost meanwhile, the broker redelivers the message
+            self.logger.logger.warning(f'A message of {self.q_name} could not be acked, it will be redelivered.')
+
+    def consume(self):  # blocks until stop(), reconnects when the connection is lost
+        while not self._stopped:
+            try:
+                if self.connection is None or self.connection.is_closed:
+                    self._connect()
+                self.channel.start_consuming()
+            except (pika.exceptions.AMQPConnectionError, pika.exceptions.AMQPChannelError) as e:
+                self.logger.logger.warning(f'The consumer of {self.q_name} lost its connection ({e}), reconnecting.')
+                self.connection = None
+                time.sleep(self.RECONNECT_DELAY)
+        self.executor.shutdown(wait=True)
+        if self.connection is not None and self.connection.is_open:
+            self.connection.process_data_events(time_limit=0)  # the acks of the last callbacks
+            self.connection.close()
 
-    def consume(self):
-        self.channel.basic_consume(queue=self.q_name, on_message_callback=self.callback, auto_ack=True)
-        self.channel.start_consuming()
+    def stop(self):  # from any thread - the callbacks that were started still finish and are acked
+        self._stopped = True
+        if self.connection is not None:
+            self.connection.add_callback_threadsafe(self.channel.stop_consuming)
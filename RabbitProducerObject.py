@@ -1,15 +1,72 @@
+from logger.Logger import Logger
+from configparser import ConfigParser
 import pika
+import time
 
 
-class RabbitProducerObject:
+class RabbitProducerObject:  # one connection and channel kept open, the publishes that fail are retried after a reconnect
 
-    def __init__(self, q_name):
+    config = ConfigParser()
+    config.read("config.conf")
+    HOST = config["rabbitmq"]["host"]
+    HEARTBEAT = int(config["rabbitmq"]["heartbeat"])
+    BATCH_SIZE = int(config["rabbitmq"]["publish_batch_size"])
+    CONFIRM = config["rabbitmq"].getboolean("confirm")
+    RECONNECT_DELAY = float(config["rabbitmq"]["reconnect_delay"])
+    DURABLE = config["rabbitmq"].getboolean("durable")
+    RETRIES = 3
+
+    def __init__(self, q_name, confirm=None, batch_size=None):
         self.q_name = q_name
-        self.connection = pika.BlockingConnection(pika.ConnectionParameters('localhost'))
+        self.confirm = self.CONFIRM if confirm is None else confirm
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.properties = pika.BasicProperties(delivery_mode=2) if self.DURABLE else None  # persistent
+        self.logger = Logger.get_instance()
+        self.connection = None
+        self._connect()
+
+    def _connect(self):
+        self.connection = pika.BlockingConnection(pika.ConnectionParameters(self.HOST, heartbeat=self.HEARTBEAT))
         self.channel = self.connection.channel()
-        self.channel.queue_declare(queue=self.q_name)
+        self.channel.queue_declare(queue=self.q_name, durable=self.DURABLE)
+        if self.confirm:
+            # a transaction commits a whole batch in one round trip, and an interrupted batch is dropped by the broker,
+            # so it is sent again whole after a reconnect - never half of it twice
+            self.channel.tx_select()
+
+    def _publish_batch(self, bodies):
+        for attempt in range(1, self.RETRIES + 1):
+            try:
+                if self.connection is None or self.connection.is_closed:
+                    self._connect()
+                for body in bodies:
+                    self.channel.basic_publish(exchange='', routing_key=self.q_name, body=body, properties=self.properties)
+                if self.confirm:
+                    self.channel.tx_commit()
+                return
+            except (pika.exceptions.AMQPConnectionError, pika.exceptions.AMQPChannelError) as e:
+                if attempt == self.RETRIES:
+                    self.logger.logger.error(f'Publishing to {self.q_name} failed {attempt} times: {e}')
+                    raise
+                self.logger.logger.warning(f'Publishing to {self.q_name} failed ({e}), reconnecting.')
+                self._close()
+                time.sleep(self.RECONNECT_DELAY)
 
     def publish(self, data):
-        self.channel.basic_publish(exchange='',
-                                   routing_key=self.q_name,
-                                   body=data)
+        self._publish_batch([data])
+
+    def publish_many(self, bodies):  # batch_size messages per round trip
+        bodies = list(bodies)
+        for start in range(0, len(bodies), self.batch_size):
+            self._publish_batch(bodies[start:start + self.batch_size])
+
+    def _close(self):
+        try:
+            if self.connection is not None and self.connection.is_open:
+                self.connection.close()
+        except pika.exceptions.AMQPError:
+            pass
+        self.connection = None
+
+    def close(self):
+        self._close()
@@ -0,0 +1,222 @@
+from data_access_objects.DbRepoPool import DbRepoPool
+from db_config import reinit_engine
+from VectorDataGen import VectorDataGen
+from DbDataGen import DbDataGen
+from tables.Country import Country
+from tables.User_Role import User_Role
+from tables.User import User
+from tables.Administrator import Administrator
+from tables.Airline_Company import Airline_Company
+from tables.Customer import Customer
+from tables.Flight import Flight
+from tables.Ticket import Ticket
+from tables.Generation_Job import Generation_Job
+from tables.Generation_Job_Batch import Generation_Job_Batch
+from logger.Logger import Logger
+from configparser import ConfigParser
+from collections import Counter
+from datetime import datetime
+import multiprocessing
+import numpy as np
+import json
+import math
+import os
+import time
+
+
+class ShardedDataGen:  # the DbDataObject pipeline split into batches, generated and loaded by a pool of processes
+    # a job - its plan (the batches and their reserved ids) is saved with the reference data, and every batch commits
+    # its checkpoint with its rows, so a job run again with the same id only generates the batches that are missing
+
+    config = ConfigParser()
+    config.read("config.conf")
+    PROCESSES = int(config["data_gen"]["processes"]) or os.cpu_count()
+    BATCH_ROWS = int(config["data_gen"]["batch_rows"])
+
+    def __init__(self, job_id, airlines, customers, flights_per_airline, tickets_per_customer, processes=None, seed=0,
+                 batch_rows=None):
+        self.job_id = job_id
+        self.airlines = airlines
+        self.customers = customers
+        self.flights_per_airline = flights_per_airline
+        self.tickets_per_customer = tickets_per_customer
+        self.processes = processes or self.PROCESSES
+        self.seed = seed
+        self.batch_rows = batch_rows or self.BATCH_ROWS
+        self.timings = {}  # stage -> [seconds, rows] of this run, the stages of a phase run at the same time
+        self.repool = DbRepoPool.get_instance()
+        self.logger = Logger.get_instance()
+
+    def timed(self, stage, start, rows):
+        self.timings.setdefault(stage, [0.0, 0])
+        self.timings[stage][0] = time.perf_counter() - start
+        self.timings[stage][1] += rows
+
+    @staticmethod
+    def init_worker():  # a spawned process - its own engine and a DbRepoPool of one repo
+        reinit_engine(1)
+        DbRepoPool.get_instance().reinit(1)
+
+    @staticmethod
+    def split(ids, shards):  # ids (a range) in up to shards consecutive, non empty sub ranges
+        bounds = np.linspace(0, len(ids), shards + 1).astype(int).tolist()
+        return [ids[first:last] for first, last in zip(bounds, bounds[1:]) if last > first]
+
+    @staticmethod
+    def ids(reserved, first, last):  # the json friendly [start, stop) of a slice of reserved ids
+        return [reserved[first:last].start, reserved[first:last].stop]
+
+    @staticmethod
+    def load(batch, tables, sold=None):  # {table class: columns} with their explicit ids and the checkpoint, in one transaction
+        rows = sum(len(columns['id']) for columns in tables.values())
+        with DbRepoPool.get_instance().connection() as repo:
+            with repo.transaction():
+                repo.add(Generation_Job_Batch(job_id=batch['job_id'], key=batch['key'], rows=rows,
+                                              sold=None if sold is None else json.dumps(sold)))
+                for table_class, columns in tables.items():
+                    repo.bulk_load(table_class, VectorDataGen.rows(columns), list(columns))
+        return batch['key'], rows
+
+    @staticmethod
+    def airlines_batch(batch):  # airline users, airlines and all their flights
+        gen = VectorDataGen(batch['seed'], datetime.fromisoformat(batch['start']))
+        user_ids = range(*batch['user_ids'])
+        users = gen.users(user_ids.start, len(user_ids), DbDataGen.airline_role, 'airline')
+        airlines = gen.airlines(batch['airline_ids'][0], users['id'], batch['names'], batch['countries_num'])
+        flights = gen.flights(batch['flight_ids'][0], airlines['id'], batch['flights_per_airline'], batch['countries_num'])
+        return ShardedDataGen.load(batch, {User: users, Airline_Company: airlines, Flight: flights})
+
+    @staticmethod
+    def customers_batch(batch):  # customer users and customers
+        gen = VectorDataGen(batch['seed'], datetime.fromisoformat(batch['start']))
+        user_ids = range(*batch['user_ids'])
+        users = gen.users(user_ids.start, len(user_ids), DbDataGen.customer_role, 'customer')
+        customers = gen.customers(batch['customer_ids'][0], users['id'])
+        return ShardedDataGen.load(batch, {User: users, Customer: customers})
+
+    @staticmethod
+    def tickets_batch(batch):  # the tickets of a customers range, within the batch share of every flight capacity
+        gen = VectorDataGen(batch['seed'], datetime.fromisoformat(batch['start']))
+        flights = {'id': np.arange(*batch['flight_ids']),
+                   'remaining_tickets': np.full(len(range(*batch['flight_ids'])), batch['capacity'])}
+        tickets = gen.tickets(batch['ticket_ids'][0], np.arange(*batch['customer_ids']), flights,
+                              batch['tickets_per_customer'])
+        sold = batch['capacity'] - flights['remaining_tickets']
+        return ShardedDataGen.load(batch, {Ticket: tickets},
+                                   dict(zip(flights['id'][sold > 0].tolist(), sold[sold > 0].tolist())))
+
+    @staticmethod
+    def run_batch(batch):
+        return getattr(ShardedDataGen, f'{batch["kind"]}_batch')(batch)
+
+    def reference_data(self, repo):  # the small tables, loaded by this process
+        with open(r"countries.json") as f:
+            countries = json.load(f)
+        countries_num = len(repo.bulk_load(Country, [(country['name'],) for country in countries]))
+        repo.bulk_load(User_Role, [('Customer',), ('Airline Company',), ('Administrator',)])
+        admin_user_ids = repo.bulk_load(User, [('admin', VectorDataGen.PASSWORD, 'admin@generated.test', DbDataGen.admin_role)],
+                                        ['username', 'password', 'email', 'user_role'])
+        repo.bulk_load(Administrator, [('Admin', 'istrator', admin_user_ids[0])], ['first_name', 'last_name', 'user_id'])
+        return countries_num
+
+    def plan(self, repo, countries_num):
+        # every batch gets its own slice of ids reserved here, so the batches insert with explicit ids and never
+        # contend on a sequence. two phases - the tickets reference the customers and flights of the first one
+        with open(r"airline_companies.json") as f:
+            airline_names = [airline['name'] for airline in json.load(f)]
+        start = datetime.now().replace(microsecond=0).isoformat()  # the same for all the batches, and after a resume
+        airline_user_ids = repo.reserve_ids(User, self.airlines)
+        customer_user_ids = repo.reserve_ids(User, self.customers)
+        airline_ids = repo.reserve_ids(Airline_Company, self.airlines)
+        customer_ids = repo.reserve_ids(Customer, self.customers)
+        flight_ids = repo.reserve_ids(Flight, self.airlines * self.flights_per_airline)
+        ticket_ids = repo.reserve_ids(Ticket, self.customers * self.tickets_per_customer)  # the most there can be
+        first_phase = []
+        airlines_batches = max(self.processes, math.ceil(self.airlines * self.flights_per_airline / self.batch_rows))
+        for i, airlines in enumerate(self.split(range(self.airlines), airlines_batches)):
+            first, last = airlines.start * self.flights_per_airline, airlines.stop * self.flights_per_airline
+            first_phase.append({'kind': 'airlines', 'key': f'airlines-{i}', 'seed': [self.seed, 1, i], 'start': start,
+                                'user_ids': self.ids(airline_user_ids, airlines.start, airlines.stop),
+                                'airline_ids': self.ids(airline_ids, airlines.start, airlines.stop),
+                                'names': airline_names[airlines.start:airlines.stop], 'countries_num': countries_num,
+                                'flight_ids': self.ids(flight_ids, first, last),
+                                'flights_per_airline': self.flights_per_airline})
+        customers_batches = max(self.processes, math.ceil(self.customers / self.batch_rows))
+        for i, customers in enumerate(self.split(range(self.customers), customers_batches)):
+            first_phase.append({'kind': 'customers', 'key': f'customers-{i}', 'seed': [self.seed, 2, i], 'start': start,
+                                'user_ids': self.ids(customer_user_ids, customers.start, customers.stop),
+                                'customer_ids': self.ids(customer_ids, customers.start, customers.stop)})
+        second_phase = []
+        # the seats of every flight are divided between the tickets batches, so no flight is overbooked by 2 of them
+        tickets_shards = self.split(range(self.customers), min(customers_batches, DbDataGen.remaining_tickets_per_flight))
+        for i, customers in enumerate(tickets_shards):
+            capacity = DbDataGen.remaining_tickets_per_flight // len(tickets_shards) + \
+                (i < DbDataGen.remaining_tickets_per_flight % len(tickets_shards))
+            first, last = customers.start * self.tickets_per_customer, customers.stop * self.tickets_per_customer
+            second_phase.append({'kind': 'tickets', 'key': f'tickets-{i}', 'seed': [self.seed, 3, i], 'start': start,
+                                 'customer_ids': self.ids(customer_ids, customers.start, customers.stop),
+                                 'flight_ids': [flight_ids.start, flight_ids.stop],
+                                 'ticket_ids': self.ids(ticket_ids, first, last), 'capacity': capacity,
+                                 'tickets_per_customer': self.tickets_per_customer})
+        for batch in first_phase + second_phase:
+            batch['job_id'] = self.job_id
+        return {'first_phase': first_phase, 'second_phase': second_phase}
+
+    def load_plan(self, repo):  # the saved plan, or a new one saved in the transaction of the reference data
+        job = repo.get_by_column_value(Generation_Job, Generation_Job.id, self.job_id)[0]
+        if job.plan:
+            return json.loads(job.plan)
+        start = time.perf_counter()
+        with repo.transaction():
+            countries_num = self.reference_data(repo)
+            plan = self.plan(repo, countries_num)
+            repo.update_by_id(Generation_Job, Generation_Job.id, self.job_id, {'plan': json.dumps(plan)})
+        self.timed('Reference Data', start, countries_num + 5)  # + the 3 user roles, the admin and its user
+        return plan
+
+    def status(self, repo):  # a fresh read, cancel is written by another process
+        return repo.local_session.query(Generation_Job.status).filter(Generation_Job.id == self.job_id).scalar()
+
+    def generate(self, progress=None):
+        # progress(message) is called after every batch with the stage, rows done and total, rows/sec and ETA
+        # returns the status of the job - done, or cancelled when it was cancelled before it was done
+        with self.repool.connection() as repo:
+            if self.status(repo) != 'running':  # cancelled or done already
+                return self.status(repo)
+            plan = self.load_plan(repo)
+            done = {batch.key: batch.rows for batch in
+                    repo.get_by_column_value(Generation_Job_Batch, Generation_Job_Batch.job_id, self.job_id)}
+            rows_total = self.airlines * (2 + self.flights_per_airline) + \
+                self.customers * (2 + self.tickets_per_customer) + 1  # the most, as if no flight was sold out
+            rows_done = sum(done.values())
+            start_rows, start_time = rows_done, time.perf_counter()
+            with multiprocessing.get_context('spawn').Pool(self.processes, initializer=self.init_worker) as pool:
+                for phase in ('first_phase', 'second_phase'):
+                    pending = [batch for batch in plan[phase] if batch['key'] not in done]
+                    phase_start = time.perf_counter()
+                    for key, rows in pool.imap_unordered(self.run_batch, pending):
+                        rows_done += rows
+                        self.timed(key.split('-')[0].capitalize(), phase_start, rows)
+                        if progress:
+                            rate = (rows_done - start_rows) / (time.perf_counter() - start_time)
+                            progress({'stage': key.split('-')[0].capitalize(), 'batch': key, 'rows_done': rows_done,
+                                      'rows_total': rows_total, 'rows_per_sec': round(rate),
+                                      'eta_s': round((rows_total - rows_done) / rate, 1) if rate else None,
+                                      'percent': min(99, int(100 * rows_done / rows_total))})
+                        if self.status(repo) != 'running':  # the running batches are killed, their transactions roll back
+                            pool.terminate()
+                            self.logger.logger.info(f'Generation job {self.job_id} was cancelled after {rows_done} rows.')
+                            return self.status(repo)
+            start = time.perf_counter()
+            with repo.transaction():  # the sold tickets of all the batches, in one set based UPDATE, then the job is done
+                sold = Counter()
+                for batch in repo.get_by_column_value(Generation_Job_Batch, Generation_Job_Batch.job_id, self.job_id):
+                    if batch.sold:
+                        sold.update({int(flight_id): tickets for flight_id, tickets in json.loads(batch.sold).items()})
+                repo.sell_tickets(dict(sold))
+                repo.update_by_id(Generation_Job, Generation_Job.id, self.job_id, {'status': 'done'})
+            self.timed('Remaining Tickets', start, len(sold))
+        if progress:
+            progress({'stage': 'Done', 'rows_done': rows_done, 'rows_total': rows_done, 'percent': 100})
+        self.logger.logger.info(f'Generation job {self.job_id} is done, {rows_done} rows.')
+        return 'done'
@@ -0,0 +1,72 @@
+from abc import ABC, abstractmethod
+from configparser import ConfigParser
+from logger.Logger import Logger
+import httpx
+import json
+import trio
+
+
+class UserSource(ABC):  # where DbDataGen gets its users from, in the randomuser.me 'results' item format
+
+    @abstractmethod
+    async def fetch(self, num):  # a list of num user dicts
+        pass
+
+
+class RandomUserApiSource(UserSource):  # users=N batches sent concurrently under one client, failed batches are retried
+
+    config = ConfigParser()
+    config.read("config.conf")
+    URL = config["data_gen"]["randomuser_url"]
+    BATCH_SIZE = int(config["data_gen"]["randomuser_batch_size"])
+    CONCURRENCY = int(config["data_gen"]["randomuser_concurrency"])
+    RETRIES = int(config["data_gen"]["randomuser_retries"])
+
+    def __init__(self, url=None, batch_size=None, concurrency=None, retries=None, backoff=0.5):
+        self.url = url or self.URL  # a local stub server can stand in for randomuser.me
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.concurrency = concurrency or self.CONCURRENCY
+        self.retries = retries or self.RETRIES
+        self.backoff = backoff  # seconds before the first retry, doubled for every next one
+        self.logger = Logger.get_instance()
+
+    async def _fetch_batch(self, client, limiter, num, results, i):
+        async with limiter:
+            for attempt in range(1, self.retries + 1):
+                try:
+                    response = await client.get(f'{self.url}{"&" if "?" in self.url else "?"}results={num}&page={i + 1}')
+                    response.raise_for_status()
+                    users = response.json()['results']
+                    if len(users) != num:
+                        raise ValueError(f'{len(users)} users were returned instead of {num}')
+                    results[i] = users
+                    return
+                except (httpx.HTTPError, ValueError, KeyError) as e:
+                    if attempt == self.retries:
+                        self.logger.logger.error(f'Fetching {num} users failed {attempt} times: {e}')
+                        raise
+                    self.logger.logger.warning(f'Fetching {num} users failed ({e}), try {attempt} of {self.retries}.')
+                    await trio.sleep(self.backoff * 2 ** (attempt - 1))
+
+    async def fetch(self, num):
+        sizes = [min(self.batch_size, num - start) for start in range(0, num, self.batch_size)]
+        results = [None] * len(sizes)
+        limiter = trio.CapacityLimiter(self.concurrency)
+        async with httpx.AsyncClient(timeout=30) as client:  # one client, its connections are reused by all the batches
+            async with trio.open_nursery() as nursery:
+                for i, size in enumerate(sizes):
+                    nursery.start_soon(self._fetch_batch, client, limiter, size, results, i)
+        return [user for batch in results for user in batch]
+
+
+class FileUserSource(UserSource):  # users from a saved randomuser.me response ({"results": [...]}), reused in a cycle
+
+    def __init__(self, path):
+        with open(path) as f:
+            self.users = json.load(f)['results']
+        self._next = 0
+
+    async def fetch(self, num):
+        users = [self.users[(self._next + i) % len(self.users)] for i in range(num)]
+        self._next = (self._next + num) % len(self.users)
+        return users
@@ -0,0 +1,145 @@
+from tables.Country import Country
+from tables.User_Role import User_Role
+from tables.User import User
+from tables.Administrator import Administrator
+from tables.Airline_Company import Airline_Company
+from tables.Customer import Customer
+from tables.Flight import Flight
+from tables.Ticket import Ticket
+from DbDataGen import DbDataGen
+from logger.Logger import Logger
+from datetime import datetime
+import numpy as np
+import json
+
+FIRST_NAMES = np.array(['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William',
+                        'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah',
+                        'Charles', 'Karen', 'Daniel', 'Nancy', 'Matthew', 'Lisa', 'Anthony', 'Betty', 'Mark', 'Sandra'])
+LAST_NAMES = np.array(['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+                       'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore',
+                       'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark'])
+STREETS = np.array(['Main St', 'Oak St', 'Pine St', 'Maple Ave', 'Cedar St', 'Elm St', 'Washington Ave', 'Lake St',
+                    'Hill St', 'Park Ave', 'Sunset Blvd', 'Ridge Rd'])
+
+SECONDS_IN_2_YEARS = 2 * 365 * 24 * 3600
+
+
+class VectorDataGen:  # offline, seeded generation of DbDataGen shaped data as numpy column arrays
+
+    PASSWORD = 'generated'
+
+    def __init__(self, seed=0, start=None):
+        self.rng = np.random.default_rng(seed)  # the same seed (and start) generates the same data
+        self.start = np.datetime64(start or datetime.now().replace(microsecond=0), 's')
+        self.logger = Logger.get_instance()
+
+    @staticmethod
+    def _with_ids(ids, prefix, width=0):  # prefix + the zero padded id, unique because the ids are
+        return np.char.add(prefix, np.char.zfill(ids.astype(str), width))
+
+    def users(self, first_id, num, user_role, prefix):
+        ids = np.arange(first_id, first_id + num, dtype=np.int64)
+        usernames = self._with_ids(ids, f'{prefix}_')
+        return {'id': ids, 'username': usernames, 'password': np.full(num, self.PASSWORD),
+                'email': np.char.add(usernames, '@generated.test'), 'user_role': np.full(num, user_role)}
+
+    def customers(self, first_id, user_ids):
+        num = len(user_ids)
+        ids = np.arange(first_id, first_id + num, dtype=np.int64)
+        address = np.char.add(np.char.add(self.rng.integers(1, 10000, num).astype(str), ' '),
+                              self.rng.choice(STREETS, num))
+        return {'id': ids, 'first_name': self.rng.choice(FIRST_NAMES, num), 'last_name': self.rng.choice(LAST_NAMES, num),
+                'address': address, 'phone_no': self._with_ids(ids, '05', 8), 'credit_card_no': self._with_ids(ids, '', 12),
+                'user_id': user_ids}
+
+    def airlines(self, first_id, user_ids, names, countries_num):
+        num = len(user_ids)
+        if num > len(names):  # the names are unique, rows() would zip the columns down to the shortest one
+            raise ValueError(f'{num} airlines but only {len(names)} airline names')
+        return {'id': np.arange(first_id, first_id + num, dtype=np.int64), 'name': np.array(names[:num]),
+                'country_id': self.rng.integers(1, countries_num + 1, num), 'user_id': user_ids}
+
+    def flights(self, first_id, airline_ids, flights_per_airline, countries_num):
+        # departure in the next 2 years, 2 to max_hours_delta_t hours of flight - like DbDataGen.generate_flights_per_company
+        num = len(airline_ids) * flights_per_airline
+        departure_time = self.start + self.rng.integers(0, SECONDS_IN_2_YEARS, num).astype('timedelta64[s]')
+        hours = self.rng.integers(2, DbDataGen.max_hours_delta_t + 1, num).astype('timedelta64[h]')
+        return {'id': np.arange(first_id, first_id + num, dtype=np.int64),
+                'airline_company_id': np.repeat(airline_ids, flights_per_airline),
+                'origin_country_id': self.rng.integers(1, countries_num + 1, num),
+                'destination_country_id': self.rng.integers(1, countries_num + 1, num),
+                'departure_time': departure_time, 'landing_time': departure_time + hours,
+                'remaining_tickets': np.full(num, DbDataGen.remaining_tickets_per_flight)}
+
+    def _distinct_picks(self, rows, num, k):  # rows x k indexes of range(num), different within every row
+        picks = self.rng.integers(0, num, (rows, k))
+        if k * k <= num:  # a row repeats an index with probability < 1/2, so the rows that do are redrawn
+            redraw = np.arange(rows)
+            for _ in range(16):
+                sorted_picks = np.sort(picks[redraw], axis=1)
+                redraw = redraw[(sorted_picks[:, 1:] == sorted_picks[:, :-1]).any(axis=1)]
+                if not len(redraw):
+                    return picks
+                picks[redraw] = self.rng.integers(0, num, (len(redraw), k))
+        else:
+            redraw = np.arange(rows)
+        # the k smallest of a random key per index, a chunk of rows at a time to bound the rows x num keys
+        chunk = max(1, 1000000 // num)
+        for start in range(0, len(redraw), chunk):
+            part = redraw[start:start + chunk]
+            picks[part] = self.rng.random((len(part), num)).argpartition(k - 1, axis=1)[:, :k]
+        return picks
+
+    def tickets(self, first_id, customer_ids, flights, per_customer):
+        # per_customer different flights for every customer, then a flight keeps only as many tickets as it has seats
+        flight_ids = flights['id']
+        per_customer = min(per_customer, len(flight_ids))
+        picks = self._distinct_picks(len(customer_ids), len(flight_ids), per_customer)
+        customer_column = np.repeat(customer_ids, per_customer)
+        flight_index = picks.ravel()
+        order = np.argsort(flight_index, kind='stable')  # the tickets of every flight next to each other
+        sorted_index = flight_index[order]
+        group_start = np.searchsorted(sorted_index, sorted_index, side='left')
+        keep = order[np.arange(len(order)) - group_start < flights['remaining_tickets'][sorted_index]]
+        keep.sort()
+        flights['remaining_tickets'] = flights['remaining_tickets'] - np.bincount(flight_index[keep],
+                                                                                    minlength=len(flight_ids))
+        return {'id': np.arange(first_id, first_id + len(keep), dtype=np.int64),
+                'flight_id': flight_ids[flight_index[keep]], 'customer_id': customer_column[keep]}
+
+    @staticmethod
+    def rows(columns, chunk_size=10000):  # tuples of python values in the order of the columns, converted a chunk at a time
+        arrays = list(columns.values())
+        for start in range(0, len(arrays[0]), chunk_size):
+            yield from zip(*(array[start:start + chunk_size].tolist() for array in arrays))
+
+    def generate(self, repo, airlines, customers, flights_per_airline, tickets_per_customer):
+        # the whole DbDataObject pipeline into an empty db, in one transaction, returns {table name: rows}
+        with open('countries.json') as f:
+            country_names = [country['name'] for country in json.load(f)]
+        with open('airline_companies.json') as f:
+            airline_names = [airline['name'] for airline in json.load(f)]
+        countries_num = len(country_names)
+        counts = {}
+        with repo.transaction():
+            tables = {}
+            tables[Country] = {'id': np.arange(1, countries_num + 1), 'name': np.array(country_names)}
+            tables[User_Role] = {'id': np.array([DbDataGen.customer_role, DbDataGen.airline_role, DbDataGen.admin_role]),
+                                 'role_name': np.array(['Customer', 'Airline Company', 'Administrator'])}
+            admin_users = self.users(1, 1, DbDataGen.admin_role, 'admin')
+            airline_users = self.users(2, airlines, DbDataGen.airline_role, 'airline')
+            customer_users = self.users(2 + airlines, customers, DbDataGen.customer_role, 'customer')
+            tables[User] = {name: np.concatenate((admin_users[name], airline_users[name], customer_users[name]))
+                            for name in admin_users}
+            tables[Administrator] = {'id': np.array([1]), 'first_name': np.array(['Admin']),
+                                     'last_name': np.array(['istrator']), 'user_id': admin_users['id']}
+            tables[Airline_Company] = self.airlines(1, airline_users['id'], airline_names, countries_num)
+            tables[Customer] = self.customers(1, customer_users['id'])
+            tables[Flight] = self.flights(1, tables[Airline_Company]['id'], flights_per_airline, countries_num)
+            tickets = self.tickets(1, tables[Customer]['id'], tables[Flight], tickets_per_customer)
+            tables[Ticket] = tickets  # after tickets(), the flights remaining_tickets are already decremented
+            for table_class, columns in tables.items():
+                repo.bulk_load(table_class, self.rows(columns), list(columns))  # COPY with the explicit ids
+                counts[table_class.__tablename__] = len(columns['id'])
+                self.logger.logger.debug(f'{counts[table_class.__tablename__]} rows generated into {table_class.__tablename__}.')
+        return counts
@@ -0,0 +1,90 @@
+from flask_rest_api import app, repool
+from base64 import b64encode
+from datetime import datetime, timedelta
+import argparse
+import sys
+import time
+
+# run from the project root: python -m benchmarks.api_latency_benchmark --requests 200
+# WARNING - the benchmark resets the db in config.conf (reset_test_db) and uses its users
+# measures every route in process (app.test_client, the real db) and fails (exit code 1) if a route p95 is over its budget
+
+CUSTOMER = ('Elad', '123')
+AIRLINE = ('Yoni', '123')
+ADMINISTRATOR = ('Tomer', '123')
+
+# (name, method, url, user, json body or a function of the request number that returns it, p95 budget in ms)
+ROUTES = [
+    ('flights page', 'GET', '/flights?after_id=0&limit=100', None, None, 20),
+    ('departures board', 'GET', '/departures/12', None, None, 10),
+    ('customer tickets', 'GET', '/customer/tickets', CUSTOMER, None, 25),
+    ('update customer', 'PUT', '/customer', CUSTOMER,
+     {'first_name': 'Elad', 'last_name': 'Gunders', 'address': 'Sokolov 11', 'phone_no': '0545557007',
+      'credit_card_no': '0000'}, 40),
+    ('cancel and book ticket', 'DELETE+POST', '/customer/tickets', CUSTOMER, {'flight_id': 1}, 60),
+    ('airline flights', 'GET', '/airline/flights', AIRLINE, None, 25),
+    ('add flight', 'POST', '/airline/flights', AIRLINE,
+     lambda i: {'origin_country_id': 1, 'destination_country_id': 2,
+                'departure_time': (datetime.now() + timedelta(days=1, minutes=i)).isoformat(),
+                'landing_time': (datetime.now() + timedelta(days=1, hours=4, minutes=i)).isoformat(),
+                'remaining_tickets': 200}, 40),
+    ('all customers', 'GET', '/admin/customers', ADMINISTRATOR, None, 25),
+    ('add customer', 'POST', '/admin/customers', ADMINISTRATOR,
+     lambda i: {'user': {'username': f'bench_{i}', 'password': '123', 'email': f'bench_{i}@gmail.com'},
+                'customer': {'first_name': 'Bench', 'last_name': str(i), 'address': 'Bench 1',
+                             'phone_no': f'bench_phone_{i}', 'credit_card_no': f'bench_ccn_{i}'}}, 60),
+]
+
+
+def auth_headers(client, user, basic):  # basic=True logs in on every request, otherwise once for a signed token
+    if user is None:
+        return {}
+    if basic:
+        return {'Authorization': 'Basic ' + b64encode(f'{user[0]}:{user[1]}'.encode()).decode()}
+    token = client.post('/login', json={'username': user[0], 'password': user[1]}).get_json()['token']
+    return {'Authorization': f'Bearer {token}'}
+
+
+def send(client, method, url, headers, body):
+    if method == 'DELETE+POST':  # the seeded ticket is cancelled and booked again, so every request can repeat it
+        response = client.delete(f'{url}/{body["flight_id"]}', headers=headers)
+        assert response.status_code == 200, response.get_data()
+        response = client.post(url, headers=headers, json=body)
+    else:
+        response = client.open(url, method=method, headers=headers, json=body)
+    assert response.status_code < 300, response.get_data()
+    response.get_data()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run(requests_num, basic):
+    with repool.connection() as repo:
+        repo.reset_test_db()
+    client = app.test_client()
+    failed = False
+    print(f'{"route":<24}{"p50 ms":>10}{"p95 ms":>10}{"budget":>10}')
+    for name, method, url, user, body, budget in ROUTES:
+        headers = auth_headers(client, user, basic)
+        times = []
+        for i in range(requests_num + 1):
+            body_ = body(i) if callable(body) else body
+            start = time.perf_counter()
+            send(client, method, url, headers, body_)
+            if i:  # the first request warms up the caches and the pool
+                times.append((time.perf_counter() - start) * 1000)
+        p95 = percentile(times, 0.95)
+        failed = failed or p95 > budget
+        print(f'{name:<24}{percentile(times, 0.5):>10.2f}{p95:>10.2f}{budget:>10}{"  OVER BUDGET" if p95 > budget else ""}')
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Per route latency of the REST API against budgets.')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--basic', action='store_true', help='HTTP basic auth (a login query per request) instead of tokens')
+    args = parser.parse_args()
+    sys.exit(1 if run(args.requests, args.basic) else 0)
@@ -0,0 +1,74 @@
+from flask_rest_api import app, payload_response
+from serializers.FlightsSerializer import FlightsSerializer
+from tables.Flight import Flight
+from tables.Airline_Company import Airline_Company
+from tables.Country import Country
+from flask import jsonify
+from datetime import datetime, timedelta
+import argparse
+import time
+
+# run from the project root: python -m benchmarks.board_serialization_benchmark --rows 10000
+# compares the requests/sec of one board response, in process and without a db:
+#   before - Flight objects -> data_for_web() -> jsonify
+#   rows   - row tuples -> FlightsSerializer (what a board cache miss costs)
+#   cached - the pre-encoded payload of the board cache (what a board cache hit costs)
+
+
+def make_board(rows_num):
+    airline = Airline_Company(id=1, name='Bench Air', country_id=1, user_id=1)
+    origin = Country(id=1, name='Israel')
+    destination = Country(id=2, name='Germany')
+    start = datetime.now()
+    flights, rows = [], []
+    for i in range(rows_num):
+        departure_time = start + timedelta(minutes=i)
+        landing_time = departure_time + timedelta(hours=4)
+        flights.append(Flight(id=i + 1, airline_company_id=1, origin_country_id=1, destination_country_id=2,
+                              departure_time=departure_time, landing_time=landing_time, remaining_tickets=200,
+                              airline_company=airline, origin_county=origin, destination_county=destination))
+        rows.append((i + 1, airline.name, origin.name, destination.name, departure_time, landing_time, 200))
+    return flights, rows
+
+
+def requests_per_sec(client, url, requests_num, headers=None):
+    client.get(url, headers=headers)  # warm up
+    start = time.perf_counter()
+    for i in range(requests_num):
+        client.get(url, headers=headers).get_data()
+    return requests_num / (time.perf_counter() - start)
+
+
+def run(rows_num, requests_num):
+    flights, rows = make_board(rows_num)
+    cached_payload = FlightsSerializer.payload(rows, compress=True)
+
+    @app.route('/bench/before')
+    def bench_before():
+        return jsonify([flight.data_for_web() for flight in flights])
+
+    @app.route('/bench/rows')
+    def bench_rows():
+        return payload_response(FlightsSerializer.payload(rows), None)
+
+    @app.route('/bench/cached')
+    def bench_cached():
+        return payload_response(cached_payload, None)
+
+    client = app.test_client()
+    results = {'before (data_for_web + jsonify)': requests_per_sec(client, '/bench/before', requests_num),
+               'rows (FlightsSerializer)': requests_per_sec(client, '/bench/rows', requests_num),
+               'cached payload': requests_per_sec(client, '/bench/cached', requests_num),
+               'cached payload, gzip': requests_per_sec(client, '/bench/cached', requests_num, {'Accept-Encoding': 'gzip'})}
+    print(f'board of {rows_num} rows, {requests_num} requests each, '
+          f'body {len(cached_payload.body)} bytes, gzipped {len(cached_payload.gzipped or b"")} bytes')
+    for name, rps in results.items():
+        print(f'{name}: {rps:.1f} requests/sec')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Board response serialization before/after.')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    run(args.rows, args.requests)
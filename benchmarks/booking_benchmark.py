@@ -0,0 +1,76 @@
+from data_access_objects.DbRepoPool import DbRepoPool
+from facades.CustomerFacade import CustomerFacade
+from login_token.LoginToken import LoginToken
+from tables.Customer import Customer
+from tables.Flight import Flight
+from tables.Ticket import Ticket
+from tables.User import User
+from custom_errors.NoRemainingTicketsError import NoRemainingTicketsError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import argparse
+import threading
+import time
+
+# run from the project root: python -m benchmarks.booking_benchmark --customers 500 --workers 16 --capacity 300
+# WARNING - the benchmark resets the db in config.conf (reset_test_db) before seeding its own customers
+
+
+def seed(repo, customers_num, capacity):
+    repo.reset_test_db()
+    with repo.transaction():
+        users = [User(username=f'bench_{i}', password='123', email=f'bench_{i}@gmail.com', user_role=1)
+                 for i in range(customers_num)]
+        repo.add_all(users)
+        customers = [Customer(first_name='Bench', last_name=str(i), address='Bench 1', phone_no=f'bench_phone_{i}',
+                              credit_card_no=f'bench_ccn_{i}', user_id=user.id) for i, user in enumerate(users)]
+        repo.add_all(customers)
+        hot_flight = Flight(airline_company_id=1, origin_country_id=1, destination_country_id=2,
+                            departure_time=datetime.now() + timedelta(days=1),
+                            landing_time=datetime.now() + timedelta(days=1, hours=4), remaining_tickets=capacity)
+        repo.add(hot_flight)
+    return [customer.id for customer in customers], hot_flight.id
+
+
+def run(customers_num, workers, capacity):
+    repool = DbRepoPool.get_instance()
+    with repool.connection() as repo:
+        customer_ids, flight_id = seed(repo, customers_num, capacity)
+
+    counters = {'booked': 0, 'sold_out': 0}
+    counters_lock = threading.Lock()
+
+    def buy(customer_id):
+        with repool.connection() as repo_:
+            facade = CustomerFacade(LoginToken(customer_id, 'Bench', 'customers'), repo_)
+            try:
+                facade.add_ticket(Ticket(flight_id=flight_id))
+                result = 'booked'
+            except NoRemainingTicketsError:
+                result = 'sold_out'
+        with counters_lock:
+            counters[result] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(buy, customer_ids))
+    elapsed = time.perf_counter() - start
+
+    with repool.connection() as repo:
+        remaining_tickets = repo.get_by_condition(Flight, lambda query: query.filter(Flight.id == flight_id).one()).remaining_tickets
+        tickets_sold = repo.get_by_condition(Ticket, lambda query: query.filter(Ticket.flight_id == flight_id).count())
+
+    print(f'customers: {customers_num}, workers: {workers}, capacity: {capacity}')
+    print(f'booked: {counters["booked"]}, sold out: {counters["sold_out"]}, elapsed: {elapsed:.3f}s')
+    print(f'bookings/sec: {counters["booked"] / elapsed:.1f}, attempts/sec: {customers_num / elapsed:.1f}')
+    print(f'remaining tickets: {remaining_tickets}, tickets in db: {tickets_sold}, '
+          f'oversold: {tickets_sold + remaining_tickets != capacity or remaining_tickets < 0}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Concurrent ticket booking on one hot flight.')
+    parser.add_argument('--customers', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--capacity', type=int, default=300)
+    args = parser.parse_args()
+    run(args.customers, args.workers, args.capacity)
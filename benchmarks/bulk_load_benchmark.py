@@ -0,0 +1,40 @@
+from data_access_objects.DbRepoPool import DbRepoPool
+from tables.Flight import Flight
+from datetime import datetime, timedelta
+import argparse
+import random
+import time
+import tracemalloc
+
+# run from the project root: python -m benchmarks.bulk_load_benchmark --rows 1000000 --chunk-size 10000
+# WARNING - the benchmark resets the db in config.conf (reset_test_db) before loading the flights
+# the rows come from a generator, so the peak memory should stay about one chunk whatever --rows is
+
+
+def flights_rows(num):
+    start = datetime.now()
+    for i in range(num):
+        departure_time = start + timedelta(minutes=random.randint(0, 1000000))
+        yield 1, random.randint(1, 2), random.randint(1, 2), departure_time, departure_time + timedelta(hours=4), 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description='COPY bulk load throughput of DbRepo.bulk_load.')
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    with DbRepoPool.get_instance().connection() as repo:
+        repo.reset_test_db()
+        tracemalloc.start()
+        start = time.perf_counter()
+        ids = repo.bulk_load(Flight, flights_rows(args.rows), chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    print(f'{len(ids)} flights in {elapsed:.2f}s: {len(ids) / elapsed:,.0f} rows/sec, peak memory {peak / 2 ** 20:.1f} MiB '
+          f'(the returned ids included)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+from data_access_objects.DbRepoPool import DbRepoPool
+from db_config import create_all_indexes
+from tables.Flight import Flight
+from tables.Ticket import Ticket
+from sqlalchemy import text
+from datetime import datetime, timedelta
+import argparse
+import time
+
+# run from the project root: python -m benchmarks.date_query_benchmark --flights 1000000
+# WARNING - the benchmark resets the db in config.conf (reset_test_db) before seeding the flights
+
+COUNTRIES_NUM = 200
+
+SEED_COUNTRIES = text("INSERT INTO countries (name) SELECT 'bench_country_' || i FROM generate_series(1, :num) i")
+SEED_FLIGHTS = text('''
+    INSERT INTO flights (airline_company_id, origin_country_id, destination_country_id, departure_time, landing_time, remaining_tickets)
+    SELECT 1 + (i % 2), 1 + floor(random() * :countries)::int, 1 + floor(random() * :countries)::int,
+           d, d + (2 + floor(random() * 14)::int) * interval '1 hour', 200
+    FROM (SELECT i, now()::timestamp + random() * interval '730 days' AS d FROM generate_series(1, :num) i) s''')
+
+# (name, query before - extract() on the column, query after - a half-open range)
+QUERIES = [
+    ('search by parameters',
+     '''SELECT * FROM flights WHERE origin_country_id = :origin AND destination_country_id = :destination
+        AND extract(year FROM departure_time) = :year AND extract(month FROM departure_time) = :month
+        AND extract(day FROM departure_time) = :day''',
+     '''SELECT * FROM flights WHERE origin_country_id = :origin AND destination_country_id = :destination
+        AND departure_time >= :day_start AND departure_time < :day_end'''),
+    ('departures by date',
+     '''SELECT * FROM flights WHERE extract(year FROM departure_time) = :year
+        AND extract(month FROM departure_time) = :month AND extract(day FROM departure_time) = :day''',
+     'SELECT * FROM flights WHERE departure_time >= :day_start AND departure_time < :day_end'),
+    ('landings by date',
+     '''SELECT * FROM flights WHERE extract(year FROM landing_time) = :year
+        AND extract(month FROM landing_time) = :month AND extract(day FROM landing_time) = :day''',
+     'SELECT * FROM flights WHERE landing_time >= :day_start AND landing_time < :day_end'),
+]
+
+
+def seed(repo, flights_num):
+    repo.reset_test_db()
+    repo.local_session.execute(SEED_COUNTRIES, {'num': COUNTRIES_NUM})
+    repo.local_session.execute(SEED_FLIGHTS, {'countries': COUNTRIES_NUM, 'num': flights_num})
+    repo.local_session.commit()
+
+
+def drop_indexes(repo):
+    for table_class in (Flight, Ticket):
+        for index in table_class.__table__.indexes:
+            repo.local_session.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+    repo.local_session.commit()
+
+
+def analyze(repo):
+    repo.local_session.execute(text('ANALYZE flights'))
+    repo.local_session.commit()
+
+
+def explain_and_time(repo, query, params, repeats):
+    plan = [row[0] for row in repo.local_session.execute(text(f'EXPLAIN (ANALYZE, BUFFERS) {query}'), params)]
+    start = time.perf_counter()
+    for i in range(repeats):
+        repo.local_session.execute(text(query), params).fetchall()
+    return plan, (time.perf_counter() - start) / repeats * 1000
+
+
+def run(flights_num, repeats):
+    repool = DbRepoPool.get_instance()
+    with repool.connection() as repo:
+        print(f'seeding {flights_num} flights...')
+        seed(repo, flights_num)
+        date = datetime.now() + timedelta(days=100)
+        day_start, day_end = repo.day_range(date)
+        params = {'origin': 1, 'destination': 2, 'year': date.year, 'month': date.month, 'day': date.day,
+                  'day_start': day_start, 'day_end': day_end}
+
+        drop_indexes(repo)
+        analyze(repo)
+        before = [explain_and_time(repo, query, params, repeats) for name, query, _ in QUERIES]
+        repo.local_session.commit()  # the index is built on another connection of the engine
+        create_all_indexes()
+        analyze(repo)
+        after = [explain_and_time(repo, query, params, repeats) for name, _, query in QUERIES]
+
+    for (name, _, _), (plan_before, ms_before), (plan_after, ms_after) in zip(QUERIES, before, after):
+        print(f'\n=== {name}: {ms_before:.2f} ms -> {ms_after:.2f} ms ({ms_before / ms_after:.1f}x)')
+        print('--- before (extract, no indexes)')
+        print('\n'.join(plan_before))
+        print('--- after (range, indexes)')
+        print('\n'.join(plan_after))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='extract() vs range predicates on a large flights table.')
+    parser.add_argument('--flights', type=int, default=1000000)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+    run(args.flights, args.repeats)
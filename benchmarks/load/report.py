@@ -0,0 +1,62 @@
+import json
+
+# the results of a load test run as JSON, and the comparison of two runs for regressions
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def latency_summary(latencies):  # seconds -> ms percentiles
+    latencies = sorted(latencies)
+    return {f'p{int(p * 100)}_ms': round(percentile(latencies, p) * 1000, 3) if latencies else None
+            for p in (0.5, 0.95, 0.99)}
+
+
+def level_result(concurrency, elapsed, samples):  # samples - {scenario name: [(latency seconds, ok), ...]}
+    scenarios = {}
+    for name, values in sorted(samples.items()):
+        scenarios[name] = {'requests': len(values), 'errors': sum(1 for latency, ok in values if not ok),
+                           **latency_summary([latency for latency, ok in values])}
+    all_values = [value for values in samples.values() for value in values]
+    return {'concurrency': concurrency,
+            'elapsed_s': round(elapsed, 3),
+            'requests': len(all_values),
+            'errors': sum(1 for latency, ok in all_values if not ok),
+            'requests_per_sec': round(len(all_values) / elapsed, 1) if elapsed else 0.0,
+            **latency_summary([latency for latency, ok in all_values]),
+            'scenarios': scenarios}
+
+
+def print_level(result):
+    print(f'concurrency {result["concurrency"]:>4}: {result["requests_per_sec"]:>9.1f} req/s  '
+          f'p50 {result["p50_ms"]} ms  p95 {result["p95_ms"]} ms  p99 {result["p99_ms"]} ms  '
+          f'errors {result["errors"]}/{result["requests"]}')
+    for name, scenario in result['scenarios'].items():
+        print(f'    {name:<18}{scenario["requests"]:>8} req  p50 {scenario["p50_ms"]} ms  p95 {scenario["p95_ms"]} ms  '
+              f'p99 {scenario["p99_ms"]} ms  errors {scenario["errors"]}')
+
+
+def save(path, run):
+    with open(path, 'w') as f:
+        json.dump(run, f, indent=2)
+
+
+def compare(baseline_path, run, tolerance):  # prints the levels that got slower than the baseline, True if any did
+    with open(baseline_path) as f:
+        baseline = {level['concurrency']: level for level in json.load(f)['levels']}
+    regressed = False
+    for level in run['levels']:
+        base = baseline.get(level['concurrency'])
+        if base is None:
+            continue
+        rps_change = (level['requests_per_sec'] - base['requests_per_sec']) / base['requests_per_sec'] \
+            if base['requests_per_sec'] else 0.0
+        p95_change = (level['p95_ms'] - base['p95_ms']) / base['p95_ms'] if base['p95_ms'] else 0.0
+        worse = rps_change < -tolerance or p95_change > tolerance
+        regressed = regressed or worse
+        print(f'concurrency {level["concurrency"]:>4}: req/s {rps_change:+.1%}, p95 {p95_change:+.1%}'
+              f'{"  REGRESSION" if worse else ""}')
+    return regressed
@@ -0,0 +1,137 @@
+from benchmarks.load.seed import Dataset, seed
+from benchmarks.load.scenarios import Worker, SCENARIOS, MIXES, is_ok
+from benchmarks.load import report
+from collections import defaultdict
+from datetime import datetime, timedelta
+import argparse
+import random
+import subprocess
+import sys
+import threading
+import time
+import requests
+
+# run from the project root:
+#   python -m benchmarks.load.runner --customers 10000 --airlines 20 --flights-per-airline 500 --mix mixed \
+#       --concurrency 1,10,50,200 --duration 30 --out results.json [--baseline old_results.json]
+# closed loop load test - every worker thread is one client that runs the scenarios of the mix back to back
+# without --url the api runs embedded, in this process on a threaded werkzeug server (the client and the server then
+# share the GIL, use --url with server.py for the numbers of production)
+# WARNING - the seeding truncates the db in config.conf, a server started with --url must be (re)started after it
+
+
+def start_embedded_server():
+    from werkzeug.serving import make_server
+    from flask_rest_api import app  # imported after the seeding, the caches start empty
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='embedded api', daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', server
+
+
+def random_searches(rnd, countries_num=200, searches_num=1000):  # for --no-seed, most of them find no flights
+    return [(rnd.randint(1, countries_num), rnd.randint(1, countries_num),
+             (datetime.now() + timedelta(days=rnd.randint(0, 730))).date().isoformat()) for i in range(searches_num)]
+
+
+def run_level(base_url, concurrency, duration, mix, dataset, searches, seed_):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = defaultdict(list)
+    samples_lock = threading.Lock()
+    times = {}
+
+    def start_clock():  # run by the barrier when all the clients are ready, before any of them is released
+        times['start'] = time.perf_counter()
+        times['deadline'] = times['start'] + duration
+
+    start = threading.Barrier(concurrency + 1, action=start_clock)
+
+    def work(i):
+        rnd = random.Random(seed_ * 100003 + i)
+        worker = Worker(requests.Session(), base_url, rnd, dataset, searches)  # one keep alive connection per client
+        local = defaultdict(list)
+        start.wait()
+        while time.perf_counter() < times['deadline']:
+            name = rnd.choices(names, weights)[0]
+            request_start = time.perf_counter()
+            try:
+                ok = is_ok(name, SCENARIOS[name](worker))
+            except requests.RequestException:
+                ok = False
+            local[name].append((time.perf_counter() - request_start, ok))
+        worker.session.close()
+        with samples_lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=work, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    for thread in threads:
+        thread.join()
+    return report.level_result(concurrency, time.perf_counter() - times['start'], samples)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP load test of the REST API.')
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--airlines', type=int, default=10)
+    parser.add_argument('--flights-per-airline', type=int, default=100)
+    parser.add_argument('--tickets-per-customer', type=int, default=2)
+    parser.add_argument('--no-seed', action='store_true',
+                        help='use the data already in the db, seeded by this tool with the same sizes')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='mixed')
+    parser.add_argument('--concurrency', default='1,10,50,100', help='comma separated concurrent clients per level')
+    parser.add_argument('--duration', type=float, default=20, help='seconds per concurrency level')
+    parser.add_argument('--warmup', type=float, default=3, help='seconds of load before the first level, not reported')
+    parser.add_argument('--url', help='a running api, e.g. http://127.0.0.1:5000 - without it the api runs embedded')
+    parser.add_argument('--out', help='save the results as JSON')
+    parser.add_argument('--baseline', help='results JSON of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed req/s drop and p95 rise, 0.1 is 10%%')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    dataset = Dataset(args.customers, args.airlines, args.flights_per_airline, args.tickets_per_customer)
+    rnd = random.Random(args.seed)
+    if args.no_seed:
+        searches = random_searches(rnd)
+    else:
+        seed_start = time.perf_counter()
+        searches = seed(dataset, args.seed)
+        print(f'seeded {dataset.to_dict()} in {time.perf_counter() - seed_start:.1f}s')
+    base_url, server = (args.url.rstrip('/'), None) if args.url else start_embedded_server()
+    mix = MIXES[args.mix]
+    levels = [int(concurrency) for concurrency in args.concurrency.split(',')]
+
+    if args.warmup:
+        run_level(base_url, min(levels), args.warmup, mix, dataset, searches, args.seed)
+    run = {'started_at': datetime.now().isoformat(timespec='seconds'),
+           'commit': git_commit(),
+           'target': args.url or 'embedded',
+           'dataset': dataset.to_dict(),
+           'mix': {'name': args.mix, 'weights': mix},
+           'duration_s': args.duration,
+           'levels': []}
+    for i, concurrency in enumerate(levels):
+        result = run_level(base_url, concurrency, args.duration, mix, dataset, searches, args.seed + i + 1)
+        report.print_level(result)
+        run['levels'].append(result)
+    if server:
+        server.shutdown()
+    if args.out:
+        report.save(args.out, run)
+        print(f'results saved to {args.out}')
+    if args.baseline and report.compare(args.baseline, run, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+from benchmarks.load.seed import customer_username, PASSWORD
+
+# every scenario is one user action - it sends its requests with the worker requests.Session and returns the last
+# response, the statuses in EXPECTED are business outcomes (a sold out flight, a ticket the customer already has)
+
+
+class Worker:  # the state of one simulated client, used by one thread only
+
+    def __init__(self, session, base_url, rnd, dataset, searches):
+        self.session = session
+        self.base_url = base_url
+        self.rnd = rnd
+        self.dataset = dataset
+        self.searches = searches
+        self.token = None  # the Bearer token of the logged in customer
+
+    def get(self, path, **kwargs):
+        return self.session.get(self.base_url + path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.session.post(self.base_url + path, **kwargs)
+
+
+def departures_board(worker):
+    return worker.get(f'/departures/{worker.rnd.randint(1, 24)}')
+
+
+def arrivals_board(worker):
+    return worker.get(f'/arrivals/{worker.rnd.randint(1, 24)}')
+
+
+def flights_page(worker):
+    return worker.get(f'/flights?after_id={worker.rnd.randint(0, worker.dataset.flights)}&limit=100')
+
+
+def search(worker):
+    origin_country_id, destination_country_id, date = worker.rnd.choice(worker.searches)
+    return worker.get(f'/flights/search?origin_country_id={origin_country_id}'
+                      f'&destination_country_id={destination_country_id}&date={date}')
+
+
+def login(worker):
+    response = worker.post('/login', json={'username': customer_username(worker.rnd.randint(1, worker.dataset.customers)),
+                                           'password': PASSWORD})
+    if response.status_code == 200:
+        worker.token = response.json()['token']
+    return response
+
+
+def buy_ticket(worker):  # the first purchase of a worker logs in first, like a real customer
+    if worker.token is None:
+        response = login(worker)
+        if response.status_code != 200:
+            return response
+    return worker.post('/customer/tickets', json={'flight_id': worker.rnd.randint(1, worker.dataset.flights)},
+                       headers={'Authorization': f'Bearer {worker.token}'})
+
+
+SCENARIOS = {'departures_board': departures_board, 'arrivals_board': arrivals_board, 'flights_page': flights_page,
+             'search': search, 'login': login, 'buy_ticket': buy_ticket}
+
+EXPECTED = {'buy_ticket': (201, 400, 409)}  # 400 - a ticket for this flight already bought, 409 - sold out
+
+# scenario name -> weight
+MIXES = {'browse': {'departures_board': 35, 'arrivals_board': 35, 'flights_page': 10, 'search': 15, 'login': 5},
+         'mixed': {'departures_board': 25, 'arrivals_board': 25, 'flights_page': 5, 'search': 20, 'login': 10,
+                   'buy_ticket': 15},
+         'booking': {'departures_board': 10, 'arrivals_board': 10, 'search': 20, 'login': 10, 'buy_ticket': 50}}
+
+
+def is_ok(name, response):
+    return response.status_code in EXPECTED.get(name, (200,))
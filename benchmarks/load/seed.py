@@ -0,0 +1,128 @@
+from data_access_objects.DbRepoPool import DbRepoPool
+from custom_errors.DbGenDataNotValidError import DbGenDataNotValidError
+from DbDataGen import DbDataGen
+from tables.Country import Country
+from tables.User_Role import User_Role
+from tables.User import User
+from tables.Administrator import Administrator
+from tables.Airline_Company import Airline_Company
+from tables.Customer import Customer
+from tables.Flight import Flight
+from tables.Ticket import Ticket
+from sqlalchemy import insert, text
+from datetime import datetime, timedelta
+import json
+import random
+
+# seeds the db in config.conf with the same shapes DbDataGen generates (countries.json, the 3 user roles, one admin,
+# airlines from airline_companies.json, flights departing in the next 2 years with a 2-15 hours flight, tickets per
+# customer) but with bulk inserts and without randomuser.me, so large datasets are seeded in seconds
+# WARNING - all the tables are truncated first
+
+PASSWORD = 'load'
+BATCH_SIZE = 10000
+SEARCHES_NUM = 1000
+
+
+class Dataset:  # the dataset size, validated like DbDataObject
+
+    def __init__(self, customers, airlines, flights_per_airline, tickets_per_customer):
+        self.customers = customers
+        self.airlines = airlines
+        self.flights_per_airline = flights_per_airline
+        self.tickets_per_customer = tickets_per_customer
+        if customers < 1 or airlines < 1 or flights_per_airline < 1 or tickets_per_customer < 0 or airlines > 150:
+            raise DbGenDataNotValidError
+        if airlines * flights_per_airline < tickets_per_customer:
+            raise DbGenDataNotValidError
+
+    @property
+    def flights(self):
+        return self.airlines * self.flights_per_airline
+
+    def to_dict(self):
+        return {'customers': self.customers, 'airlines': self.airlines, 'flights_per_airline': self.flights_per_airline,
+                'tickets_per_customer': self.tickets_per_customer}
+
+
+def customer_username(i):  # i from 1, the load test logs in with these users
+    return f'load_customer_{i}'
+
+
+def airline_username(i):
+    return f'load_airline_{i}'
+
+
+def insert_rows(session, table_class, rows):
+    for i in range(0, len(rows), BATCH_SIZE):
+        session.execute(insert(table_class), rows[i:i + BATCH_SIZE])
+
+
+def fix_sequence(session, table_class):  # the ids are inserted explicitly, new rows of the api continue after them
+    table = table_class.__tablename__
+    session.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                         f"coalesce((SELECT max(id) FROM {table}), 0) + 1, false)"))
+
+
+def seed(dataset, seed_=0):  # returns searches of seeded flights for the load test
+    rnd = random.Random(seed_)
+    with open('countries.json') as f:
+        countries = [{'id': i, 'name': country['name']} for i, country in enumerate(json.load(f), 1)]
+    with open('airline_companies.json') as f:
+        airline_names = [airline['name'] for airline in json.load(f)]
+
+    users = [{'id': 1, 'username': 'load_admin', 'password': PASSWORD, 'email': 'load_admin@load.test',
+              'user_role': DbDataGen.admin_role}]
+    airlines = []
+    for i in range(1, dataset.airlines + 1):
+        users.append({'id': len(users) + 1, 'username': airline_username(i), 'password': PASSWORD,
+                      'email': f'{airline_username(i)}@load.test', 'user_role': DbDataGen.airline_role})
+        airlines.append({'id': i, 'name': airline_names[i - 1], 'country_id': rnd.randint(1, len(countries)),
+                         'user_id': len(users)})
+    customers = []
+    for i in range(1, dataset.customers + 1):
+        users.append({'id': len(users) + 1, 'username': customer_username(i), 'password': PASSWORD,
+                      'email': f'{customer_username(i)}@load.test', 'user_role': DbDataGen.customer_role})
+        customers.append({'id': i, 'first_name': f'Load{i}', 'last_name': 'Customer', 'address': f'Load street {i}',
+                          'phone_no': f'05{i:08d}', 'credit_card_no': f'{i:012d}', 'user_id': len(users)})
+
+    now = datetime.now()
+    flights = []
+    for airline in airlines:
+        for i in range(dataset.flights_per_airline):
+            departure_time = now + timedelta(seconds=rnd.randint(0, 2 * 365 * 24 * 3600))
+            flights.append({'id': len(flights) + 1, 'airline_company_id': airline['id'],
+                            'origin_country_id': rnd.randint(1, len(countries)),
+                            'destination_country_id': rnd.randint(1, len(countries)),
+                            'departure_time': departure_time,
+                            'landing_time': departure_time + timedelta(hours=rnd.randint(2, DbDataGen.max_hours_delta_t)),
+                            'remaining_tickets': DbDataGen.remaining_tickets_per_flight})
+    tickets = []
+    for customer in customers:
+        for flight in rnd.sample(flights, dataset.tickets_per_customer):
+            if flight['remaining_tickets'] > 0:
+                flight['remaining_tickets'] -= 1
+                tickets.append({'id': len(tickets) + 1, 'flight_id': flight['id'], 'customer_id': customer['id']})
+
+    repool = DbRepoPool.get_instance()
+    with repool.connection() as repo:
+        repo.reset_all_tables_auto_inc()
+        with repo.transaction():
+            session = repo.local_session
+            insert_rows(session, Country, countries)
+            insert_rows(session, User_Role, [{'id': DbDataGen.customer_role, 'role_name': 'Customer'},
+                                             {'id': DbDataGen.airline_role, 'role_name': 'Airline Company'},
+                                             {'id': DbDataGen.admin_role, 'role_name': 'Administrator'}])
+            insert_rows(session, User, users)
+            insert_rows(session, Administrator, [{'id': 1, 'first_name': 'Admin', 'last_name': 'istrator', 'user_id': 1}])
+            insert_rows(session, Airline_Company, airlines)
+            insert_rows(session, Customer, customers)
+            insert_rows(session, Flight, flights)
+            insert_rows(session, Ticket, tickets)
+            for table_class in (Country, User_Role, User, Administrator, Airline_Company, Customer, Flight, Ticket):
+                fix_sequence(session, table_class)
+        repo.local_session.execute(text('ANALYZE'))
+        repo.local_session.commit()
+    # searches that find flights: (origin_country_id, destination_country_id, departure date)
+    return [(flight['origin_country_id'], flight['destination_country_id'], flight['departure_time'].date().isoformat())
+            for flight in rnd.sample(flights, min(len(flights), SEARCHES_NUM))]
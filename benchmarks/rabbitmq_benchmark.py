@@ -0,0 +1,74 @@
+from RabbitProducerObject import RabbitProducerObject
+from RabbitConsumerObject import RabbitConsumerObject
+import argparse
+import threading
+import time
+
+# run from the project root with a local RabbitMQ:
+#   python -m benchmarks.rabbitmq_benchmark --messages 20000 --batch-size 1,100,500 --workers 4 --prefetch 8 --work-ms 1
+# the publish rate for every batch size, then the consume rate of all the messages - every callback sleeps --work-ms,
+# as a stand in for real work, so the effect of the workers and the prefetch shows
+# the queue is purged before every run
+
+
+def publish(q_name, messages, batch_size, confirm):
+    producer = RabbitProducerObject(q_name, confirm=confirm, batch_size=batch_size)
+    producer.channel.queue_purge(q_name)
+    if confirm:
+        producer.channel.tx_commit()
+    body = b'x' * 200
+    start = time.perf_counter()
+    if batch_size == 1:
+        for i in range(messages):
+            producer.publish(body)
+    else:
+        producer.publish_many(body for i in range(messages))
+    elapsed = time.perf_counter() - start
+    producer.close()
+    return elapsed
+
+
+def consume(q_name, messages, workers, prefetch, work_ms):
+    done = threading.Semaphore(0)
+    counter = {'count': 0}
+    lock = threading.Lock()
+
+    def callback(ch, method, properties, body):
+        time.sleep(work_ms / 1000)
+        with lock:
+            counter['count'] += 1
+            if counter['count'] == messages:
+                done.release()
+
+    consumer = RabbitConsumerObject(q_name, callback, prefetch=prefetch, workers=workers)
+    thread = threading.Thread(target=consumer.consume, daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    done.acquire()
+    elapsed = time.perf_counter() - start
+    consumer.stop()
+    thread.join()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Messages/sec of RabbitProducerObject and RabbitConsumerObject.')
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--batch-size', default='1,100,500', help='comma separated publish_many batch sizes')
+    parser.add_argument('--no-confirm', action='store_true', help='publish without transactions')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--prefetch', type=int, default=8)
+    parser.add_argument('--work-ms', type=float, default=0.0)
+    parser.add_argument('--queue', default='benchmark')
+    args = parser.parse_args()
+
+    for batch_size in [int(size) for size in args.batch_size.split(',')]:
+        elapsed = publish(args.queue, args.messages, batch_size, not args.no_confirm)
+        print(f'publish batch {batch_size:>5}: {args.messages / elapsed:>10,.0f} messages/sec')
+    elapsed = consume(args.queue, args.messages, args.workers, args.prefetch, args.work_ms)
+    print(f'consume {args.workers} workers, prefetch {args.prefetch}, {args.work_ms} ms work: '
+          f'{args.messages / elapsed:>10,.0f} messages/sec')
+
+
+if __name__ == '__main__':
+    main()
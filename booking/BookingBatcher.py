@@ -0,0 +1,107 @@
+from tables.Booking import Booking
+from logger.Logger import Logger
+from sqlalchemy.exc import OperationalError
+from configparser import ConfigParser
+from concurrent.futures import Future
+from collections import defaultdict
+import threading
+import time
+
+
+class BookingBatcher:  # the booking worker side - the requests of the consumer workers are booked a batch at a time
+
+    config = ConfigParser()
+    config.read("config.conf")
+    MAX_BATCH = int(config["booking"]["max_batch"])
+    MAX_WAIT = int(config["booking"]["max_wait_ms"]) / 1000
+
+    def __init__(self, repool, max_batch=None, max_wait=None):
+        self.repool = repool
+        self.max_batch = max_batch or self.MAX_BATCH
+        self.max_wait = self.MAX_WAIT if max_wait is None else max_wait
+        self.logger = Logger.get_instance()
+        self._pending = []  # (request, future)
+        self._condition = threading.Condition()
+        threading.Thread(target=self._run, name='booking batcher', daemon=True).start()
+
+    def submit(self, request):  # request - {'booking_id', 'customer_id', 'flight_id'}, the future gets (status, ticket_id)
+        future = Future()
+        with self._condition:
+            self._pending.append((request, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:  # the first one starts the max_wait
+                self._condition.notify()
+        return future
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            deadline = time.monotonic() + self.max_wait  # a little longer for the requests of the same burst
+            while len(self._pending) < self.max_batch and time.monotonic() < deadline:
+                self._condition.wait(deadline - time.monotonic())
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self.book([request for request, future in batch])
+                for request, future in batch:
+                    future.set_result(results[request['booking_id']])
+            except OperationalError as e:  # the db is not reachable, every request gets the error and is requeued
+                self.logger.logger.error(f'A batch of {len(batch)} bookings failed: {e}')
+                for request, future in batch:
+                    future.set_exception(e)
+            except Exception as e:  # e.g. a request of a deleted customer - the others are booked without it
+                self.logger.logger.error(f'A batch of {len(batch)} bookings failed, booking them one at a time: {e}')
+                self._book_one_at_a_time(batch)
+
+    def _book_one_at_a_time(self, batch):  # only the requests that fail on their own get the error
+        for request, future in batch:
+            try:
+                future.set_result(self.book([request])[request['booking_id']])
+            except Exception as e:
+                self.logger.logger.error(f'The booking {request["booking_id"]} failed: {e}')
+                if not isinstance(e, OperationalError):  # not requeued, so its client is answered failed
+                    self._fail(request['booking_id'])
+                future.set_exception(e)
+
+    def _fail(self, booking_id):
+        try:
+            with self.repool.connection() as repo:
+                repo.fail_booking(booking_id)
+        except Exception as e:  # e.g. the customer was deleted with its pending booking
+            self.logger.logger.error(f'The booking {booking_id} could not be marked failed: {e}')
+
+    def book(self, requests):  # returns {booking_id: (status, ticket_id)}, the batch and its bookings in one transaction
+        results = {}
+        by_flight = defaultdict(list)
+        with self.repool.connection() as repo:
+            with repo.transaction():
+                # a redelivered request (its worker died before the ack) was booked already, it keeps its result. the
+                # session is queried directly - an OperationalError must reach _run, so the batch is requeued
+                booking_ids = [request['booking_id'] for request in requests]
+                for booking in repo.local_session.query(Booking).filter(Booking.id.in_(booking_ids),
+                                                                        Booking.status != 'pending'):
+                    results[booking.id] = (booking.status, booking.ticket_id)
+                unique = {}  # the same request twice in the batch (redelivered meanwhile) is booked once
+                for request in requests:
+                    if request['booking_id'] not in results:
+                        unique.setdefault(request['booking_id'], request)
+                requests = list(unique.values())
+                for request in requests:
+                    by_flight[request['flight_id']].append(request)
+                for flight_id in sorted(by_flight):  # the flight rows are locked in id order, 2 workers can't deadlock
+                    customer_ids = list(dict.fromkeys(request['customer_id'] for request in by_flight[flight_id]))
+                    booked = repo.book_tickets(flight_id, customer_ids)
+                    first_request = {}
+                    for request in by_flight[flight_id]:  # the same customer twice in the batch - only the first one books
+                        first = first_request.setdefault(request['customer_id'], request['booking_id'])
+                        results[request['booking_id']] = booked[request['customer_id']] if first == request['booking_id'] \
+                            else ('duplicate', None)
+                repo.add_bookings([{'id': request['booking_id'], 'customer_id': request['customer_id'],
+                                    'flight_id': request['flight_id'], 'status': results[request['booking_id']][0],
+                                    'ticket_id': results[request['booking_id']][1]} for request in requests])
+        self.logger.logger.debug(f'A batch of {len(requests)} bookings of {len(by_flight)} flights has been booked.')
+        return results
@@ -0,0 +1,37 @@
+from RabbitProducerObject import RabbitProducerObject
+from configparser import ConfigParser
+import threading
+import orjson
+
+
+class BookingPublisher:  # the api side of the queued booking - a purchase is a message
+
+    _instance = None
+    _lock = threading.Lock()
+    QUEUE = 'Bookings'
+
+    config = ConfigParser()
+    config.read("config.conf")
+    ASYNC = config["booking"].getboolean("async")  # POST /customer/tickets queues the purchases
+
+    def __init__(self):
+        raise RuntimeError('Call instance() instead')
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance:
+            return cls._instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls.__new__(cls)
+                cls._instance._local = threading.local()  # a producer per request thread, a channel is not thread safe
+            return cls._instance
+
+    def _producer(self):  # made in the thread that uses it, so a forked worker never uses a connection of its parent
+        producer = getattr(self._local, 'producer', None)
+        if producer is None:
+            producer = self._local.producer = RabbitProducerObject(self.QUEUE)
+        return producer
+
+    def request(self, booking_id, customer_id, flight_id):  # returns after the broker has the message
+        self._producer().publish(orjson.dumps({'booking_id': booking_id, 'customer_id': customer_id, 'flight_id': flight_id}))
@@ -0,0 +1,25 @@
+from RabbitConsumerObject import RabbitConsumerObject
+from booking.BookingBatcher import BookingBatcher
+from booking.BookingPublisher import BookingPublisher
+from data_access_objects.DbRepoPool import DbRepoPool
+from sqlalchemy.exc import OperationalError
+import orjson
+
+# books the purchases queued by the api when [booking] async=true - run as many of them as needed
+# every message waits on its consumer worker for the batch it is in, and is acked after the batch committed
+batcher = BookingBatcher(DbRepoPool.get_instance())
+REQUEUE_ON = (OperationalError,)  # the db is not reachable - the messages are booked again later, not dropped
+
+
+def main():
+    rabbit = RabbitConsumerObject(q_name=BookingPublisher.QUEUE, callback=callback, prefetch=2 * batcher.max_batch,
+                                  workers=batcher.max_batch, requeue_on=REQUEUE_ON)
+    rabbit.consume()
+
+
+def callback(ch, method, properties, body):
+    batcher.submit(orjson.loads(body)).result()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+from configparser import ConfigParser
+import threading
+import time
+
+
+class _InFlight:  # a board that is being computed, the other requests for the same key wait for it
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class BoardCache:  # short TTL cache of the departures/arrivals boards with single flight request coalescing
+
+    _instance = None
+    _lock = threading.Lock()
+
+    config = ConfigParser()
+    config.read("config.conf")
+    TTL = float(config["cache"]["board_ttl"])
+    MAX_ENTRIES = int(config["cache"]["board_max_entries"])
+
+    def __init__(self):
+        raise RuntimeError('Call instance() instead')
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance:
+            return cls._instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls.__new__(cls)
+                cls._instance._entries = {}  # key -> (expire time, value)
+                cls._instance._in_flight = {}  # key -> _InFlight
+                cls._instance._generation = 0  # bumped by invalidate, results computed before it are not stored
+                cls._instance._entries_lock = threading.Lock()
+            return cls._instance
+
+    def get_or_compute(self, key, compute):  # compute() runs once per key per TTL, no matter how many requests wait
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            in_flight = self._in_flight.get(key)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = _InFlight()
+                self._in_flight[key] = in_flight
+                generation = self._generation
+        if not is_leader:
+            in_flight.event.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.value
+        try:
+            in_flight.value = compute()
+            return in_flight.value
+        except BaseException as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._entries_lock:
+                if in_flight.error is None and generation == self._generation:
+                    if len(self._entries) >= self.MAX_ENTRIES:
+                        self._entries.clear()
+                    self._entries[key] = (time.monotonic() + self.TTL, in_flight.value)
+                del self._in_flight[key]
+            in_flight.event.set()
+
+    def invalidate(self):  # called after every write that changes flights or tickets
+        with self._entries_lock:
+            self._entries.clear()
+            self._generation += 1
@@ -0,0 +1,38 @@
+import multiprocessing
+import threading
+import time
+
+
+class DataVersion:  # a cheap version stamp of the flights data, bumped after every committed write that changes it
+    # in the api processes - the writes of the other processes (booking_worker.py, the data generation) are not counted
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        raise RuntimeError('Call instance() instead')
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance:
+            return cls._instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls.__new__(cls)
+                # in shared memory - the workers forked by server.py after the import see the writes of each other
+                cls._instance._version = multiprocessing.Value('q', 0)
+                cls._instance._epoch = f'{time.time_ns():x}'  # a restarted server never repeats an old etag
+            return cls._instance
+
+    def get(self):
+        return self._version.value
+
+    def bump(self):
+        with self._version.get_lock():
+            self._version.value += 1
+
+    def etag(self, version, bucket_seconds=None):  # bucket_seconds - for data that also changes with the time (boards)
+        tag = f'{self._epoch}-{version}'
+        if bucket_seconds:
+            tag += f'-{int(time.time() // bucket_seconds)}'
+        return tag
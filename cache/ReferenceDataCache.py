@@ -0,0 +1,73 @@
+from tables.Country import Country
+from tables.Airline_Company import Airline_Company
+from tables.User_Role import User_Role
+from configparser import ConfigParser
+import threading
+import time
+
+
+class ReferenceDataCache:  # in process read-through cache of the small tables that almost never change
+
+    _instance = None
+    _lock = threading.Lock()
+    cached_tables = (Country, Airline_Company, User_Role)
+
+    config = ConfigParser()
+    config.read("config.conf")
+    TTL = float(config["cache"]["reference_ttl"])
+
+    def __init__(self):
+        raise RuntimeError('Call instance() instead')
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance:
+            return cls._instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls.__new__(cls)
+                cls._instance._tables = {}  # table class -> (load time, {id: {column: value}})
+                cls._instance._load_lock = threading.Lock()
+            return cls._instance
+
+    def get_all(self, repo, table_class, loaded_before=None):  # {id: {column: value}} ordered by id
+        # the whole table is loaded on a miss. loaded_before (a time.monotonic()) also reloads a table loaded before it
+        entry = self._tables.get(table_class)
+        if self._fresh(entry, loaded_before):
+            return entry[1]
+        with self._load_lock:
+            entry = self._tables.get(table_class)
+            if self._fresh(entry, loaded_before):  # another thread loaded it meanwhile
+                return entry[1]
+            rows = repo.get_all_order_by(table_class, table_class.id)
+            if rows is None:  # the query failed, nothing is cached
+                return {}
+            columns = [column.name for column in table_class.__table__.columns]
+            values = {row.id: {column: getattr(row, column) for column in columns} for row in rows}
+            self._tables[table_class] = (time.monotonic(), values)
+            return values
+
+    def _fresh(self, entry, loaded_before):
+        return entry is not None and time.monotonic() - entry[0] < self.TTL and \
+            (loaded_before is None or entry[0] > loaded_before)
+
+    def get_by_id(self, repo, table_class, id_):
+        # a row added by another process is not in the cached table yet, so a miss reloads it once before answering None
+        missed_at = time.monotonic()
+        values = self.get_all(repo, table_class).get(id_)
+        if values is None:
+            values = self.get_all(repo, table_class, loaded_before=missed_at).get(id_)
+        return values
+
+    def exists(self, repo, table_class, id_):
+        return self.get_by_id(repo, table_class, id_) is not None
+
+    def get_objects(self, repo, table_class):  # new (not in session) objects built from the cached values
+        return [table_class(**values) for values in self.get_all(repo, table_class).values()]
+
+    def invalidate(self, table_class=None):  # table_class=None invalidates all the tables
+        with self._load_lock:
+            if table_class is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(table_class, None)
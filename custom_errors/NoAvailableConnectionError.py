@@ -0,0 +1,7 @@
+class NoAvailableConnectionError(Exception):
+    def __init__(self, msg="No available connection in the pool, timed out while waiting."):
+        self.msg = msg
+        super().__init__(self.msg)
+
+    def __str__(self):
+        return f'{self.msg}'
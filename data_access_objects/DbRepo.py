@@ -1,4 +1,6 @@
-from sqlalchemy import asc, text, desc, extract
+from sqlalchemy import asc, text, desc, update, func, insert
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from tables.Customer import Customer
 from tables.Administrator import Administrator
 from tables.Airline_Company import Airline_Company
@@ -7,58 +9,174 @@ from tables.Flight import Flight
 from tables.Ticket import Ticket
 from tables.User_Role import User_Role
 from tables.User import User
+from tables.Booking import Booking
+from tables.Generation_Job import Generation_Job
 from datetime import datetime, timedelta
 from logger.Logger import Logger
+from cache.ReferenceDataCache import ReferenceDataCache
 from sqlalchemy.exc import OperationalError, IntegrityError
+from contextlib import contextmanager
+from itertools import islice
+import io
 
 
 class DbRepo:
     def __init__(self, local_session):
         self.local_session = local_session
         self.logger = Logger.get_instance()
+        self._transaction_depth = 0
+        self._after_commit = []  # callbacks of the writes inside the transaction, run once it is committed
+
+    @contextmanager
+    def transaction(self):  # with repo.transaction(): - all the writes inside are committed once, at the end
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._after_commit.clear()
+                self.local_session.rollback()
+                self.logger.logger.debug('A transaction has been rolled back.')
+            raise
+        else:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                try:
+                    self.local_session.commit()
+                except BaseException:
+                    self._after_commit.clear()
+                    self.local_session.rollback()
+                    raise
+                callbacks, self._after_commit = self._after_commit, []
+                for callback in callbacks:
+                    callback()
+
+    def after_commit(self, callback):  # now, or when the outermost transaction is committed - never before it
+        if self._transaction_depth:
+            self._after_commit.append(callback)
+        else:
+            callback()
+
+    def _commit(self):  # inside a transaction only flush, so ids are generated but the commit is deferred
+        if self._transaction_depth:
+            self.local_session.flush()
+        else:
+            self.local_session.commit()
 
     def reset_auto_inc(self, table_class):
         try:
             self.local_session.execute(f'TRUNCATE TABLE {table_class.__tablename__} RESTART IDENTITY CASCADE')
             self.local_session.commit()
+            ReferenceDataCache.get_instance().invalidate()  # the truncate cascades, so all the cached tables may be affected
             self.logger.logger.debug(f'Reset auto inc in {table_class} table')
         except OperationalError as e:
             self.logger.logger.critical(e)
 
-    def get_all(self, table_class):
+    # load_options are loader options (e.g. Flight.web_load_options()) that load the relationships in the same query
+    def get_all(self, table_class, load_options=()):
+        try:
+            return self.local_session.query(table_class).options(*load_options).all()
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
+    def get_ids(self, table_class):  # only the ids, without loading the rows
+        try:
+            return [id_ for id_, in self.local_session.query(table_class.id).order_by(table_class.id)]
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
+    def get_flights_capacity(self):  # (id, remaining_tickets) of the flights that still have tickets
+        try:
+            return self.local_session.query(Flight.id, Flight.remaining_tickets).filter(Flight.remaining_tickets > 0)\
+                .order_by(Flight.id).all()
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
+    @staticmethod
+    def keyset_page(query, id_column, after_id=None, limit=None):  # rows after the last id the client has seen, in id order
+        if after_id is None and limit is None:
+            return query
+        if after_id is not None:
+            query = query.filter(id_column > after_id)
+        query = query.order_by(id_column)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    def get_page(self, table_class, id_column, after_id=0, limit=100, load_options=()):
+        try:
+            return self.keyset_page(self.local_session.query(table_class).options(*load_options), id_column, after_id, limit).all()
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
+    def stream_all(self, table_class, batch_size=1000, load_options=()):  # a generator over a server side cursor
+        try:
+            yield from self.local_session.query(table_class).options(*load_options).yield_per(batch_size)
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
+    def flights_web_query(self):  # the fields of Flight.data_for_web as plain row tuples, the names joined in one statement
+        origin_country = aliased(Country)
+        destination_country = aliased(Country)
+        return self.local_session.query(Flight.id, Airline_Company.name, origin_country.name, destination_country.name,
+                                        Flight.departure_time, Flight.landing_time, Flight.remaining_tickets)\
+            .join(Airline_Company, Flight.airline_company_id == Airline_Company.id)\
+            .join(origin_country, Flight.origin_country_id == origin_country.id)\
+            .join(destination_country, Flight.destination_country_id == destination_country.id)
+
+    def get_login_row(self, username, password):  # (user_role, id, name) of the user role entity, in one statement
+        try:
+            return self.local_session.query(User.user_role,
+                                            func.coalesce(Customer.id, Airline_Company.id, Administrator.id),
+                                            func.coalesce(Customer.first_name, Airline_Company.name, Administrator.first_name))\
+                .outerjoin(Customer, Customer.user_id == User.id)\
+                .outerjoin(Airline_Company, Airline_Company.user_id == User.id)\
+                .outerjoin(Administrator, Administrator.user_id == User.id)\
+                .filter(User.username == username, User.password == password).first()
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
+    def get_flights_web_rows(self, after_id=None, limit=None):
+        try:
+            return self.keyset_page(self.flights_web_query(), Flight.id, after_id, limit).all()
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
+    def stream_flights_web_rows(self, batch_size=1000):  # a generator over a server side cursor
         try:
-            return self.local_session.query(table_class).all()
+            yield from self.flights_web_query().yield_per(batch_size)
         except OperationalError as e:
             self.logger.logger.critical(e)
 
-    def get_all_limit(self, table_class, limit_num):
+    def get_all_limit(self, table_class, limit_num, load_options=()):
         try:
-            return self.local_session.query(table_class).limit(limit_num).all()
+            return self.local_session.query(table_class).options(*load_options).limit(limit_num).all()
         except OperationalError as e:
             self.logger.logger.critical(e)
 
-    def get_all_order_by(self, table_class, column_name, direction=asc):
+    def get_all_order_by(self, table_class, column_name, direction=asc, load_options=()):
         try:
-            return self.local_session.query(table_class).order_by(direction(column_name)).all()
+            return self.local_session.query(table_class).options(*load_options).order_by(direction(column_name)).all()
         except OperationalError as e:
             self.logger.logger.critical(e)
 
-    def get_by_column_value(self, table_class, column_value, value):
+    def get_by_column_value(self, table_class, column_value, value, load_options=()):
         try:
-            return self.local_session.query(table_class).filter(column_value == value).all()
+            return self.local_session.query(table_class).options(*load_options).filter(column_value == value).all()
         except OperationalError as e:
             self.logger.logger.critical(e)
 
-    def get_by_condition(self, table_class, condition):  # condition is a lambda expression of a filter
+    def get_by_condition(self, table_class, condition, load_options=()):  # condition is a lambda expression of a filter
         try:
-            return condition(self.local_session.query(table_class))
+            return condition(self.local_session.query(table_class).options(*load_options))
         except OperationalError as e:
             self.logger.logger.critical(e)
 
     def add(self, one_row):
         try:
             self.local_session.add(one_row)
-            self.local_session.commit()
+            self._commit()
             self.logger.logger.debug(f'{one_row} has been added to the db')
         except OperationalError as e:
             self.logger.logger.critical(e)
@@ -66,15 +184,87 @@ class DbRepo:
     def add_all(self, rows_list):
         try:
             self.local_session.add_all(rows_list)
-            self.local_session.commit()
+            self._commit()
             self.logger.logger.debug(f'{rows_list} have been added to the db')
         except OperationalError as e:
             self.logger.logger.critical(e)
 
+    @staticmethod
+    def _copy_value(value):  # one value in the text format of COPY
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, datetime):
+            return value.isoformat(' ')
+        return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+    def bulk_load(self, table_class, rows, columns=None, chunk_size=10000):
+        # rows is any iterable of tuples in the order of columns (default - all the columns but id), streamed into the
+        # table with COPY FROM STDIN one chunk at a time, so only one chunk is in memory. returns the ids of the rows in order
+        # without an id column the ids of every chunk are taken from the table sequence first, with it the sequence is
+        # moved past the given ids
+        table = table_class.__tablename__
+        columns = list(columns or [column.name for column in table_class.__table__.columns if column.name != 'id'])
+        explicit_ids = 'id' in columns
+        copy_sql = f'COPY {table} ({", ".join(columns if explicit_ids else ["id"] + columns)}) FROM STDIN'
+        sequence = f"pg_get_serial_sequence('{table}', 'id')"
+        rows = iter(rows)
+        ids = []
+        try:
+            with self.transaction():
+                self.local_session.flush()  # rows added with add() before, e.g. the users of the loaded customers
+                cursor = self.local_session.connection().connection.cursor()  # the psycopg2 cursor, in the session transaction
+                while True:
+                    chunk = list(islice(rows, chunk_size))
+                    if not chunk:
+                        break
+                    if explicit_ids:
+                        id_index = columns.index('id')
+                        chunk_ids = [row[id_index] for row in chunk]
+                    else:  # the lock an INSERT takes before its nextval, so no reserve_ids range is drawn from
+                        self.local_session.execute(text(f'LOCK TABLE {table} IN ROW EXCLUSIVE MODE'))
+                        chunk_ids = self.local_session.execute(
+                            text(f'SELECT nextval({sequence}) FROM generate_series(1, :num)'), {'num': len(chunk)}).scalars().all()
+                        chunk = [(id_, *row) for id_, row in zip(chunk_ids, chunk)]
+                    buffer = io.StringIO()
+                    for row in chunk:
+                        buffer.write('\t'.join([self._copy_value(value) for value in row]))
+                        buffer.write('\n')
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_sql, buffer)
+                    ids.extend(chunk_ids)
+                if explicit_ids and ids:
+                    # never back, a concurrent load may have taken ids from the sequence already
+                    self.local_session.execute(text(f'SELECT setval({sequence}, greatest((SELECT max(id) FROM {table}), nextval({sequence})))'))
+            # a no op for the tables that are not cached. after the commit of an outer transaction too, else a reader
+            # could cache the rows from before it again
+            self.after_commit(lambda: ReferenceDataCache.get_instance().invalidate(table_class))
+            self.logger.logger.debug(f'{len(ids)} rows have been loaded into {table}')
+            return ids
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
+    def reserve_ids(self, table_class, num):  # a range of num ids the sequence never gives again, for bulk_load with explicit ids
+        if num < 1:
+            return range(0)
+        table = table_class.__tablename__
+        sequence = f"pg_get_serial_sequence('{table}', 'id')"
+        try:
+            with self.transaction():
+                # an INSERT and bulk_load lock the table before they take ids, so none is taken from the middle of the
+                # range meanwhile, and the range is moved over in one statement
+                self.local_session.execute(text(f'LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE'))
+                last_id = self.local_session.execute(text(f'SELECT setval({sequence}, nextval({sequence}) + :num - 1)'),
+                                                     {'num': num}).scalar()
+            return range(last_id - num + 1, last_id + 1)
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
     def delete_by_id(self, table_class, id_column_name, id_):
         try:
             self.local_session.query(table_class).filter(id_column_name == id_).delete(synchronize_session=False)
-            self.local_session.commit()
+            self._commit()
             self.logger.logger.debug(f'A row with the id {id_} has been deleted from {table_class}')
         except OperationalError as e:
             self.logger.logger.critical(e)
@@ -82,11 +272,76 @@ class DbRepo:
     def update_by_id(self, table_class, id_column_name, id_, data):  # data is a dictionary of all the new columns and values
         try:
             self.local_session.query(table_class).filter(id_column_name == id_).update(data)
-            self.local_session.commit()
+            self._commit()
             self.logger.logger.debug(f'A row with the id {id_} has been updated from {table_class}. the updated data is  {data}.')
         except OperationalError as e:
             self.logger.logger.critical(e)
 
+    def book_ticket(self, ticket):  # returns the remaining tickets after the booking, or None if the flight is sold out / not exists
+        with self.transaction():
+            # one conditional UPDATE instead of read-modify-write, so concurrent buyers can never oversell
+            stmt = update(Flight).where(Flight.id == ticket.flight_id, Flight.remaining_tickets > 0)\
+                .values(remaining_tickets=Flight.remaining_tickets - 1).returning(Flight.remaining_tickets)\
+                .execution_options(synchronize_session=False)
+            remaining_tickets = self.local_session.execute(stmt).scalar()
+            if remaining_tickets is None:
+                return None
+            self.local_session.add(ticket)
+            self.local_session.flush()  # a duplicate ticket raises IntegrityError (una_1) and rolls back the UPDATE
+            self.logger.logger.debug(f'{ticket} has been booked, {remaining_tickets} tickets remaining')
+            return remaining_tickets
+
+    def book_tickets(self, flight_id, customer_ids):
+        # a batch of bookings of one flight - one row lock, one inventory UPDATE and one multi row INSERT for all of them
+        # returns {customer_id: (status, ticket_id)}, the first customers in customer_ids get the remaining tickets
+        with self.transaction():
+            remaining_tickets = self.local_session.query(Flight.remaining_tickets).filter(Flight.id == flight_id)\
+                .with_for_update().scalar()
+            if remaining_tickets is None:
+                return {customer_id: ('not_found', None) for customer_id in customer_ids}
+            has_ticket = {customer_id for customer_id, in self.local_session.query(Ticket.customer_id).filter(
+                Ticket.flight_id == flight_id, Ticket.customer_id.in_(customer_ids))}
+            new_customers = [customer_id for customer_id in customer_ids if customer_id not in has_ticket]
+            booked = new_customers[:remaining_tickets]
+            results = {customer_id: ('duplicate', None) for customer_id in has_ticket}
+            results.update({customer_id: ('sold_out', None) for customer_id in new_customers[remaining_tickets:]})
+            if booked:
+                self.local_session.execute(update(Flight).where(Flight.id == flight_id)
+                                           .values(remaining_tickets=Flight.remaining_tickets - len(booked))
+                                           .execution_options(synchronize_session=False))
+                tickets = self.local_session.execute(insert(Ticket).values([{'flight_id': flight_id, 'customer_id': customer_id}
+                                                                           for customer_id in booked])
+                                                     .returning(Ticket.customer_id, Ticket.id))
+                results.update({customer_id: ('booked', ticket_id) for customer_id, ticket_id in tickets})
+            self.logger.logger.debug(f'{len(booked)} of {len(customer_ids)} tickets of the flight {flight_id} have been booked')
+            return results
+
+    def add_bookings(self, bookings):  # bookings is a list of dicts of the Booking columns, in one multi row INSERT
+        if bookings:  # the pending rows get their result, a booking another worker answered (a redelivery) keeps its own
+            stmt = pg_insert(Booking)
+            self.local_session.execute(stmt.on_conflict_do_update(
+                index_elements=['id'], set_={'status': stmt.excluded.status, 'ticket_id': stmt.excluded.ticket_id},
+                where=Booking.status == 'pending'), bookings)
+            self._commit()
+
+    def fail_booking(self, booking_id):  # the booking worker gave up on it, its client stops polling
+        self.local_session.query(Booking).filter(Booking.id == booking_id, Booking.status == 'pending')\
+            .update({'status': 'failed'}, synchronize_session=False)
+        self._commit()
+
+    def sell_tickets(self, sold):  # sold is {flight_id: tickets}, one UPDATE for all the flights
+        if not sold:
+            return
+        try:
+            self.local_session.execute(text('UPDATE flights SET remaining_tickets = flights.remaining_tickets - sold.tickets '
+                                            'FROM unnest(:flight_ids, :tickets) AS sold(flight_id, tickets) '
+                                            'WHERE flights.id = sold.flight_id'),
+                                       {'flight_ids': list(sold), 'tickets': list(sold.values())})
+            self._commit()
+            self.logger.logger.debug(f'{sum(sold.values())} tickets of {len(sold)} flights have been sold')
+        except OperationalError as e:
+            self.logger.logger.critical(e)
+
     def get_airlines_by_country(self, country_id):
         try:
             return self.local_session.query(Airline_Company).filter(Airline_Company.country_id == country_id).all()
@@ -105,46 +360,56 @@ class DbRepo:
         except OperationalError as e:
             self.logger.logger.critical(e)
 
+    @staticmethod
+    def day_range(date):  # [midnight, next midnight) of the date - a range predicate can use the B-tree index, extract() can't
+        day_start = datetime(date.year, date.month, date.day)
+        return day_start, day_start + timedelta(days=1)
+
     def get_flights_by_departure_date(self, departure_date):
         try:
-            return self.local_session.query(Flight).filter(extract('year', Flight.departure_date) == departure_date.year,
-                                                           extract('month', Flight.departure_date) == departure_date.month,
-                                                           extract('day', Flight.departure_date) == departure_date.day).all()
+            day_start, day_end = self.day_range(departure_date)
+            return self.local_session.query(Flight).filter(Flight.departure_time >= day_start,
+                                                           Flight.departure_time < day_end).all()
         except OperationalError as e:
             self.logger.logger.critical(e)
 
     def get_flights_by_landing_date(self, landing_date):
         try:
-            return self.local_session.query(Flight).filter(extract('year', Flight.departure_date) == landing_date.year,
-                                                           extract('month', Flight.departure_date) == landing_date.month,
-                                                           extract('day',
-                                                                   Flight.departure_date) == landing_date.day).all()
+            day_start, day_end = self.day_range(landing_date)
+            return self.local_session.query(Flight).filter(Flight.landing_time >= day_start,
+                                                           Flight.landing_time < day_end).all()
         except OperationalError as e:
             self.logger.logger.critical(e)
 
-    def get_departure_flights_by_delta_t(self, t: int):  # t is the number of hours
+    # web_rows=True returns the flights_web_query row tuples instead of Flight objects
+    def get_departure_flights_by_delta_t(self, t: int, load_options=(), after_id=None, limit=None, country_id=None, web_rows=False):  # t is the number of hours
         try:
-            flight_ls = self.get_by_condition(Flight, lambda query: query.filter(Flight.departure_time <= (datetime.now() + timedelta(hours=t)), Flight.departure_time >= (datetime.now())).all())
-            return flight_ls
+            now = datetime.now()
+            criteria = [Flight.departure_time <= (now + timedelta(hours=t)), Flight.departure_time >= now]
+            if country_id is not None:  # the board of one country
+                criteria.append(Flight.origin_country_id == country_id)
+            query = self.flights_web_query() if web_rows else self.local_session.query(Flight).options(*load_options)
+            return self.keyset_page(query.filter(*criteria), Flight.id, after_id, limit).all()
 
         except OperationalError as e:
             self.logger.logger.critical(e)
 
-    def get_arrival_flights_by_delta_t(self, t):
+    def get_arrival_flights_by_delta_t(self, t, load_options=(), after_id=None, limit=None, country_id=None, web_rows=False):
         try:
-            flight_ls = self.get_by_condition(Flight, lambda query: query.filter(Flight.landing_time <= (datetime.now() + timedelta(hours=t)), Flight.landing_time >= (datetime.now())).all())
-            return flight_ls
+            now = datetime.now()
+            criteria = [Flight.landing_time <= (now + timedelta(hours=t)), Flight.landing_time >= now]
+            if country_id is not None:  # the board of one country
+                criteria.append(Flight.destination_country_id == country_id)
+            query = self.flights_web_query() if web_rows else self.local_session.query(Flight).options(*load_options)
+            return self.keyset_page(query.filter(*criteria), Flight.id, after_id, limit).all()
 
         except OperationalError as e:
             self.logger.logger.critical(e)
 
-    def get_flights_by_customer(self, customer_id):
-        try:
-            flights_ls = []
-            tickets = self.local_session.query(Ticket).filter(Ticket.customer_id == customer_id).all()
-            for ticket in tickets:
-                flights_ls.append(ticket.flight)
-            return flights_ls
+    def get_flights_by_customer(self, customer_id, load_options=()):
+        try:  # one joined query instead of loading ticket.flight for every ticket
+            return self.local_session.query(Flight).options(*load_options).join(Ticket, Ticket.flight_id == Flight.id)\
+                .filter(Ticket.customer_id == customer_id).all()
         except OperationalError as e:
             self.logger.logger.critical(e)
 
@@ -246,11 +511,12 @@ class DbRepo:
             self.local_session.execute('DROP TABLE airline_companies CASCADE')
             self.local_session.execute('DROP TABLE administrators CASCADE')
             self.local_session.commit()
+            ReferenceDataCache.get_instance().invalidate()
             self.logger.logger.debug(f'All tables Dropped.')
         except OperationalError as e:
             self.logger.logger.critical(e)
 
-    def reset_all_tables_auto_inc(self):
+    def reset_all_tables_auto_inc(self, jobs=True):
         try:
             # resetting auto increment for all tables
             self.reset_auto_inc(Country)
@@ -261,6 +527,8 @@ class DbRepo:
             self.reset_auto_inc(Customer)
             self.reset_auto_inc(Flight)
             self.reset_auto_inc(Ticket)
+            if jobs:  # a running job would resume against the truncated data, its batches cascade
+                self.reset_auto_inc(Generation_Job)
         except OperationalError as e:
             self.logger.logger.critical(e)
 
@@ -275,44 +543,26 @@ class DbRepo:
             self.reset_auto_inc(Customer)
             self.reset_auto_inc(Flight)
             self.reset_auto_inc(Ticket)
-            # county
-            israel = Country(name='Israel')
-            self.add(israel)
-            self.add(Country(name='Germany'))
-            # user role
-            self.add(User_Role(role_name='Customer'))
-            self.add(User_Role(role_name='Airline Company'))
-            self.add(User_Role(role_name='Administrator'))
-            self.add(User_Role(role_name='Not Legal'))
-            # user
-            self.add(User(username='Elad', password='123', email='elad@gmail.com', user_role=1))
-            self.add(User(username='Uri', password='123', email='uri@gmail.com', user_role=1))
-            self.add(User(username='Yoni', password='123', email='yoni@gmail.com', user_role=2))
-            self.add(User(username='Yishay', password='123', email='yishay@gmail.com', user_role=2))
-            self.add(User(username='Tomer', password='123', email='tomer@gmail.com', user_role=3))
-            self.add(User(username='Boris', password='123', email='boris@gmail.com', user_role=3))
-            self.add(User(username='not legal', password='123', email='notlegal@gmail.com', user_role=4))
-            # administrator
-            self.add(Administrator(first_name='Tomer', last_name='Tome', user_id=5))
-            self.add(Administrator(first_name='Boris', last_name='Bori', user_id=6))
-            # airline company
-            self.add(Airline_Company(name='Yoni', country_id=1, user_id=3))
-            self.add(Airline_Company(name='Yishay', country_id=2, user_id=4))
-            # customer
-            self.add(Customer(first_name='Elad', last_name='Gunders', address='Sokolov 11',
-                              phone_no='0545557007', credit_card_no='0000', user_id=1))
-            self.add(Customer(first_name='Uri', last_name='Goldshmid', address='Helsinki 16',
-                              phone_no='0527588331', credit_card_no='0001', user_id=2))
-            # flight
-            self.add(Flight(airline_company_id=1, origin_country_id=1, destination_country_id=2,
-                            departure_time=datetime(2022, 1, 30, 16, 0, 0),
-                            landing_time=datetime(2022, 1, 30, 20, 0, 0), remaining_tickets=200))
-            self.add(Flight(airline_company_id=2, origin_country_id=1, destination_country_id=2,
-                            departure_time=datetime(2022, 1, 30, 16, 0, 0),
-                            landing_time=datetime(2022, 1, 30, 20, 0, 0), remaining_tickets=0))
-            # ticket
-            self.add(Ticket(flight_id=1, customer_id=1))
-            self.add(Ticket(flight_id=2, customer_id=2))
+            with self.transaction():  # all the test rows are committed together, the ids restart from 1
+                self.bulk_load(Country, [('Israel',), ('Germany',)], ['name'])
+                self.bulk_load(User_Role, [('Customer',), ('Airline Company',), ('Administrator',), ('Not Legal',)],
+                               ['role_name'])
+                self.bulk_load(User, [('Elad', '123', 'elad@gmail.com', 1), ('Uri', '123', 'uri@gmail.com', 1),
+                                      ('Yoni', '123', 'yoni@gmail.com', 2), ('Yishay', '123', 'yishay@gmail.com', 2),
+                                      ('Tomer', '123', 'tomer@gmail.com', 3), ('Boris', '123', 'boris@gmail.com', 3),
+                                      ('not legal', '123', 'notlegal@gmail.com', 4)],
+                               ['username', 'password', 'email', 'user_role'])
+                self.bulk_load(Administrator, [('Tomer', 'Tome', 5), ('Boris', 'Bori', 6)],
+                               ['first_name', 'last_name', 'user_id'])
+                self.bulk_load(Airline_Company, [('Yoni', 1, 3), ('Yishay', 2, 4)], ['name', 'country_id', 'user_id'])
+                self.bulk_load(Customer, [('Elad', 'Gunders', 'Sokolov 11', '0545557007', '0000', 1),
+                                          ('Uri', 'Goldshmid', 'Helsinki 16', '0527588331', '0001', 2)],
+                               ['first_name', 'last_name', 'address', 'phone_no', 'credit_card_no', 'user_id'])
+                self.bulk_load(Flight, [(1, 1, 2, datetime(2022, 1, 30, 16, 0, 0), datetime(2022, 1, 30, 20, 0, 0), 200),
+                                        (2, 1, 2, datetime(2022, 1, 30, 16, 0, 0), datetime(2022, 1, 30, 20, 0, 0), 0)],
+                               ['airline_company_id', 'origin_country_id', 'destination_country_id', 'departure_time',
+                                'landing_time', 'remaining_tickets'])
+                self.bulk_load(Ticket, [(1, 1), (2, 2)], ['flight_id', 'customer_id'])
             self.logger.logger.debug(f'Reset flights_db_tests')
         except OperationalError as e:
             self.logger.logger.critical(e)
@@ -1,5 +1,10 @@
 from data_access_objects.DbRepo import DbRepo
-from db_config import local_session
+from db_config import Session, pool_size, pool_timeout
+from custom_errors.NoAvailableConnectionError import NoAvailableConnectionError
+from logger.Logger import Logger
+from metrics.Metrics import Metrics
+from contextlib import contextmanager
+from collections import deque
 import threading
 import time
 
@@ -7,8 +12,9 @@ import time
 class DbRepoPool:
     _instance = None
     _lock = threading.Lock()
-    _lock_pool = threading.Lock()
-    _max_connections = 20
+    _max_connections = pool_size
+    _timeout = pool_timeout
+    _wait_buckets = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf'))  # upper bounds in seconds
 
     def __init__(self):
         raise RuntimeError('Call instance() instead')
@@ -19,28 +25,89 @@ class DbRepoPool:
             return cls._instance
         with cls._lock:
             if cls._instance is None:
-                cls._instance = cls.__new__(cls)
-                cls._instance.connections = [DbRepo(local_session)
-                                             for i in range(cls._max_connections)]
+                instance = cls.__new__(cls)
+                instance.logger = Logger.get_instance()
+                instance._init_connections()
+                cls._instance = instance
             return cls._instance
 
+    def _init_connections(self):
+        # every DbRepo owns its own session, so two threads never share one
+        self.connections = deque(DbRepo(Session()) for i in range(self._max_connections))
+        self._condition = threading.Condition(threading.Lock())
+        self._in_use = 0
+        self._checkouts = 0
+        self._checkout_failures = 0
+        self._wait_time_total = 0.0
+        self._wait_histogram = [0] * len(self._wait_buckets)
+        Metrics.POOL_SIZE.set(self._max_connections)
+        Metrics.POOL_IN_USE.set(0)
+
+    def reinit(self, max_connections):  # in a forked worker, after db_config.reinit_engine - nothing of the parent is kept
+        DbRepoPool._max_connections = max_connections
+        self._init_connections()  # a new condition too, its lock could have been held by a parent thread at the fork
+        self.logger.logger.debug(f'The DbRepoPool has been reinitialized with {max_connections} connections.')
+
     def get_available_count(self):
         return len(self.connections)
 
+    def get_in_use_count(self):
+        return self._in_use
+
     @staticmethod
     def get_max_possible_connections():
         return DbRepoPool._max_connections
 
-    def get_connection(self):
-        while True:
-            if len(self.connections) == 0:
-                time.sleep(0.2)
-                continue
-            with self._lock_pool:
-                if len(self.connections) > 0:
-                    return self.connections.pop(0)
+    def get_connection(self, timeout=None):  # blocks until a repo is free or the timeout (in seconds) passes
+        if timeout is None:
+            timeout = self._timeout
+        start = time.monotonic()
+        with self._condition:
+            if not self._condition.wait_for(lambda: len(self.connections) > 0, timeout=timeout):
+                self._checkout_failures += 1
+                Metrics.POOL_CHECKOUT_FAILURES.inc()
+                self.logger.logger.error(f'No DbRepo was returned to the pool in {timeout} seconds.')
+                raise NoAvailableConnectionError
+            repo = self.connections.popleft()
+            self._in_use += 1
+            Metrics.POOL_IN_USE.inc()
+            self._record_wait(time.monotonic() - start)
+            return repo
 
     def return_connection(self, conn):
-
-        with self._lock_pool:
+        conn.local_session.close()  # ends the open transaction and gives the db connection back to the engine
+        with self._condition:
             self.connections.append(conn)
+            self._in_use -= 1
+            Metrics.POOL_IN_USE.dec()
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):  # with repool.connection() as repo: - the repo is always returned
+        repo = self.get_connection(timeout)
+        try:
+            yield repo
+        except BaseException:
+            repo.local_session.rollback()
+            raise
+        finally:
+            self.return_connection(repo)
+
+    def _record_wait(self, wait_time):  # called while holding the condition lock
+        self._checkouts += 1
+        self._wait_time_total += wait_time
+        Metrics.POOL_WAIT.observe(wait_time)
+        for i, upper_bound in enumerate(self._wait_buckets):
+            if wait_time <= upper_bound:
+                self._wait_histogram[i] += 1
+                break
+
+    def get_stats(self):
+        with self._condition:
+            return {'max_connections': self._max_connections,
+                    'in_use': self._in_use,
+                    'available': len(self.connections),
+                    'checkouts': self._checkouts,
+                    'checkout_failures': self._checkout_failures,
+                    'wait_time_total': self._wait_time_total,
+                    'wait_histogram': dict(zip(self._wait_buckets, self._wait_histogram))}
@@ -1,23 +1,61 @@
 from RabbitConsumerObject import RabbitConsumerObject
 from DbDataObject import DbDataObject
+from logger.Logger import Logger
+from threading import Thread, Lock
 import json
 
+# the jobs run one at a time - on the one worker of the DataToGenerate consumer (prefetch 1, the next job messages stay
+# in the queue) or on the resume thread. a job message is acked when its job ended, if the consumer dies first the job
+# is redelivered and resumes from its checkpoints. {"cancel": job_id} goes to the CancelDataToGenerate queue, its own
+# consumer never waits behind a running job
+job_lock = Lock()
+
 
 def main():
-    rabbit = RabbitConsumerObject(q_name='DataToGenerate', callback=callback)
+    Thread(target=resume_jobs, name='resume generation jobs', daemon=True).start()
+    Thread(target=consume_cancels, name='generation cancels', daemon=True).start()
+    rabbit = RabbitConsumerObject(q_name='DataToGenerate', callback=callback, prefetch=1, workers=1)
     rabbit.consume()
 
 
+def consume_cancels():  # a consumer (and a connection) of its own, in this thread
+    rabbit = RabbitConsumerObject(q_name='CancelDataToGenerate', callback=cancel_callback, workers=1)
+    rabbit.consume()
+
+
+def run_job(db_data):
+    with job_lock:
+        status = db_data.generate_data()
+        Logger.get_instance().logger.info(f'The generation job {db_data.job_id} is {status}.')
+
+
+def resume_jobs():  # the jobs a stopped consumer did not finish and that are not in the queue anymore
+    for db_data in DbDataObject.unfinished_jobs():
+        Logger.get_instance().logger.info(f'Resuming the generation job {db_data.job_id}.')
+        try:
+            run_job(db_data)
+        except Exception as e:  # the job stays running in the db, it is resumed when the consumer starts again
+            Logger.get_instance().logger.critical(f'The generation job {db_data.job_id} failed: {e}')
+
+
+def cancel_callback(ch, method, properties, body):  # {"cancel": job_id}
+    DbDataObject.cancel(json.loads(body)['cancel'])
+
+
 def callback(ch, method, properties, body):
     data = json.loads(body)
+    if 'cancel' in data:  # still accepted here, but only read after the running job - use CancelDataToGenerate
+        DbDataObject.cancel(data['cancel'])
+        return
     airlines = int(data['airlines'])
     customers = int(data['customers'])
     flights_per_airline = int(data['flights_per_airline'])
     tickets_per_customer = int(data['tickets_per_customer'])
     db_data = DbDataObject(airlines=airlines, customers=customers,
                            flights_per_airline=flights_per_airline,
-                           tickets_per_customer=tickets_per_customer)
-    db_data.generate_data()
+                           tickets_per_customer=tickets_per_customer, job_id=data.get('job_id'),
+                           seed=int(data.get('seed', 0)))
+    run_job(db_data)
     return
 
 
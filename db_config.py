@@ -8,14 +8,31 @@ from sqlalchemy.exc import OperationalError
 config = ConfigParser()
 config.read("config.conf")
 connection_string = config["db"]["conn_string"]
+pool_size = int(config["db"]["pool_size"])
+pool_timeout = float(config["db"]["pool_timeout"])
+echo = config["db"].getboolean("echo", fallback=False)  # echo makes the console print all the sql statements being run
 
 logger = Logger.get_instance()
 # if you want to create a table from base the class needs to inherit from declarative_base
 Base = declarative_base()
 
-Session = sessionmaker()
-engine = create_engine(connection_string, echo=True)  # echo makes the console print all the sql statements being run
-local_session = Session(bind=engine)
+
+# the engine pool is sized to the DbRepoPool so every DbRepo session can hold its own connection
+def make_engine(size):
+    return create_engine(connection_string, echo=echo, pool_size=size, max_overflow=0, pool_timeout=pool_timeout)
+
+
+engine = make_engine(pool_size)
+Session = sessionmaker(bind=engine)
+local_session = Session()
+
+
+# in a forked worker process - a new engine sized for the worker, so no db connection is shared with another process
+def reinit_engine(size):
+    global engine
+    engine = make_engine(size)
+    Session.configure(bind=engine)  # the sessions made from now on (the DbRepoPool ones) use the new engine
+    return engine
 
 
 # creates a table to all classes that inherits from Base
@@ -25,4 +42,16 @@ def create_all_entities():
         logger.logger.debug('Created all sql tables.')
     except OperationalError:
         print('The database does not exist, please check the connection string')
-        logger.logger.critical('The database does not exist, please check the connection string')
\ No newline at end of file
+        logger.logger.critical('The database does not exist, please check the connection string')
+
+
+# create_all skips tables that already exist, so the indexes of an existing db are created here
+def create_all_indexes():
+    try:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
+        logger.logger.debug('Created all sql indexes.')
+    except OperationalError:
+        print('The database does not exist, please check the connection string')
+        logger.logger.critical('The database does not exist, please check the connection string')
@@ -8,8 +8,10 @@ from tables.Administrator import Administrator
 from tables.Country import Country
 from custom_errors.WrongLoginTokenError import WrongLoginTokenError
 from custom_errors.NotValidDataError import NotValidDataError
+from metrics.Metrics import Metrics
 
 
+@Metrics.instrument_facade
 class AdministratorFacade(FacadeBase):
 
     def __init__(self, login_token, repo):
@@ -46,19 +48,20 @@ class AdministratorFacade(FacadeBase):
                 f'The login token "{self.login_token}" tried to use the function add_administrator but the administrator "{administrator}" '
                 f'that was sent is not an Administrator object.')
             raise NotValidDataError
-        if self.create_user(user):
-            administrator.id = None
-            administrator.user_id = user.id
-            self.logger.logger.debug(
-                f'The login token "{self.login_token}" used the function add_administrator and added administrator "{administrator}" '
-                f'that connected to the user "{user}".')
-            self.repo.add(administrator)
-            return True
-        else:
-            self.logger.logger.error(
-                f'The login token "{self.login_token}" tried to use the function add_administrator but the user "{user}" '
-                f'that was sent is not valid so the function failed.')
-            raise NotValidDataError
+        with self.repo.transaction():  # the user and its entity are committed together
+            if self.create_user(user):
+                administrator.id = None
+                administrator.user_id = user.id
+                self.logger.logger.debug(
+                    f'The login token "{self.login_token}" used the function add_administrator and added administrator "{administrator}" '
+                    f'that connected to the user "{user}".')
+                self.repo.add(administrator)
+                return True
+            else:
+                self.logger.logger.error(
+                    f'The login token "{self.login_token}" tried to use the function add_administrator but the user "{user}" '
+                    f'that was sent is not valid so the function failed.')
+                raise NotValidDataError
 
     def remove_administrator(self, administrator_id):
         if self.login_token.role != 'administrators':
@@ -111,7 +114,9 @@ class AdministratorFacade(FacadeBase):
             raise NotValidDataError
         self.logger.logger.debug(
             f'The login token "{self.login_token}" used the function remove_airline and removed the airline "{airline}"')
-        self.repo.delete_by_id(User, User.id, airline[0].user.id)
+        self.repo.delete_by_id(User, User.id, airline[0].user.id)  # the airline is deleted by the cascade
+        self.reference_cache.invalidate(Airline_Company)
+        self.flights_data_changed()  # the airline flights are deleted by the cascade
         return True
 
     def remove_customer(self, customer_id):
@@ -137,13 +142,15 @@ class AdministratorFacade(FacadeBase):
                 f'The login token "{self.login_token}" tried to use the function remove_customer but the customer_id "{customer_id}" '
                 f'that was sent does not exist in the db.')
             raise NotValidDataError
-        tickets = self.repo.get_by_condition(Ticket, lambda query: query.filter(Ticket.customer_id == customer_id).all())
-        for ticket in tickets:
-            self.repo.update_by_id(Flight, Flight.id, ticket.flight_id,  # updating the remaining tickets of the flight
-                                   {Flight.remaining_tickets: ticket.flight.remaining_tickets + 1})
-        self.logger.logger.debug(
-            f'The login token "{self.login_token}" used the function remove_customer and removed the customer "{customer}"')
-        self.repo.delete_by_id(User, User.id, customer[0].user.id)
+        with self.repo.transaction():  # the tickets are returned and the customer is removed in one commit
+            tickets = self.repo.get_by_condition(Ticket, lambda query: query.filter(Ticket.customer_id == customer_id).all())
+            for ticket in tickets:
+                self.repo.update_by_id(Flight, Flight.id, ticket.flight_id,  # updating the remaining tickets of the flight
+                                       {Flight.remaining_tickets: Flight.remaining_tickets + 1})
+            self.logger.logger.debug(
+                f'The login token "{self.login_token}" used the function remove_customer and removed the customer "{customer}"')
+            self.repo.delete_by_id(User, User.id, customer[0].user.id)
+        self.flights_data_changed()  # remaining_tickets of the customer flights changed
         return True
 
     def add_customer(self, user, customer):
@@ -180,19 +187,20 @@ class AdministratorFacade(FacadeBase):
                 f'The login token "{self.login_token}" tried to use the function add_customer but customer.credit_card_no "{customer.credit_card_no}" '
                 f'that was sent already exists in the db.')
             raise NotValidDataError
-        if self.create_user(user):
-            customer.id = None
-            customer.user_id = user.id
-            self.logger.logger.debug(
-                f'The login token "{self.login_token}" used the function add_customer and added the customer "{customer}" '
-                f'connected by the user "{user}".')
-            self.repo.add(customer)
-            return True
-        else:
-            self.logger.logger.error(
-                f'The login token "{self.login_token}" tried to use the function add_customer but the user "{user}" '
-                f'that was sent is not valid so the function failed.')
-            raise NotValidDataError
+        with self.repo.transaction():  # the user and its entity are committed together
+            if self.create_user(user):
+                customer.id = None
+                customer.user_id = user.id
+                self.logger.logger.debug(
+                    f'The login token "{self.login_token}" used the function add_customer and added the customer "{customer}" '
+                    f'connected by the user "{user}".')
+                self.repo.add(customer)
+                return True
+            else:
+                self.logger.logger.error(
+                    f'The login token "{self.login_token}" tried to use the function add_customer but the user "{user}" '
+                    f'that was sent is not valid so the function failed.')
+                raise NotValidDataError
 
     def add_airline(self, user, airline):
         if self.login_token.role != 'administrators':
@@ -221,22 +229,23 @@ class AdministratorFacade(FacadeBase):
                 f'The login token "{self.login_token}" tried to use the function add_airline but airline.name "{airline.name}" '
                 f'that was sent already exists in the db.')
             raise NotValidDataError
-        if not self.repo.get_by_condition(Country,
-                                          lambda query: query.filter(Country.id == airline.country_id).all()):
+        if not self.reference_cache.exists(self.repo, Country, airline.country_id):
             self.logger.logger.error(
                 f'The login token "{self.login_token}" tried to use the function add_airline but airline.country_id "{airline.country_id}" '
                 f'that was sent does not exist in the db.')
             raise NotValidDataError
-        if self.create_user(user):
-            airline.id = None
-            airline.user_id = user.id
-            self.logger.logger.debug(
-                f'The login token "{self.login_token}" used the function add_airline and added airline "{airline}" '
-                f'that connected to the user "{user}".')
-            self.repo.add(airline)
-            return True
-        else:
-            self.logger.logger.error(
-                f'The login token "{self.login_token}" tried to use the function add_airline but the user "{user}" '
-                f'that was sent is not valid so the function failed.')
-            raise NotValidDataError
\ No newline at end of file
+        with self.repo.transaction():  # the user and its entity are committed together
+            if self.create_user(user):
+                airline.id = None
+                airline.user_id = user.id
+                self.logger.logger.debug(
+                    f'The login token "{self.login_token}" used the function add_airline and added airline "{airline}" '
+                    f'that connected to the user "{user}".')
+                self.repo.add(airline)
+            else:
+                self.logger.logger.error(
+                    f'The login token "{self.login_token}" tried to use the function add_airline but the user "{user}" '
+                    f'that was sent is not valid so the function failed.')
+                raise NotValidDataError
+        self.reference_cache.invalidate(Airline_Company)  # after the commit, so a reload can't miss the new airline
+        return True
\ No newline at end of file
@@ -7,8 +7,10 @@ from custom_errors.NotLegalFlightTimesError import NotLegalFlightTimesError
 from custom_errors.NoRemainingTicketsError import NoRemainingTicketsError
 from custom_errors.WrongLoginTokenError import WrongLoginTokenError
 from custom_errors.NotValidDataError import NotValidDataError
+from metrics.Metrics import Metrics
 
 
+@Metrics.instrument_facade
 class AirlineFacade(FacadeBase):
 
     def __init__(self, login_token, repo):
@@ -34,12 +36,12 @@ class AirlineFacade(FacadeBase):
                 f'The login token "{self.login_token}" tried to use the function add_flight but the flight "{flight}" '
                 f'that was sent is not a Flight object.')
             raise NotValidDataError
-        if not self.repo.get_by_condition(Country, lambda query: query.filter(Country.id == flight.origin_country_id).all()):
+        if not self.reference_cache.exists(self.repo, Country, flight.origin_country_id):
             self.logger.logger.error(
                 f'The login token "{self.login_token}" tried to use the function add_flight but the origin_country_id "{flight.origin_country_id}"'
                 f'that was sent not exists in the db.')
             raise NotValidDataError
-        if not self.repo.get_by_condition(Country, lambda query: query.filter(Country.id == flight.destination_country_id).all()):
+        if not self.reference_cache.exists(self.repo, Country, flight.destination_country_id):
             self.logger.logger.error(
                 f'The login token "{self.login_token}" tried to use the function add_flight but the destination_country_id "{flight.destination_country_id}"'
                 f'that was sent not exists in the db.')
@@ -70,6 +72,7 @@ class AirlineFacade(FacadeBase):
         self.logger.logger.debug(
             f'The login token "{self.login_token}" used the function add_flight and added the flight "{flight}" to the db.')
         self.repo.add(flight)
+        self.flights_data_changed()
         return True
 
     def remove_flight(self, flight_id):
@@ -103,6 +106,7 @@ class AirlineFacade(FacadeBase):
             f'The login token "{self.login_token}" used the function remove_flight and removed the flight "{flight}" '
             f'from the db.')
         self.repo.delete_by_id(Flight, Flight.id, flight_id)
+        self.flights_data_changed()
         return True
 
     def update_airline(self, airline):
@@ -128,7 +132,7 @@ class AirlineFacade(FacadeBase):
                 f'The login token "{self.login_token}" tried to use the function update_airline but the airline.name "{airline.name}" '
                 f'already exists in the db.')
             raise NotValidDataError
-        if not self.repo.get_by_condition(Country, lambda query: query.filter(Country.id == airline.country_id).all()):
+        if not self.reference_cache.exists(self.repo, Country, airline.country_id):
             self.logger.logger.error(
                 f'The login token "{self.login_token}" tried to use the function update_airline but the airline.country_id "{airline.country_id}" '
                 f'not exists in the db.')
@@ -137,6 +141,8 @@ class AirlineFacade(FacadeBase):
             f'The login token "{self.login_token}" used the function update_airline and updated to airline "{airline}"')
         self.repo.update_by_id(Airline_Company, Airline_Company.id, self.login_token.id, {Airline_Company.name: airline.name,
                                                                                  Airline_Company.country_id: airline.country_id})
+        self.reference_cache.invalidate(Airline_Company)  # after the commit, so a reload can't cache the old airline
+        self.flights_data_changed()  # the airline name is shown on the boards
         return True
 
     def update_flight(self, flight):
@@ -181,12 +187,12 @@ class AirlineFacade(FacadeBase):
                 f'The login token "{self.login_token}" tried to use the function update_flight but both origin_country_id "{flight.origin_country_id}" '
                 f'and destination_country_id "{flight.destination_country_id}" that was sent must be positive.')
             raise NotValidDataError
-        if not self.repo.get_by_condition(Country, lambda query: query.filter(Country.id == flight.origin_country_id).all()):
+        if not self.reference_cache.exists(self.repo, Country, flight.origin_country_id):
             self.logger.logger.error(
                 f'The login token "{self.login_token}" tried to use the function update_flight but the origin_country_id "{flight.origin_country_id}" '
                 f'that was sent does not exists in the db.')
             raise NotValidDataError
-        if not self.repo.get_by_condition(Country, lambda query: query.filter(Country.id == flight.destination_country_id).all()):
+        if not self.reference_cache.exists(self.repo, Country, flight.destination_country_id):
             self.logger.logger.error(
                 f'The login token "{self.login_token}" tried to use the function update_flight but the destination_country_id "{flight.destination_country_id}" '
                 f'that was sent does not exists in the db.')
@@ -220,4 +226,5 @@ class AirlineFacade(FacadeBase):
                                                               Flight.departure_time: flight.departure_time,
                                                               Flight.landing_time: flight.landing_time,
                                                               Flight.remaining_tickets: flight.remaining_tickets})
+        self.flights_data_changed()
         return True
\ No newline at end of file
@@ -4,44 +4,60 @@ from facades.AirlineFacade import AirlineFacade
 from facades.AdministratorFacade import AdministratorFacade
 from tables.User import User
 from tables.Customer import Customer
+from tables.Airline_Company import Airline_Company
+from tables.Administrator import Administrator
 from login_token.LoginToken import LoginToken
 from custom_errors.UserRoleTableError import UserRoleTableError
 from custom_errors.WrongLoginDataError import WrongLoginDataError
+from custom_errors.WrongLoginTokenError import WrongLoginTokenError
 from custom_errors.NotValidDataError import NotValidDataError
+from metrics.Metrics import Metrics
 
 
+@Metrics.instrument_facade
 class AnonymousFacade(FacadeBase):
 
-    facade_dic = {1: lambda login_token, repo: CustomerFacade(login_token, repo), 2: lambda login_token, repo: AirlineFacade(login_token, repo),
-                  3: lambda login_token, repo: AdministratorFacade(login_token, repo)}
+    role_dic = {1: 'customers', 2: 'airline_companies', 3: 'administrators'}  # user_role -> the LoginToken role
 
-    user_backref_and_name_column_dic = {1: ['customers', 'first_name'], 2: ['airline_companies', 'name'],
-                                        3: ['administrators', 'first_name']}
+    role_facade_dic = {'customers': CustomerFacade, 'airline_companies': AirlineFacade, 'administrators': AdministratorFacade}
+
+    role_table_dic = {'customers': Customer, 'airline_companies': Airline_Company, 'administrators': Administrator}
 
     def __init__(self, repo):
         self.repo = repo
         super().__init__(self.repo)
 
-    def login(self, username, pw):
-        user = self.repo.get_by_condition(User, lambda query: query.filter(User.username == username, User.password == pw).first())
-        if not user:
+    def get_login_token(self, username, pw):  # one joined query, the user role entity id and name come with the user
+        row = self.repo.get_login_row(username, pw)
+        if not row:
             self.logger.logger.info(
                 f'Wrong username {username} or password {pw} has been entered to the login function.')
             raise WrongLoginDataError
-        try:
-            name = eval(f'user.{AnonymousFacade.user_backref_and_name_column_dic[user.user_role][0]}.'
-                        f'{AnonymousFacade.user_backref_and_name_column_dic[user.user_role][1]}')
-            id_ = eval(f'user.{AnonymousFacade.user_backref_and_name_column_dic[user.user_role][0]}.id')
-            role = AnonymousFacade.user_backref_and_name_column_dic[user.user_role][0]
-            login_token = LoginToken(id_, name, role)
-
-            self.logger.logger.debug(f'{login_token} logged in to the system.')
-            return AnonymousFacade.facade_dic[user.user_role](login_token, self.repo)
-
-        except KeyError:
+        user_role, id_, name = row
+        if user_role not in AnonymousFacade.role_dic:
             self.logger.logger.error(
                 f'User Roles table contains more than 3 user roles. Please check it ASAP.')
             raise UserRoleTableError
+        if id_ is None:
+            self.logger.logger.error(f'The user {username} has no {AnonymousFacade.role_dic[user_role]} row in the db.')
+            raise WrongLoginDataError
+        return LoginToken(id_, name, AnonymousFacade.role_dic[user_role])
+
+    def login(self, username, pw):
+        login_token = self.get_login_token(username, pw)
+        self.logger.logger.debug(f'{login_token} logged in to the system.')
+        return AnonymousFacade.facade_by_login_token(login_token, self.repo)
+
+    def login_token_exists(self, login_token):  # a signed token outlives its customer / airline / administrator row
+        table_class = AnonymousFacade.role_table_dic.get(login_token.role)
+        return table_class is not None and bool(self.repo.get_by_column_value(table_class, table_class.id, login_token.id))
+
+    @staticmethod
+    def facade_by_login_token(login_token, repo):  # rebuilds the facade of a signed token without any db query
+        try:
+            return AnonymousFacade.role_facade_dic[login_token.role](login_token, repo)
+        except KeyError:
+            raise WrongLoginTokenError
 
     def add_customer(self, user, customer):
         if not isinstance(user, User):
@@ -65,12 +81,13 @@ class AnonymousFacade(FacadeBase):
             self.logger.logger.error(
                 f'the customer.credit_card_no "{customer.credit_card_no}" that was sent the function add_customer is already exists in the db.')
             raise NotValidDataError
-        if self.create_user(user):
-            customer.id = None
-            customer.user_id = user.id
-            self.logger.logger.debug(f'A Customer "{customer}" connected by the User "{user}" has been added to the db.')
-            self.repo.add(customer)
-            return True
-        else:
-            self.logger.logger.error(f'The function add_customer failed - the User "{user} "that was sent is not valid.')
-            raise NotValidDataError
\ No newline at end of file
+        with self.repo.transaction():  # the user and the customer are committed together
+            if self.create_user(user):
+                customer.id = None
+                customer.user_id = user.id
+                self.logger.logger.debug(f'A Customer "{customer}" connected by the User "{user}" has been added to the db.')
+                self.repo.add(customer)
+                return True
+            else:
+                self.logger.logger.error(f'The function add_customer failed - the User "{user} "that was sent is not valid.')
+                raise NotValidDataError
\ No newline at end of file
@@ -2,11 +2,16 @@ from facades.FacadeBase import FacadeBase
 from tables.Flight import Flight
 from tables.Customer import Customer
 from tables.Ticket import Ticket
+from tables.Booking import Booking
 from custom_errors.NoRemainingTicketsError import NoRemainingTicketsError
 from custom_errors.WrongLoginTokenError import WrongLoginTokenError
 from custom_errors.NotValidDataError import NotValidDataError
+from sqlalchemy.exc import IntegrityError
+from metrics.Metrics import Metrics
+import uuid
 
 
+@Metrics.instrument_facade
 class CustomerFacade(FacadeBase):
 
     def __init__(self, login_token, repo):
@@ -59,30 +64,58 @@ class CustomerFacade(FacadeBase):
                 f'The login token "{self.login_token}" tried to use the function add_ticket but the ticket "{ticket}" '
                 f'that was sent to the function is not a Ticket object.')
             raise NotValidDataError
-        flight = self.repo.get_by_condition(Flight, lambda query: query.filter(Flight.id == ticket.flight_id).all())
-        if not flight:
+        ticket.id = None
+        ticket.customer_id = self.login_token.id
+        try:
+            remaining_tickets = self.repo.book_ticket(ticket)
+        except IntegrityError as e:
+            if getattr(e.orig.diag, 'constraint_name', None) != 'una_1':
+                raise
             self.logger.logger.error(
-                f'The login token "{self.login_token}" tried to use the function add_ticket but the flight.id "{ticket.flight_id}" '
-                f'that was sent to the function not exists in the db.')
+                f'The login token "{self.login_token}" tried to use the function add_ticket but this customer already has a ticket for this flight')
             raise NotValidDataError
-        if flight[0].remaining_tickets <= 0:
+        if remaining_tickets is None:  # the booking failed, checking why only on this path
+            if not self.repo.get_by_condition(Flight, lambda query: query.filter(Flight.id == ticket.flight_id).all()):
+                self.logger.logger.error(
+                    f'The login token "{self.login_token}" tried to use the function add_ticket but the flight.id "{ticket.flight_id}" '
+                    f'that was sent to the function not exists in the db.')
+                raise NotValidDataError
             self.logger.logger.error(
                 f'The login token "{self.login_token}" tried to use the function add_ticket but the flight has no remaining tickets')
             raise NoRemainingTicketsError
-        if self.repo.get_by_condition(Ticket, lambda query: query.filter(Ticket.customer_id == self.login_token.id,
-                                                                         Ticket.flight_id == ticket.flight_id).all()):
-            self.logger.logger.error(
-                f'The login token "{self.login_token}" tried to use the function add_ticket but this customer already has a ticket for this flight')
-            raise NotValidDataError
-        self.repo.update_by_id(Flight, Flight.id, ticket.flight_id,  # updating the remaining tickets of the flight
-                               {Flight.remaining_tickets: flight[0].remaining_tickets - 1})
-        ticket.id = None
-        ticket.customer_id = self.login_token.id
         self.logger.logger.debug(
             f'The login token "{self.login_token}" used the function add_ticket and added this ticket "{ticket}"')
-        self.repo.add(ticket)
+        self.flights_data_changed()  # remaining_tickets of the flight changed
         return True
 
+    def request_ticket(self, ticket):
+        # the queued add_ticket - adds the pending booking the client polls and returns its id. the caller publishes it
+        # to BookingPublisher after the repo went back to the pool, booking_worker.py books it
+        if self.login_token.role != 'customers':
+            self.logger.logger.error(
+                f'The login token "{self.login_token}" tried to use the function request_ticket but his role is not Customer.')
+            raise WrongLoginTokenError
+        if not isinstance(ticket, Ticket):
+            self.logger.logger.error(
+                f'The login token "{self.login_token}" tried to use the function request_ticket but the ticket "{ticket}" '
+                f'that was sent to the function is not a Ticket object.')
+            raise NotValidDataError
+        booking_id = str(uuid.uuid4())
+        self.repo.add(Booking(id=booking_id, customer_id=self.login_token.id, flight_id=ticket.flight_id, status='pending'))
+        self.logger.logger.debug(
+            f'The login token "{self.login_token}" used the function request_ticket, the booking "{booking_id}" of the '
+            f'flight "{ticket.flight_id}" is pending')
+        return booking_id
+
+    def get_booking(self, booking_id):  # None if it was never requested by this customer
+        if self.login_token.role != 'customers':
+            self.logger.logger.error(
+                f'The login token "{self.login_token}" tried to use the function get_booking but his role is not Customer.')
+            raise WrongLoginTokenError
+        bookings = self.repo.get_by_condition(Booking, lambda query: query.filter(Booking.id == booking_id,
+                                                                                 Booking.customer_id == self.login_token.id).all())
+        return bookings[0] if bookings else None
+
     def remove_ticket(self, ticket):
         if self.login_token.role != 'customers':
             self.logger.logger.error(
@@ -105,11 +138,13 @@ class CustomerFacade(FacadeBase):
                 f'The login token "{self.login_token}" tried to use the function remove_ticket but the ticket.customer_id "{ticket.customer_id}" '
                 f'is not belong to the login_token.')
             raise WrongLoginTokenError
-        self.repo.update_by_id(Flight, Flight.id, ticket_[0].flight.id,
-                               {Flight.remaining_tickets: ticket_[0].flight.remaining_tickets + 1})
-        self.logger.logger.debug(
-            f'The login token "{self.login_token}" used the function remove_ticket and removed the ticket "{ticket}"')
-        self.repo.delete_by_id(Ticket, Ticket.id, ticket_[0].id)
+        with self.repo.transaction():  # the inventory update and the ticket delete are committed together
+            self.repo.update_by_id(Flight, Flight.id, ticket_[0].flight_id,  # incrementing in the db, not from a stale read
+                                   {Flight.remaining_tickets: Flight.remaining_tickets + 1})
+            self.logger.logger.debug(
+                f'The login token "{self.login_token}" used the function remove_ticket and removed the ticket "{ticket}"')
+            self.repo.delete_by_id(Ticket, Ticket.id, ticket_[0].id)
+        self.flights_data_changed()
         return True
 
     def get_tickets_by_customer(self):
@@ -6,11 +6,15 @@ from tables.Airline_Company import Airline_Company
 from tables.Country import Country
 from tables.User import User
 from tables.User_Role import User_Role
-from sqlalchemy import extract
 from logger.Logger import Logger
 from login_token.LoginToken import LoginToken
+from cache.ReferenceDataCache import ReferenceDataCache
+from cache.BoardCache import BoardCache
+from cache.DataVersion import DataVersion
+from metrics.Metrics import Metrics
 
 
+@Metrics.instrument_facade  # calls and errors per method at /metrics, also of the subclasses that inherit them
 class FacadeBase(ABC):
 
     @abstractmethod
@@ -18,23 +22,67 @@ class FacadeBase(ABC):
         self.logger = Logger.get_instance()
         self.repo = repo
         self._login_token = login_token
+        self.reference_cache = ReferenceDataCache.get_instance()
+        self.board_cache = BoardCache.get_instance()
+        self.data_version = DataVersion.get_instance()
 
     @property
     def login_token(self):
         return self._login_token
 
-    def get_all_flights(self):
-        return self.repo.get_all(Flight)
+    def flights_data_changed(self):  # called after a committed write that changes the flights data the web shows
+        self.data_version.bump()  # bumped first, so a board computed after the invalidation has the new version
+        self.board_cache.invalidate()
 
-    def get_arrival_flights_by_delta_t(self, hours_num):
+    def check_page(self, function_name, after_id, limit):  # after_id and limit are the keyset pagination parameters
+        if after_id is not None and (not isinstance(after_id, int) or after_id < 0):
+            self.logger.logger.error(
+                f'The login token "{self.login_token}" used the function {function_name} but the after_id "{after_id}" '
+                f'that was sent is not a non negative integer.')
+            raise NotValidDataError
+        if limit is not None and (not isinstance(limit, int) or limit <= 0):
+            self.logger.logger.error(
+                f'The login token "{self.login_token}" used the function {function_name} but the limit "{limit}" '
+                f'that was sent is not a positive integer.')
+            raise NotValidDataError
+
+    # web_rows=True returns row tuples with the fields of Flight.data_for_web instead of Flight objects
+    def get_all_flights(self, load_options=(), after_id=None, limit=None, web_rows=False):
+        self.check_page('get_all_flights', after_id, limit)
+        if web_rows:
+            return self.repo.get_flights_web_rows(after_id, limit)
+        if after_id is None and limit is None:
+            return self.repo.get_all(Flight, load_options)
+        return self.repo.get_page(Flight, Flight.id, after_id, limit, load_options)
+
+    def stream_all_flights(self, batch_size=1000, load_options=(), web_rows=False):  # a generator, memory stays flat for any table size
+        if web_rows:
+            return self.repo.stream_flights_web_rows(batch_size)
+        return self.repo.stream_all(Flight, batch_size, load_options)
+
+    def get_arrival_flights_by_delta_t(self, hours_num, load_options=(), after_id=None, limit=None, country_id=None,
+                                        web_rows=False):
         if not isinstance(hours_num, int):
             raise NotValidDataError
-        return self.repo.get_arrival_flights_by_delta_t(hours_num)
+        if country_id is not None and (not isinstance(country_id, int) or country_id <= 0):
+            self.logger.logger.error(
+                f'The login token "{self.login_token}" used the function get_arrival_flights_by_delta_t but the country_id '
+                f'"{country_id}" that was sent is not a positive integer.')
+            raise NotValidDataError
+        self.check_page('get_arrival_flights_by_delta_t', after_id, limit)
+        return self.repo.get_arrival_flights_by_delta_t(hours_num, load_options, after_id, limit, country_id, web_rows)
 
-    def get_departure_flights_by_delta_t(self, hours_num):
+    def get_departure_flights_by_delta_t(self, hours_num, load_options=(), after_id=None, limit=None, country_id=None,
+                                         web_rows=False):
         if not isinstance(hours_num, int):
             raise NotValidDataError
-        return self.repo.get_departure_flights_by_delta_t(hours_num)
+        if country_id is not None and (not isinstance(country_id, int) or country_id <= 0):
+            self.logger.logger.error(
+                f'The login token "{self.login_token}" used the function get_departure_flights_by_delta_t but the country_id '
+                f'"{country_id}" that was sent is not a positive integer.')
+            raise NotValidDataError
+        self.check_page('get_departure_flights_by_delta_t', after_id, limit)
+        return self.repo.get_departure_flights_by_delta_t(hours_num, load_options, after_id, limit, country_id, web_rows)
 
     def get_flight_by_id(self, id_):
         if not isinstance(id_, int):
@@ -60,8 +108,7 @@ class FacadeBase(ABC):
                 f'The login token "{self.login_token}" used the function get_flights_by_airline_id but the airline_id '
                 f'"{airline_id}" that was sent is not positive.')
             raise NotValidDataError
-        air_line_ = self.repo.get_by_condition(Airline_Company, lambda query: query.filter(Airline_Company.id == airline_id).all())
-        if not air_line_:
+        if not self.reference_cache.exists(self.repo, Airline_Company, airline_id):
             self.logger.logger.error(
                 f'The login token "{self.login_token}" used the function get_flights_by_airline_id but the airline_id '
                 f'"{airline_id}" that was sent is not exists in the db.')
@@ -86,15 +133,15 @@ class FacadeBase(ABC):
                 f'The login token "{self.login_token}" used the function get_flights_by_parameters but the the date '
                 f'"{date}" that was sent must be a Datetime object')
             raise NotValidDataError
+        day_start, day_end = self.repo.day_range(date)  # a half-open range so the flights index can be used
         return self.repo.get_by_condition(Flight,
                                           lambda query: query.filter(Flight.origin_country_id == origin_country_id,
                                                                      Flight.destination_country_id == destination_country_id,
-                                                                     extract('year', Flight.departure_time) == date.year,
-                                                                     extract('month', Flight.departure_time) == date.month,
-                                                                     extract('day', Flight.departure_time) == date.day).all())
+                                                                     Flight.departure_time >= day_start,
+                                                                     Flight.departure_time < day_end).all())
 
     def get_all_airlines(self):
-        return self.repo.get_all(Airline_Company)
+        return self.reference_cache.get_objects(self.repo, Airline_Company)
 
     def get_airline_by_id(self, id_):
         if not isinstance(id_, int):
@@ -107,7 +154,8 @@ class FacadeBase(ABC):
                 f'The login token "{self.login_token}" used the function get_airline_by_id but the id "{id_}" '
                 f'that was sent is not positive.')
             raise NotValidDataError
-        return self.repo.get_by_condition(Airline_Company, lambda query: query.filter(Airline_Company.id == id_).all())
+        airline = self.reference_cache.get_by_id(self.repo, Airline_Company, id_)
+        return [Airline_Company(**airline)] if airline else []
 
     def create_user(self, user):
         if not isinstance(user, User):
@@ -125,7 +173,7 @@ class FacadeBase(ABC):
                 f'The login token "{self.login_token}" used the function create_user but the user.email "{user.email}" '
                 f'that was sent already exists in the db.')
             raise NotValidDataError
-        if not self.repo.get_by_condition(User_Role, lambda query: query.filter(User_Role.id == user.user_role).all()):
+        if not self.reference_cache.exists(self.repo, User_Role, user.user_role):
             self.logger.logger.error(
                 f'The login token "{self.login_token}" used the function create_user but the user.user_role '
                 f'"{user.user_role}" that was sent does not exist in the db.')
@@ -137,7 +185,7 @@ class FacadeBase(ABC):
         return True
 
     def get_all_countries(self):
-        return self.repo.get_all(Country)
+        return self.reference_cache.get_objects(self.repo, Country)
 
     def get_country_by_id(self, id_):
         if not isinstance(id_, int):
@@ -150,5 +198,6 @@ class FacadeBase(ABC):
                 f'The login token "{self.login_token}" used the function get_country_by_id but the id "{id_}" that was '
                 f'sent is not positive.')
             raise NotValidDataError
-        return self.repo.get_by_condition(Country, lambda query: query.filter(Country.id == id_).all())
+        country = self.reference_cache.get_by_id(self.repo, Country, id_)
+        return [Country(**country)] if country else []
 
@@ -1,13 +1,204 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context, g
 from flask_cors import CORS
 from facades.AnonymousFacade import AnonymousFacade
 from data_access_objects.DbRepoPool import DbRepoPool
+from custom_errors.NotValidDataError import NotValidDataError
+from custom_errors.WrongLoginDataError import WrongLoginDataError
+from custom_errors.WrongLoginTokenError import WrongLoginTokenError
+from custom_errors.NoRemainingTicketsError import NoRemainingTicketsError
+from custom_errors.NotLegalFlightTimesError import NotLegalFlightTimesError
+from custom_errors.NoAvailableConnectionError import NoAvailableConnectionError
+from cache.BoardCache import BoardCache
+from cache.DataVersion import DataVersion
+from serializers.FlightsSerializer import FlightsSerializer
+from serializers.EntitySchema import EntitySchema
+from serializers.Schemas import user_schema, customer_schema, airline_schema, administrator_schema, flight_schema, \
+    ticket_schema, booking_schema
+from live.BoardBroadcaster import BoardBroadcaster
+from booking.BookingPublisher import BookingPublisher
+from tables.Ticket import Ticket
+from login_token.LoginTokenSigner import LoginTokenSigner
+from metrics.Metrics import Metrics
+from datetime import datetime
+import orjson
+import time
 
 
 app = Flask(__name__)
 CORS(app)
 
 repool = DbRepoPool.get_instance()
+board_cache = BoardCache.get_instance()
+data_version = DataVersion.get_instance()
+broadcaster = BoardBroadcaster.get_instance()
+
+PAGE_LIMIT_DEFAULT = 100
+PAGE_LIMIT_MAX = 1000
+STREAM_BATCH_SIZE = 1000  # rows fetched from the server side cursor and written to the response at a time
+CHECKOUT_TIMEOUT = 5  # seconds a request waits for a free repo before it gets a 503
+
+
+def get_page_args():  # ?after_id=&limit= - keyset pagination, the client sends the last id it has seen
+    after_id = request.args.get('after_id', type=int)
+    limit = request.args.get('limit', type=int)
+    if after_id is not None and limit is None:
+        limit = PAGE_LIMIT_DEFAULT
+    if limit is not None:
+        limit = min(limit, PAGE_LIMIT_MAX)
+    return after_id, limit
+
+
+def not_modified(etag):  # checked before a repo is taken from the pool, a 304 never touches the db
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def payload_response(payload, limit, etag):  # the payload bytes are written as they are, no per row work
+    if payload.gzipped is not None and request.accept_encodings.quality('gzip') > 0:  # not gzip;q=0
+        response = Response(payload.gzipped, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(payload.body, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'  # the browser keeps the body but always revalidates the etag
+    response.set_etag(etag, weak=True)
+    if limit is not None and payload.count == limit:  # there may be more flights after this page
+        response.headers['X-Next-After-Id'] = str(payload.last_id)
+    return response
+
+
+def stream_flights(etag):  # writes one JSON array in chunks, so the memory stays flat for any number of flights
+    repo = repool.get_connection(CHECKOUT_TIMEOUT)  # before the headers are sent, so an exhausted pool is still a 503
+    released = []
+
+    def release():  # once - from the generator, or when the response is closed before its body was read
+        if not released:
+            released.append(True)
+            repool.return_connection(repo)
+
+    def generate():
+        try:
+            anonfcade = AnonymousFacade(repo)
+            yield b'['
+            chunk = []
+            separator = b''
+            for row in anonfcade.stream_all_flights(STREAM_BATCH_SIZE, web_rows=True):
+                chunk.append(row)
+                if len(chunk) == STREAM_BATCH_SIZE:
+                    yield separator + FlightsSerializer.encode_items(chunk)
+                    separator = b','
+                    chunk = []
+            if chunk:
+                yield separator + FlightsSerializer.encode_items(chunk)
+            yield b']'
+        finally:
+            release()
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    response.call_on_close(release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def live_board(kind, hours_num):  # text/event-stream of a snapshot and then only the row deltas of one board
+    country_id = request.args.get('country_id', type=int)
+    if country_id is not None and country_id <= 0:
+        raise NotValidDataError(f'The country_id "{country_id}" that was sent is not a positive integer.')
+    subscription = broadcaster.subscribe((kind, hours_num, country_id))
+    if subscription is None:  # the live clients of this worker hold enough request threads, the client polls instead
+        return jsonify({'error': f'Too many live board clients, poll /{kind}/{hours_num} instead.'}), 503, \
+            {'Retry-After': str(int(BoardBroadcaster.REFRESH_SECONDS))}
+
+    def generate():
+        try:
+            yield f'retry: {int(BoardBroadcaster.REFRESH_SECONDS * 1000)}\n\n'.encode()
+            while True:
+                event = subscription.get(BoardBroadcaster.KEEPALIVE_SECONDS)
+                yield event if event is not None else b': keepalive\n\n'  # also finds the clients that left
+        finally:
+            broadcaster.unsubscribe(subscription)
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # a proxy must not buffer the events
+    return response
+
+
+def login_facade(repo, role):  # the facade of the Authorization header user, if its role is the route role
+    auth = request.headers.get('Authorization', '')
+    if auth.startswith('Bearer '):  # a token from /login - the facade is rebuilt from it without any db query
+        try:
+            login_token = LoginTokenSigner.load(auth[len('Bearer '):])
+        except WrongLoginTokenError as e:  # a changed or expired token is a 401, the client has to log in again
+            raise WrongLoginDataError(str(e))
+        # one primary key query on writes, else a deleted user's write fails on its foreign key as a 500
+        if request.method != 'GET' and login_token.role == role and not AnonymousFacade(repo).login_token_exists(login_token):
+            raise WrongLoginDataError('The user of the login token does not exist anymore.')
+    else:  # HTTP basic - a login query on every request
+        basic = request.authorization
+        if basic is None or basic.username is None:
+            raise WrongLoginDataError
+        login_token = AnonymousFacade(repo).get_login_token(basic.username, basic.password)
+    if login_token.role != role:
+        raise WrongLoginTokenError
+    return AnonymousFacade.facade_by_login_token(login_token, repo)
+
+
+def json_body():
+    return EntitySchema.parse(request.get_data())
+
+
+def json_response(body, status=200):  # body is the encoded JSON bytes
+    return Response(body, status=status, mimetype='application/json')
+
+
+def done(status=200):
+    return json_response(b'{"success":true}', status)
+
+
+@app.before_request
+def start_timer():
+    g.request_start_time = time.perf_counter()
+
+
+@app.after_request
+def observe_latency(response):  # by the route rule, not the url, so /departures/<int:hours_num> is one series
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    Metrics.observe_request(route, request.method, response.status_code, time.perf_counter() - g.request_start_time)
+    return response
+
+
+@app.errorhandler(NotValidDataError)
+def not_valid_data(e):
+    return jsonify({'error': str(e)}), 400
+
+
+@app.errorhandler(NotLegalFlightTimesError)
+def not_legal_flight_times(e):
+    return jsonify({'error': str(e)}), 400
+
+
+@app.errorhandler(WrongLoginDataError)
+def wrong_login_data(e):
+    return jsonify({'error': str(e)}), 401, {'WWW-Authenticate': 'Basic realm="flights"'}
+
+
+@app.errorhandler(WrongLoginTokenError)
+def wrong_login_token(e):
+    return jsonify({'error': str(e)}), 403
+
+
+@app.errorhandler(NoRemainingTicketsError)
+def no_remaining_tickets(e):
+    return jsonify({'error': str(e)}), 409
+
+
+@app.errorhandler(NoAvailableConnectionError)
+def no_available_connection(e):  # the pool is exhausted, the client should retry instead of piling up on the server
+    return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
 
 
 @app.route("/")
@@ -15,6 +206,11 @@ def home():
     return render_template('home.html')
 
 
+@app.route("/metrics")
+def metrics():  # Prometheus text exposition format
+    return Response(Metrics.render(), content_type=Metrics.CONTENT_TYPE)
+
+
 @app.route("/flights/tables")
 def flights_tables():
     return render_template('flights_tables.html')
@@ -22,42 +218,259 @@ def flights_tables():
 
 @app.route("/flights", methods=['GET'])
 def get_all_flights():
-    repo = repool.get_connection()  # getting a repo
-    anonfcade = AnonymousFacade(repo)
-    all_flights = anonfcade.get_all_flights()
-    if all_flights:
-        flights = [flight.data_for_web() for flight in all_flights]
-    else:
-        flights = []
-    repool.return_connection(repo)  # returning the repo
-    return jsonify(flights)
+    # the version is bumped by the writes of the api processes only - booking_worker.py and the data generation write
+    # too, so the etag is also bucketed by the board cache TTL and their writes are seen within it, like on the boards
+    etag = data_version.etag(data_version.get(), BoardCache.TTL)
+    response = not_modified(etag)
+    if response:
+        return response
+    if request.args.get('stream'):
+        return stream_flights(etag)
+    after_id, limit = get_page_args()
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:  # the repo is returned to the pool even if an exception is raised
+        anonfcade = AnonymousFacade(repo)  # plain row tuples with the names joined in the same query
+        rows = anonfcade.get_all_flights(after_id=after_id, limit=limit, web_rows=True) or []
+    return payload_response(FlightsSerializer.payload(rows), limit, etag)
+
+
+@app.route("/flights/search", methods=['GET'])
+def search_flights():  # ?origin_country_id=&destination_country_id=&date=YYYY-MM-DD
+    origin_country_id = request.args.get('origin_country_id', type=int)
+    destination_country_id = request.args.get('destination_country_id', type=int)
+    date = EntitySchema.check_value('date', datetime, request.args.get('date'))
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        flights = AnonymousFacade(repo).get_flights_by_parameters(origin_country_id, destination_country_id, date)
+        return json_response(flight_schema.dump(flights))
 
 
 @app.route("/arrivals/<int:hours_num>", methods=['GET'])
 def get_arrival_flights_by_delta_t(hours_num):
-    repo = repool.get_connection()  # getting a repo
-    anonfcade = AnonymousFacade(repo)
-    arrivals = anonfcade.get_arrival_flights_by_delta_t(hours_num)
-    if arrivals:
-        flights = [flight.data_for_web() for flight in arrivals]
-    else:
-        flights = []
-    repool.return_connection(repo)  # returning the repo
-    return jsonify(flights)
+    # the boards also change as the time passes, so their etag is bucketed by the board cache TTL
+    version = data_version.get()  # read before the query, a write during it makes the next request miss
+    response = not_modified(data_version.etag(version, BoardCache.TTL))
+    if response:
+        return response
+    after_id, limit = get_page_args()
+    country_id = request.args.get('country_id', type=int)
+
+    def compute():
+        with repool.connection(CHECKOUT_TIMEOUT) as repo:  # the repo is returned to the pool even if an exception is raised
+            anonfcade = AnonymousFacade(repo)
+            arrivals = anonfcade.get_arrival_flights_by_delta_t(hours_num, after_id=after_id, limit=limit,
+                                                                country_id=country_id, web_rows=True) or []
+        return FlightsSerializer.payload(arrivals, compress=True, version=version)
+
+    # identical board requests in the TTL share one db query and one encoding, a write through the facades invalidates them
+    # (the version is in the key, so a write in another worker process also makes the next request miss)
+    payload = board_cache.get_or_compute(('arrivals', hours_num, country_id, after_id, limit, version), compute)
+    return payload_response(payload, limit, data_version.etag(payload.version, BoardCache.TTL))
 
 
 @app.route("/departures/<int:hours_num>", methods=['GET'])
 def get_departure_flights_by_delta_t(hours_num):
-    print(type(hours_num))
-    repo = repool.get_connection()  # getting a repo
-    anonfcade = AnonymousFacade(repo)
-    departures = anonfcade.get_departure_flights_by_delta_t(hours_num)
-    if departures:
-        flights = [flight.data_for_web() for flight in departures]
-    else:
-        flights = []
-    repool.return_connection(repo)  # returning the repo
-    return jsonify(flights)
+    # the boards also change as the time passes, so their etag is bucketed by the board cache TTL
+    version = data_version.get()  # read before the query, a write during it makes the next request miss
+    response = not_modified(data_version.etag(version, BoardCache.TTL))
+    if response:
+        return response
+    after_id, limit = get_page_args()
+    country_id = request.args.get('country_id', type=int)
+
+    def compute():
+        with repool.connection(CHECKOUT_TIMEOUT) as repo:  # the repo is returned to the pool even if an exception is raised
+            anonfcade = AnonymousFacade(repo)
+            departures = anonfcade.get_departure_flights_by_delta_t(hours_num, after_id=after_id, limit=limit,
+                                                                    country_id=country_id, web_rows=True) or []
+        return FlightsSerializer.payload(departures, compress=True, version=version)
+
+    # identical board requests in the TTL share one db query and one encoding, a write through the facades invalidates them
+    # (the version is in the key, so a write in another worker process also makes the next request miss)
+    payload = board_cache.get_or_compute(('departures', hours_num, country_id, after_id, limit, version), compute)
+    return payload_response(payload, limit, data_version.etag(payload.version, BoardCache.TTL))
+
+
+@app.route("/arrivals/<int:hours_num>/live", methods=['GET'])
+def live_arrivals(hours_num):
+    # one producer reads each watched board for all its screens, so the db load does not grow with the screens
+    return live_board('arrivals', hours_num)
+
+
+@app.route("/departures/<int:hours_num>/live", methods=['GET'])
+def live_departures(hours_num):
+    # one producer reads each watched board for all its screens, so the db load does not grow with the screens
+    return live_board('departures', hours_num)
+
+
+@app.route("/login", methods=['POST'])
+def login():  # {"username": ..., "password": ...} -> a signed token for the Authorization: Bearer header
+    data = json_body()
+    username = EntitySchema.check_value('username', str, data.get('username'))
+    password = EntitySchema.check_value('password', str, data.get('password'))
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_token = AnonymousFacade(repo).get_login_token(username, password)
+    return json_response(orjson.dumps({'token': LoginTokenSigner.sign(login_token), 'expires_in': LoginTokenSigner.TTL,
+                                       'id': login_token.id, 'name': login_token.name, 'role': login_token.role}))
+
+
+@app.route("/customers", methods=['POST'])
+def sign_up_customer():  # {"user": {...}, "customer": {...}}
+    data = json_body()
+    user = user_schema.load(data.get('user'), user_role=1)
+    customer = customer_schema.load(data.get('customer'))
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:  # the repo is returned to the pool even if an exception is raised
+        AnonymousFacade(repo).add_customer(user, customer)
+        return json_response(customer_schema.dump_one(customer), 201)
+
+
+@app.route("/customer", methods=['PUT'])
+def update_customer():
+    customer = customer_schema.load(json_body())
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'customers').update_customer(customer)
+    return done()
+
+
+@app.route("/customer/tickets", methods=['GET'])
+def get_customer_tickets():
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        tickets = login_facade(repo, 'customers').get_tickets_by_customer()
+        return json_response(ticket_schema.dump(tickets))
+
+
+@app.route("/customer/tickets", methods=['POST'])
+def add_customer_ticket():
+    ticket = ticket_schema.load(json_body())
+    if BookingPublisher.ASYNC:  # queued - no flight row lock in the request, the client polls the booking
+        with repool.connection(CHECKOUT_TIMEOUT) as repo:  # only the pending booking, not the publish, holds the repo
+            facade = login_facade(repo, 'customers')
+            booking_id = facade.request_ticket(ticket)
+        try:
+            BookingPublisher.get_instance().request(booking_id, facade.login_token.id, ticket.flight_id)
+        except Exception:  # not queued, the client is answered failed instead of pending forever
+            with repool.connection(CHECKOUT_TIMEOUT) as repo:
+                repo.fail_booking(booking_id)
+            raise
+        response = json_response(orjson.dumps({'id': booking_id, 'flight_id': ticket.flight_id, 'status': 'pending'}), 202)
+        response.headers['Location'] = f'/customer/bookings/{booking_id}'
+        return response
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'customers').add_ticket(ticket)
+        return json_response(ticket_schema.dump_one(ticket), 201)
+
+
+@app.route("/customer/bookings/<booking_id>", methods=['GET'])
+def get_customer_booking(booking_id):  # status pending while queued, then booked, sold_out, duplicate, not_found or failed
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        booking = login_facade(repo, 'customers').get_booking(booking_id)
+        if booking is None:  # never requested by this customer
+            return jsonify({'error': f'There is no booking {booking_id}.'}), 404
+        response = json_response(booking_schema.dump_one(booking))
+        if booking.status == 'pending':
+            response.headers['Retry-After'] = '1'
+        return response
+
+
+@app.route("/customer/tickets/<int:flight_id>", methods=['DELETE'])
+def remove_customer_ticket(flight_id):
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'customers').remove_ticket(Ticket(flight_id=flight_id))
+    return done()
+
+
+@app.route("/airline", methods=['PUT'])
+def update_airline():
+    airline = airline_schema.load(json_body())
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'airline_companies').update_airline(airline)
+    return done()
+
+
+@app.route("/airline/flights", methods=['GET'])
+def get_airline_flights():
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        flights = login_facade(repo, 'airline_companies').get_airline_flights()
+        return json_response(flight_schema.dump(flights))
+
+
+@app.route("/airline/flights", methods=['POST'])
+def add_airline_flight():
+    flight = flight_schema.load(json_body())
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'airline_companies').add_flight(flight)
+        return json_response(flight_schema.dump_one(flight), 201)
+
+
+@app.route("/airline/flights/<int:flight_id>", methods=['PUT'])
+def update_airline_flight(flight_id):
+    flight = flight_schema.load(json_body(), id=flight_id)
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'airline_companies').update_flight(flight)
+    return done()
+
+
+@app.route("/airline/flights/<int:flight_id>", methods=['DELETE'])
+def remove_airline_flight(flight_id):
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'airline_companies').remove_flight(flight_id)
+    return done()
+
+
+@app.route("/admin/customers", methods=['GET'])
+def get_all_customers():
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        customers = login_facade(repo, 'administrators').get_all_customers()
+        return json_response(customer_schema.dump(customers))
+
+
+@app.route("/admin/customers", methods=['POST'])
+def add_customer():  # {"user": {...}, "customer": {...}}
+    data = json_body()
+    user = user_schema.load(data.get('user'), user_role=1)
+    customer = customer_schema.load(data.get('customer'))
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'administrators').add_customer(user, customer)
+        return json_response(customer_schema.dump_one(customer), 201)
+
+
+@app.route("/admin/customers/<int:customer_id>", methods=['DELETE'])
+def remove_customer(customer_id):
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'administrators').remove_customer(customer_id)
+    return done()
+
+
+@app.route("/admin/airlines", methods=['POST'])
+def add_airline():  # {"user": {...}, "airline": {...}}
+    data = json_body()
+    user = user_schema.load(data.get('user'), user_role=2)
+    airline = airline_schema.load(data.get('airline'))
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'administrators').add_airline(user, airline)
+        return json_response(airline_schema.dump_one(airline), 201)
+
+
+@app.route("/admin/airlines/<int:airline_id>", methods=['DELETE'])
+def remove_airline(airline_id):
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'administrators').remove_airline(airline_id)
+    return done()
+
+
+@app.route("/admin/administrators", methods=['POST'])
+def add_administrator():  # {"user": {...}, "administrator": {...}}
+    data = json_body()
+    user = user_schema.load(data.get('user'), user_role=3)
+    administrator = administrator_schema.load(data.get('administrator'))
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'administrators').add_administrator(user, administrator)
+        return json_response(administrator_schema.dump_one(administrator), 201)
+
+
+@app.route("/admin/administrators/<int:administrator_id>", methods=['DELETE'])
+def remove_administrator(administrator_id):
+    with repool.connection(CHECKOUT_TIMEOUT) as repo:
+        login_facade(repo, 'administrators').remove_administrator(administrator_id)
+    return done()
 
 
 if __name__ == '__main__':
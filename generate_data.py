@@ -0,0 +1,83 @@
+from DbDataObject import DbDataObject
+from ShardedDataGen import ShardedDataGen
+from data_access_objects.DbRepoPool import DbRepoPool
+from tables.Generation_Job import Generation_Job
+from custom_errors.DbGenDataNotValidError import DbGenDataNotValidError
+import argparse
+import json
+import sys
+import time
+
+# run from the project root - the DbDataObject pipeline in this process, without the Kivy window and RabbitMQ:
+#   python generate_data.py --airlines 100 --customers 1000000 --flights-per-airline 1000 --tickets-per-customer 3
+#       [--scale 0.1] [--seed 7] [--processes 8] [--engine sharded|api] [--json timings.json]
+# WARNING - the tables are truncated first (reset_all_tables_auto_inc), --job-id resumes a job without truncating
+
+
+def print_progress(message):
+    if message.get('eta_s') is not None:
+        print(f'\r{message["stage"]:<10} {message["percent"]:>3}%  {message["rows_done"]:>12,} rows  '
+              f'{message["rows_per_sec"]:>10,} rows/s  ETA {message["eta_s"]:>7}s', end='', flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the flights db data headless.')
+    parser.add_argument('--airlines', type=int, default=10)
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--flights-per-airline', type=int, default=100)
+    parser.add_argument('--tickets-per-customer', type=int, default=2)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplies the customers and the flights per airline')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engine', choices=['sharded', 'api'], default='sharded',
+                        help='sharded - synthetic users, api - randomuser.me users')
+    parser.add_argument('--processes', type=int, help='default - [data_gen] processes in config.conf')
+    parser.add_argument('--batch-rows', type=int, help='default - [data_gen] batch_rows in config.conf')
+    parser.add_argument('--job-id', help='resume this job of the sharded engine, with its saved sizes and seed')
+    parser.add_argument('--json', help='save the sizes and the stage timings as JSON')
+    args = parser.parse_args()
+
+    if args.processes:
+        ShardedDataGen.PROCESSES = args.processes
+    if args.batch_rows:
+        ShardedDataGen.BATCH_ROWS = args.batch_rows
+    sizes = {'customers': max(1, round(args.customers * args.scale)), 'airlines': args.airlines,
+             'flights_per_airline': max(1, round(args.flights_per_airline * args.scale)),
+             'tickets_per_customer': args.tickets_per_customer, 'seed': args.seed}
+    if args.job_id:
+        with DbRepoPool.get_instance().connection() as repo:
+            jobs = repo.get_by_column_value(Generation_Job, Generation_Job.id, args.job_id)
+        if not jobs:
+            sys.exit(f'There is no job {args.job_id}.')
+        sizes = json.loads(jobs[0].params)
+        sizes.pop('job_id')
+    db_data = DbDataObject(**sizes, job_id=args.job_id, progress=print_progress, engine=args.engine)
+    try:
+        db_data.validate_data()
+    except DbGenDataNotValidError:
+        sys.exit('The sizes are not valid: 1-150 airlines, and at least tickets per customer flights.')
+    if not args.job_id:
+        with DbRepoPool.get_instance().connection() as repo:
+            repo.reset_all_tables_auto_inc()
+
+    start = time.perf_counter()
+    status = db_data.generate_data()
+    elapsed = time.perf_counter() - start
+    print()
+    print(f'job {db_data.job_id}: {status} in {elapsed:.2f}s')
+    for stage, (seconds, rows) in db_data.timings.items():
+        rate = f'{rows / seconds:>12,.0f} rows/s' if rows and seconds else ''
+        print(f'    {stage:<18}{seconds:>9.2f}s {rows:>12,} rows {rate}')
+    rows = sum(rows for seconds, rows in db_data.timings.values() if rows)
+    if rows:
+        print(f'    {"total":<18}{elapsed:>9.2f}s {rows:>12,} rows {rows / elapsed:>12,.0f} rows/s')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'job_id': db_data.job_id, 'status': status, 'sizes': db_data.__dict__(), 'elapsed_s': elapsed,
+                       'stages': {stage: {'seconds': seconds, 'rows': rows}
+                                  for stage, (seconds, rows) in db_data.timings.items()}}, f, indent=2)
+    if status != 'done':
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
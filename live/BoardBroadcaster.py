@@ -0,0 +1,146 @@
+from data_access_objects.DbRepoPool import DbRepoPool
+from facades.AnonymousFacade import AnonymousFacade
+from serializers.FlightsSerializer import FlightsSerializer
+from cache.DataVersion import DataVersion
+from logger.Logger import Logger
+from configparser import ConfigParser
+import threading
+import queue
+import time
+
+
+class BoardSubscription:  # one live board client, reads the encoded events from its own queue
+
+    def __init__(self, key, queue_size):
+        self.key = key
+        self.events = queue.Queue(queue_size)
+        self.needs_snapshot = True
+
+    def get(self, timeout):  # the next event, or None when nothing happened in the timeout
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:  # a slow client - its missed deltas are replaced by a new snapshot
+            while True:
+                try:
+                    self.events.get_nowait()
+                except queue.Empty:
+                    break
+            self.needs_snapshot = True
+
+
+class BoardBroadcaster:  # one producer thread reads every live board once and fans the deltas out to all its clients
+
+    _instance = None
+    _lock = threading.Lock()
+
+    config = ConfigParser()
+    config.read("config.conf")
+    POLL_SECONDS = float(config["live"]["poll_seconds"])
+    REFRESH_SECONDS = float(config["live"]["refresh_seconds"])
+    KEEPALIVE_SECONDS = float(config["live"]["keepalive_seconds"])
+    SUBSCRIBER_QUEUE_SIZE = int(config["live"]["subscriber_queue_size"])
+    MAX_SUBSCRIBERS = int(config["live"]["max_subscribers"])
+
+    def __init__(self):
+        raise RuntimeError('Call instance() instead')
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance:
+            return cls._instance
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls.__new__(cls)
+                cls._instance.logger = Logger.get_instance()
+                cls._instance.repool = DbRepoPool.get_instance()
+                cls._instance.data_version = DataVersion.get_instance()
+                cls._instance._boards = {}  # key -> {'rows': {flight id: row} or None, 'subscribers': set()}
+                cls._instance._boards_lock = threading.Lock()
+                cls._instance._wake = threading.Event()
+                cls._instance._producer = None
+            return cls._instance
+
+    def subscribe(self, key):  # key is (kind, hours_num, country_id), kind is 'departures' or 'arrivals'
+        # None when this process already has MAX_SUBSCRIBERS clients, every client holds a request thread
+        subscription = BoardSubscription(key, self.SUBSCRIBER_QUEUE_SIZE)
+        with self._boards_lock:
+            if sum(len(board['subscribers']) for board in self._boards.values()) >= self.MAX_SUBSCRIBERS:
+                return None
+            board = self._boards.setdefault(key, {'rows': None, 'subscribers': set()})
+            board['subscribers'].add(subscription)
+            if board['rows'] is not None:  # a board other clients already watch - the snapshot is sent right away
+                subscription.put(FlightsSerializer.encode_snapshot_event(board['rows'].values()))
+                subscription.needs_snapshot = False
+            if self._producer is None:
+                self._producer = threading.Thread(target=self._run, name='BoardBroadcaster', daemon=True)
+                self._producer.start()
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._boards_lock:
+            board = self._boards.get(subscription.key)
+            if board:
+                board['subscribers'].discard(subscription)
+                if not board['subscribers']:  # nobody watches this board anymore, it is not read again
+                    del self._boards[subscription.key]
+
+    def _run(self):
+        last_version = None
+        last_refresh = 0.0
+        while True:
+            self._wake.wait(self.POLL_SECONDS)
+            self._wake.clear()
+            version = self.data_version.get()
+            with self._boards_lock:
+                keys = list(self._boards)
+                new_keys = [key for key in keys if self._boards[key]['rows'] is None]
+            if version != last_version or time.monotonic() - last_refresh >= self.REFRESH_SECONDS:
+                last_version = version
+                last_refresh = time.monotonic()
+            elif new_keys:
+                keys = new_keys
+            else:
+                continue
+            for key in keys:
+                try:
+                    self._refresh(key)
+                except Exception as e:  # one bad board must not stop the producer of all the others
+                    self.logger.logger.error(f'The live board {key} could not be refreshed: {e}')
+
+    def _fetch(self, key):
+        kind, hours_num, country_id = key
+        with self.repool.connection() as repo:
+            anonfcade = AnonymousFacade(repo)
+            if kind == 'departures':
+                rows = anonfcade.get_departure_flights_by_delta_t(hours_num, country_id=country_id, web_rows=True)
+            else:
+                rows = anonfcade.get_arrival_flights_by_delta_t(hours_num, country_id=country_id, web_rows=True)
+        return {row[0]: tuple(row) for row in rows or []}
+
+    def _refresh(self, key):
+        rows = self._fetch(key)
+        with self._boards_lock:
+            board = self._boards.get(key)
+            if board is None:  # all the clients left while the board was read
+                return
+            old_rows = board['rows'] or {}
+            board['rows'] = rows
+            added = [row for id_, row in rows.items() if id_ not in old_rows]
+            changed = [row for id_, row in rows.items() if id_ in old_rows and old_rows[id_] != row]
+            removed = [id_ for id_ in old_rows if id_ not in rows]
+            delta = FlightsSerializer.encode_delta_event(added, changed, removed) if added or changed or removed else None
+            snapshot = None
+            for subscription in board['subscribers']:
+                if subscription.needs_snapshot:
+                    snapshot = snapshot or FlightsSerializer.encode_snapshot_event(rows.values())
+                    subscription.needs_snapshot = False
+                    subscription.put(snapshot)
+                elif delta:
+                    subscription.put(delta)
@@ -0,0 +1,54 @@
+from login_token.LoginToken import LoginToken
+from custom_errors.WrongLoginTokenError import WrongLoginTokenError
+from configparser import ConfigParser
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+import hashlib
+import os
+import hmac
+import time
+import orjson
+
+
+class LoginTokenSigner:  # a LoginToken as a signed, expiring string, so a request is authenticated without the db
+
+    config = ConfigParser()
+    config.read("config.conf")
+    DEFAULT_SECRET_KEY = 'change-me-flights-token-secret'  # the development key in config.conf
+    # the FLIGHTS_TOKEN_SECRET_KEY environment variable overrides config.conf, so the key does not have to be in a file
+    SECRET_KEY = os.environ.get('FLIGHTS_TOKEN_SECRET_KEY', config["auth"]["secret_key"]).encode()
+    TTL = int(config["auth"]["token_ttl"])
+
+    @classmethod
+    def has_default_key(cls):  # anyone can sign an administrator token with the default or an empty key
+        return cls.SECRET_KEY in (b'', cls.DEFAULT_SECRET_KEY.encode())
+
+    @staticmethod
+    def _b64encode(data):
+        return urlsafe_b64encode(data).rstrip(b'=')
+
+    @staticmethod
+    def _b64decode(data):
+        return urlsafe_b64decode(data + b'=' * (-len(data) % 4))
+
+    @classmethod
+    def _signature(cls, payload):
+        return cls._b64encode(hmac.new(cls.SECRET_KEY, payload, hashlib.sha256).digest())
+
+    @classmethod
+    def sign(cls, login_token, ttl=None):  # <base64 payload>.<base64 signature>, the payload is not encrypted
+        payload = cls._b64encode(orjson.dumps({'id': login_token.id, 'name': login_token.name, 'role': login_token.role,
+                                               'exp': int(time.time()) + (cls.TTL if ttl is None else ttl)}))
+        return (payload + b'.' + cls._signature(payload)).decode()
+
+    @classmethod
+    def load(cls, token):  # the LoginToken of a token from sign(), WrongLoginTokenError if it was changed or expired
+        try:
+            payload, signature = token.encode().split(b'.')
+        except (AttributeError, UnicodeError, ValueError):
+            raise WrongLoginTokenError('The login token is not valid.')
+        if not hmac.compare_digest(signature, cls._signature(payload)):
+            raise WrongLoginTokenError('The login token is not valid.')
+        data = orjson.loads(cls._b64decode(payload))
+        if data['exp'] < time.time():
+            raise WrongLoginTokenError('The login token has expired.')
+        return LoginToken(data['id'], data['name'], data['role'])
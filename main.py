@@ -1,10 +1,13 @@
-from db_config import local_session, create_all_entities
+from db_config import local_session, create_all_entities, create_all_indexes
 from data_access_objects.DbRepo import DbRepo
+from tables.Generation_Job import Generation_Job  # the tables that no DbRepo query imports, for create_all_entities
+from tables.Generation_Job_Batch import Generation_Job_Batch
 
 
 # creating the db
 repo = DbRepo(local_session)
 create_all_entities()  # create tables if not exist
+create_all_indexes()  # create indexes if not exist (also on tables that already existed)
 repo.create_all_sp('sp_flights_db.sql')
 repo.reset_all_tables_auto_inc()
 
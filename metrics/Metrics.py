@@ -0,0 +1,84 @@
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, generate_latest, multiprocess
+from prometheus_client import CONTENT_TYPE_LATEST
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import functools
+import inspect
+import os
+import time
+
+# with the PROMETHEUS_MULTIPROC_DIR environment variable set (server.py sets it) the values are written to files in it,
+# so /metrics of any worker process shows the sums of all the workers
+
+
+class Metrics:  # the Prometheus metrics of the api, exposed by flask_rest_api.py at /metrics
+
+    CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+    REQUEST_LATENCY = Histogram('flights_http_request_duration_seconds', 'Flask request latency by route.',
+                                ['route', 'method', 'status'],
+                                buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+    POOL_WAIT = Histogram('flights_db_pool_wait_seconds', 'Time waited for a free DbRepo in the DbRepoPool.',
+                          buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+    POOL_IN_USE = Gauge('flights_db_pool_in_use', 'DbRepo objects checked out of the DbRepoPool.',
+                        multiprocess_mode='liveall')
+    POOL_SIZE = Gauge('flights_db_pool_size', 'DbRepo objects in the DbRepoPool.', multiprocess_mode='liveall')
+    POOL_CHECKOUT_FAILURES = Counter('flights_db_pool_checkout_failures', 'DbRepoPool checkouts that timed out.')
+    SQL_QUERY = Histogram('flights_sql_query_duration_seconds', 'SQL statement duration by statement type.',
+                          ['statement'],
+                          buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+    FACADE_CALLS = Counter('flights_facade_calls', 'Facade method calls.', ['facade', 'method'])
+    FACADE_ERRORS = Counter('flights_facade_errors', 'Facade method calls that raised, by exception type.',
+                            ['facade', 'method', 'error'])
+
+    @classmethod
+    def observe_request(cls, route, method, status, seconds):
+        cls.REQUEST_LATENCY.labels(route, method, status).observe(seconds)
+
+    @classmethod
+    def render(cls):  # the text exposition format
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
+        return generate_latest(REGISTRY)
+
+    @classmethod
+    def instrument_facade(cls, facade_class):  # class decorator - counts the calls and errors of the public methods
+        for name, value in list(vars(facade_class).items()):
+            if not name.startswith('_') and inspect.isfunction(value):
+                setattr(facade_class, name, cls._count_calls(value))
+        return facade_class
+
+    @classmethod
+    def _count_calls(cls, method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            facade = type(self).__name__  # the subclass, also for the methods of FacadeBase
+            cls.FACADE_CALLS.labels(facade, name).inc()
+            try:
+                return method(self, *args, **kwargs)
+            except Exception as e:
+                cls.FACADE_ERRORS.labels(facade, name, type(e).__name__).inc()
+                raise
+        return wrapper
+
+
+# listened on the Engine class, so the engines made by db_config.reinit_engine in the workers are timed too
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info['query_start_time'].pop()
+    Metrics.SQL_QUERY.labels((statement.split(None, 1) or ['EMPTY'])[0].upper()).observe(seconds)  # SELECT, UPDATE...
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):  # a failed statement has no after_cursor_execute
+    if exception_context.connection is not None and exception_context.connection.info.get('query_start_time'):
+        exception_context.connection.info['query_start_time'].pop()
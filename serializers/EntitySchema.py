@@ -0,0 +1,55 @@
+from custom_errors.NotValidDataError import NotValidDataError
+from datetime import datetime
+import orjson
+
+
+class EntitySchema:  # checks a JSON request body against the fields it declares, and dumps table objects to JSON bytes
+
+    def __init__(self, table_class, fields, dump_fields=None):
+        self.table_class = table_class
+        self.fields = fields  # ((name, type), ...) - all of them are required, the other keys of the body are ignored
+        self.dump_fields = dump_fields or tuple(column.name for column in table_class.__table__.columns)
+
+    @staticmethod
+    def parse(body):  # the request body bytes -> a JSON object
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            raise NotValidDataError('The request body is not valid JSON.')
+        if not isinstance(data, dict):
+            raise NotValidDataError('The request body must be a JSON object.')
+        return data
+
+    @staticmethod
+    def check_value(name, type_, value):
+        if type_ is int:
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+        elif type_ is str:
+            if isinstance(value, str) and value.strip():
+                return value
+        elif type_ is datetime:
+            if isinstance(value, str):
+                try:
+                    return datetime.fromisoformat(value)
+                except ValueError:
+                    pass
+        raise NotValidDataError(f'The field "{name}" must be a {"non empty string" if type_ is str else type_.__name__}.')
+
+    def load(self, data, **values):  # a JSON object -> a new table object, values are set by the caller and not by the body
+        if not isinstance(data, dict):
+            raise NotValidDataError(f'The {self.table_class.__tablename__} data must be a JSON object.')
+        for name, type_ in self.fields:
+            if name not in data:
+                raise NotValidDataError(f'The field "{name}" is missing.')
+            values[name] = self.check_value(name, type_, data[name])
+        return self.table_class(**values)
+
+    def to_dict(self, obj):
+        return {field: getattr(obj, field) for field in self.dump_fields}
+
+    def dump_one(self, obj):
+        return orjson.dumps(self.to_dict(obj))
+
+    def dump(self, objects):  # orjson writes the datetime columns as ISO 8601 strings
+        return orjson.dumps([self.to_dict(obj) for obj in objects])
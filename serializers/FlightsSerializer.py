@@ -0,0 +1,52 @@
+from configparser import ConfigParser
+import gzip
+import orjson
+
+
+class FlightsPayload:  # an encoded flights response body, built once and then served as is
+
+    def __init__(self, body, count, last_id, gzipped=None, version=None):
+        self.body = body
+        self.count = count
+        self.last_id = last_id
+        self.gzipped = gzipped
+        self.version = version  # the DataVersion of the flights data the payload was read from
+
+
+class FlightsSerializer:  # encodes the DbRepo.flights_web_query row tuples straight to JSON bytes
+
+    fields = ('id', 'airline_company', 'origin_country', 'destination_country', 'departure_time', 'landing_time',
+              'remaining_tickets')  # the order of the flights_web_query columns
+
+    config = ConfigParser()
+    config.read("config.conf")
+    GZIP_MIN_SIZE = int(config["web"]["gzip_min_size"])
+    GZIP_LEVEL = int(config["web"]["gzip_level"])
+
+    @classmethod
+    def encode(cls, rows):  # orjson writes the datetime columns as ISO 8601 strings
+        return orjson.dumps([dict(zip(cls.fields, row)) for row in rows])
+
+    @classmethod
+    def encode_items(cls, rows):  # the array items without the brackets, for writing one array in chunks
+        return cls.encode(rows)[1:-1]
+
+    @classmethod
+    def payload(cls, rows, compress=False, version=None):  # compress=True also keeps a gzipped body, for payloads that are cached
+        body = cls.encode(rows)
+        gzipped = gzip.compress(body, cls.GZIP_LEVEL) if compress and len(body) >= cls.GZIP_MIN_SIZE else None
+        return FlightsPayload(body, len(rows), rows[-1][0] if rows else None, gzipped, version)
+
+    @staticmethod
+    def sse(event, data):  # a Server-Sent Event, encoded once and written to all the clients
+        return b'event: ' + event.encode() + b'\ndata: ' + orjson.dumps(data) + b'\n\n'
+
+    @classmethod
+    def encode_snapshot_event(cls, rows):
+        return cls.sse('snapshot', [dict(zip(cls.fields, row)) for row in rows])
+
+    @classmethod
+    def encode_delta_event(cls, added_rows, changed_rows, removed_ids):
+        return cls.sse('delta', {'added': [dict(zip(cls.fields, row)) for row in added_rows],
+                                 'changed': [dict(zip(cls.fields, row)) for row in changed_rows],
+                                 'removed': list(removed_ids)})
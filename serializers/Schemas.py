@@ -0,0 +1,30 @@
+from serializers.EntitySchema import EntitySchema
+from tables.User import User
+from tables.Customer import Customer
+from tables.Airline_Company import Airline_Company
+from tables.Administrator import Administrator
+from tables.Flight import Flight
+from tables.Ticket import Ticket
+from tables.Booking import Booking
+from datetime import datetime
+
+# the request bodies of the REST API, the ids and user_role are set by the routes and the facades, never by the body
+
+user_schema = EntitySchema(User, (('username', str), ('password', str), ('email', str)),
+                           ('id', 'username', 'email', 'user_role'))  # the password is never sent back
+
+customer_schema = EntitySchema(Customer, (('first_name', str), ('last_name', str), ('address', str), ('phone_no', str),
+                                          ('credit_card_no', str)),
+                               ('id', 'first_name', 'last_name', 'address', 'phone_no', 'user_id'))  # nor the credit card
+
+airline_schema = EntitySchema(Airline_Company, (('name', str), ('country_id', int)))
+
+administrator_schema = EntitySchema(Administrator, (('first_name', str), ('last_name', str)))
+
+flight_schema = EntitySchema(Flight, (('origin_country_id', int), ('destination_country_id', int),
+                                      ('departure_time', datetime), ('landing_time', datetime),
+                                      ('remaining_tickets', int)))
+
+ticket_schema = EntitySchema(Ticket, (('flight_id', int),))
+
+booking_schema = EntitySchema(Booking, (), ('id', 'flight_id', 'status', 'ticket_id', 'created_at'))  # only dumped
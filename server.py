@@ -0,0 +1,70 @@
+# the production entry point: python server.py
+# the app is imported once in the master and then forked into [server] workers processes (gunicorn, threaded workers),
+# flask_rest_api.py app.run() is the development server only
+
+from configparser import ConfigParser
+import os
+import shutil
+
+config = ConfigParser()
+config.read("config.conf")
+# set before prometheus_client is imported by any module - the workers write their metrics to files in it
+METRICS_DIR = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', config["server"]["metrics_dir"])
+shutil.rmtree(METRICS_DIR, ignore_errors=True)  # the values of the last run are not summed with the new ones
+os.makedirs(METRICS_DIR)
+
+from gunicorn.app.base import BaseApplication
+from prometheus_client import multiprocess
+import db_config
+from data_access_objects.DbRepoPool import DbRepoPool
+from logger.Logger import Logger
+from login_token.LoginTokenSigner import LoginTokenSigner
+
+BIND = config["server"]["bind"]
+WORKERS = int(config["server"]["workers"])
+THREADS = int(config["server"]["threads"])
+DB_CONNECTION_BUDGET = int(config["server"]["db_connection_budget"])
+WORKER_POOL_SIZE = max(1, DB_CONNECTION_BUDGET // WORKERS)  # all the workers together stay in the budget
+
+
+def pre_fork(server, worker):  # in the master - no db connection may be inherited by a worker
+    db_config.engine.dispose()
+
+
+def post_fork(server, worker):  # in the new worker - its own engine and pool, sized by the connection budget
+    db_config.reinit_engine(WORKER_POOL_SIZE)
+    DbRepoPool.get_instance().reinit(WORKER_POOL_SIZE)
+    Logger.get_instance().logger.info(f'Worker {worker.pid} started with {WORKER_POOL_SIZE} db connections.')
+
+
+def child_exit(server, worker):  # the live gauges of a dead worker are removed from /metrics
+    multiprocess.mark_process_dead(worker.pid)
+
+
+class FlightsServer(BaseApplication):
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from flask_rest_api import app  # imported in the master (preload_app), the workers share its memory pages
+        return app
+
+
+if __name__ == '__main__':
+    if LoginTokenSigner.has_default_key():
+        raise SystemExit('The login token secret key is the default or empty, '
+                         'set the FLIGHTS_TOKEN_SECRET_KEY environment variable.')
+    FlightsServer({'bind': BIND,
+                   'workers': WORKERS,
+                   'threads': THREADS,
+                   'worker_class': 'gthread',
+                   'preload_app': True,
+                   'pre_fork': pre_fork,
+                   'post_fork': post_fork,
+                   'child_exit': child_exit}).run()
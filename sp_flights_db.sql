@@ -109,7 +109,8 @@ language plpgsql AS
 	$$
 		BEGIN
 			return QUERY
-			select * from flights where date(flights.departure_time) = _date and flights.origin_country_id = _origin_country_id
+			select * from flights where flights.departure_time >= _date and flights.departure_time < _date + 1
+			and flights.origin_country_id = _origin_country_id
 			and flights.destination_country_id = _destination_country_id;
 		end;
 	$$;
\ No newline at end of file
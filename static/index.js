@@ -3,40 +3,60 @@ function getRandomInt(max) {
   }
 
 
+// keeps a board table in sync with a /departures/<h>/live or /arrivals/<h>/live event stream,
+// the server sends one snapshot and then only the added, changed and removed flights
+function liveBoard(table, url, row_html)
+{
+    let source = new EventSource(url)
+
+    function put_row(flight)
+    {
+        let row = table.find(`tr[data-flight-id="${flight.id}"]`)
+        let html = `<tr data-flight-id="${flight.id}">${row_html(flight)}</tr>`
+        if (row.length) {
+            row.replaceWith(html)
+        }
+        else {
+            table.append(html)
+        }
+    }
+
+    source.addEventListener('snapshot', (e) => {
+        table.find("tr:gt(0)").remove()
+        $.each(JSON.parse(e.data), (i, flight) => put_row(flight))
+    })
+
+    source.addEventListener('delta', (e) => {
+        let delta = JSON.parse(e.data)
+        $.each(delta.removed, (i, id) => table.find(`tr[data-flight-id="${id}"]`).remove())
+        $.each(delta.changed, (i, flight) => put_row(flight))
+        $.each(delta.added, (i, flight) => put_row(flight))
+    })
+
+    source.onerror = (err) => console.log(err)  // the browser reconnects by itself and gets a new snapshot
+    return source
+}
+
+
 // show departures flights in table
 $(document).ready(function()
 {
+    let departures_source = null
+
     $('#departure_button').on('click', () => {
 
         let hours_num = parseInt($('#departure_delta').val())
         console.log(hours_num)
 
-        $.ajax({url:"/departures/" + hours_num}).then(
-            function(flights) // after-promise succeed
-            {
-                console.log(flights);
-                // flights.sort((a, b) => a.departure_time - b.departure_time)
-               
-                let departures_table = $('#departures')
-                departures_table.find("tr:gt(0)").remove()
-            
-                
-
-                $.each(flights,  (i, flight) => {
-        
-                    departures_table.append(
-                                `<tr><td class="fw-lighter">${flight.airline_company}</td>
-                                     <td class="fw-lighter">${flight.origin_country}</td>
-                                     <td class="fw-lighter">${flight.destination_country}</td>
-                                     <td class="fw-lighter">${flight.departure_time}</td>
-                                     <td class="fw-lighter">On time</td>`)
-                                     
-                })
-            }
-            ,function(err)   // after-promise failed
-            {
-                console.log(err);}
-            );
+        if (departures_source) {
+            departures_source.close()
+        }
+        departures_source = liveBoard($('#departures'), "/departures/" + hours_num + "/live",
+            (flight) => `<td class="fw-lighter">${flight.airline_company}</td>
+                         <td class="fw-lighter">${flight.origin_country}</td>
+                         <td class="fw-lighter">${flight.destination_country}</td>
+                         <td class="fw-lighter">${flight.departure_time}</td>
+                         <td class="fw-lighter">On time</td>`)
 
     });
 
@@ -47,48 +67,33 @@ $(document).ready(function()
 // show arrivals flights in table
 $(document).ready(function()
 {
+    let arrivals_source = null
+
     $('#arrival_button').on('click', () => {
 
         let hours_num = parseInt($('#arrival_delta').val())
         console.log(hours_num)
 
-        $.ajax({url:"/arrivals/" + hours_num}).then(
-            function(flights) // after-promise succeed
-            {
-                console.log(flights);
-                // flights.sort((a, b) => a.departure_time - b.departure_time)
-               
-                let arrivals_table = $('#arrivals')
-                arrivals_table.find("tr:gt(0)").remove()
-
-                let rand_num
+        if (arrivals_source) {
+            arrivals_source.close()
+        }
+        arrivals_source = liveBoard($('#arrivals'), "/arrivals/" + hours_num + "/live",
+            (flight) => {
                 let status
-               
-            
-                $.each(flights,  (i, flight) => {
-                    rand_num = getRandomInt(10)
-                    if (rand_num === 1){
-                        status = 'Delayed'
-                    }
-                    else{
-                        status = 'On Time' 
-                    }
-        
-                    arrivals_table.append(
-                                `<tr><td class="fw-lighter">${flight.airline_company}</td>
-                                     <td class="fw-lighter">${flight.origin_country}</td>
-                                     <td class="fw-lighter">${flight.destination_country}</td>
-                                     <td class="fw-lighter">${flight.landing_time}</td>
-                                     <td class="fw-lighter">${status}</td>`)
-                                     
-                })
-            }
-            ,function(err)   // after-promise failed
-            {
-                console.log(err);}
-            );
+                if (getRandomInt(10) === 1){
+                    status = 'Delayed'
+                }
+                else{
+                    status = 'On Time'
+                }
+                return `<td class="fw-lighter">${flight.airline_company}</td>
+                        <td class="fw-lighter">${flight.origin_country}</td>
+                        <td class="fw-lighter">${flight.destination_country}</td>
+                        <td class="fw-lighter">${flight.landing_time}</td>
+                        <td class="fw-lighter">${status}</td>`
+            })
 
     });
 
 
-});
\ No newline at end of file
+});
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, BigInteger, ForeignKey, Index
+from db_config import Base
+
+
+class Booking(Base):  # a queued ticket purchase, added pending by the api and answered by the booking worker
+    __tablename__ = 'bookings'
+
+    id = Column(String(36), primary_key=True)  # the booking id the client polls with
+    customer_id = Column(BigInteger(), ForeignKey('customers.id', ondelete='CASCADE'), nullable=False)
+    flight_id = Column(BigInteger(), nullable=False)  # no foreign key, a booking of a flight that does not exist is kept
+    status = Column(String(16), nullable=False)  # pending, then booked, sold_out, duplicate, not_found or failed
+    ticket_id = Column(BigInteger())
+    created_at = Column(DateTime(), nullable=False, default=datetime.now)
+
+    __table_args__ = (Index('ix_bookings_customer_id', 'customer_id'),)
+
+    def __repr__(self):
+        return f'Booking(id={self.id}, customer_id={self.customer_id}, flight_id={self.flight_id}, status={self.status}, ' \
+               f'ticket_id={self.ticket_id}, created_at={self.created_at})'
+
+    def __str__(self):
+        return f'Booking[id={self.id}, customer_id={self.customer_id}, flight_id={self.flight_id}, status={self.status}, ' \
+               f'ticket_id={self.ticket_id}, created_at={self.created_at}]'
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, REAL, BigInteger, ForeignKey
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy import Column, Integer, String, DateTime, REAL, BigInteger, ForeignKey, Index
+from sqlalchemy.orm import relationship, backref, joinedload
 from db_config import Base
 
 
@@ -14,6 +14,11 @@ class Flight(Base):
     landing_time = Column(DateTime(), nullable=False)
     remaining_tickets = Column(Integer(), nullable=False)
 
+    __table_args__ = (Index('ix_flights_route_departure', 'origin_country_id', 'destination_country_id', 'departure_time'),
+                      Index('ix_flights_departure_time', 'departure_time'),
+                      Index('ix_flights_landing_time', 'landing_time'),
+                      Index('ix_flights_airline_company_id', 'airline_company_id'))  # search, boards and airline flights
+
     airline_company = relationship('Airline_Company', backref=backref("flights", uselist=True, passive_deletes=True))
     origin_county = relationship('Country', foreign_keys=[origin_country_id], backref=backref("oc_flights", uselist=True))
     destination_county = relationship('Country', foreign_keys=[destination_country_id], backref=backref("dc_flights", uselist=True))
@@ -38,6 +43,10 @@ class Flight(Base):
                f'destination_country_id={self.destination_country_id}, departure_time={self.departure_time}, landing_time={self.landing_time}, ' \
                f'remaining_tickets={self.remaining_tickets}]'
 
+    @staticmethod
+    def web_load_options():  # loads the relationships used by data_for_web in the same query as the flights
+        return (joinedload(Flight.airline_company), joinedload(Flight.origin_county), joinedload(Flight.destination_county))
+
     def data_for_web(self):  # returning all the fields with relationship for the html page
         return {'id': self.id, 'airline_company': self.airline_company.name, 'origin_country': self.origin_county.name, 
                 'destination_country': self.destination_county.name, 'departure_time': self.departure_time, 'landing_time': self.landing_time, 
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime
+from db_config import Base
+
+
+class Generation_Job(Base):  # a data generation job, its plan and the status a restarted consumer resumes from
+    __tablename__ = 'generation_jobs'
+
+    id = Column(String(36), primary_key=True)
+    params = Column(Text(), nullable=False)  # json of the DbDataObject sizes
+    plan = Column(Text())  # json of the shards and their reserved ids, saved with the reference data
+    status = Column(String(16), nullable=False, default='running')  # running, cancelled or done
+    created_at = Column(DateTime(), nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f'Generation_Job(id={self.id}, params={self.params}, status={self.status}, created_at={self.created_at})'
+
+    def __str__(self):
+        return f'Generation_Job[id={self.id}, params={self.params}, status={self.status}, created_at={self.created_at}]'
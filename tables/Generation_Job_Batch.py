@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Text, BigInteger, ForeignKey
+from db_config import Base
+
+
+class Generation_Job_Batch(Base):  # the checkpoint of one generated batch, committed with the rows of the batch
+    __tablename__ = 'generation_job_batches'
+
+    job_id = Column(String(36), ForeignKey('generation_jobs.id', ondelete='CASCADE'), primary_key=True)
+    key = Column(String(32), primary_key=True)  # e.g. customers-3
+    rows = Column(BigInteger(), nullable=False)
+    sold = Column(Text())  # json {flight_id: tickets} of a tickets batch, applied to the flights when all of them are done
+
+    def __repr__(self):
+        return f'Generation_Job_Batch(job_id={self.job_id}, key={self.key}, rows={self.rows})'
+
+    def __str__(self):
+        return f'Generation_Job_Batch[job_id={self.job_id}, key={self.key}, rows={self.rows}]'
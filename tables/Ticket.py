@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, REAL, Text, BigInteger, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, REAL, Text, BigInteger, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship, backref
 from db_config import Base
 
@@ -11,7 +11,8 @@ class Ticket(Base):
     flight_id = Column(BigInteger(), ForeignKey('flights.id', ondelete='CASCADE'), nullable=False)
     customer_id = Column(BigInteger(), ForeignKey('customers.id', ondelete='CASCADE'), nullable=False)
 
-    __table_args__ = (UniqueConstraint('flight_id', 'customer_id', name='una_1'),)  # customer can buy 1 ticket per flight
+    __table_args__ = (UniqueConstraint('flight_id', 'customer_id', name='una_1'),  # customer can buy 1 ticket per flight
+                      Index('ix_tickets_customer_id', 'customer_id'))
 
     flight = relationship("Flight", backref=backref("tickets", uselist=True, passive_deletes=True))
     customer = relationship("Customer", backref=backref("tickets", uselist=True, passive_deletes=True))
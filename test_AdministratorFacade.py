@@ -8,13 +8,13 @@ from custom_errors.NotValidDataError import NotValidDataError
 from data_access_objects.DbRepoPool import DbRepoPool
 
 
-@pytest.fixture(scope='session')
+@pytest.fixture(scope='module')
 def administrator_facade_object():
-    print('Setting up same DAO for all tests.')
+    print('Setting up same DAO for all the tests in the module.')
     repool = DbRepoPool.get_instance()
-    repo = repool.get_connection()
-    anonfacade = AnonymousFacade(repo)
-    return anonfacade.login('Boris', '123')
+    with repool.connection() as repo:  # the repo goes back to the pool (and its transaction ends) after the module
+        anonfacade = AnonymousFacade(repo)
+        yield anonfacade.login('Boris', '123')
 
 
 @pytest.fixture(autouse=True)
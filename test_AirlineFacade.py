@@ -10,13 +10,13 @@ from custom_errors.NotValidDataError import NotValidDataError
 from data_access_objects.DbRepoPool import DbRepoPool
 
 
-@pytest.fixture(scope='session')
+@pytest.fixture(scope='module')
 def airline_facade_object():
-    print('Setting up same DAO for all tests.')
+    print('Setting up same DAO for all the tests in the module.')
     repool = DbRepoPool.get_instance()
-    repo = repool.get_connection()
-    anonfacade = AnonymousFacade(repo)
-    return anonfacade.login('Yoni', '123')
+    with repool.connection() as repo:  # the repo goes back to the pool (and its transaction ends) after the module
+        anonfacade = AnonymousFacade(repo)
+        yield anonfacade.login('Yoni', '123')
 
 
 @pytest.fixture(autouse=True)
@@ -156,4 +156,10 @@ def test_airline_facade_remove_flight_raise_notvaliddataerror(airline_facade_obj
 
 def test_airline_facade_remove_flight_raise_wronglogintokenerror(airline_facade_object):
     with pytest.raises(WrongLoginTokenError):
-        airline_facade_object.remove_flight(2)
\ No newline at end of file
+        airline_facade_object.remove_flight(2)
+
+
+def test_airline_facade_update_airline_invalidates_reference_cache(airline_facade_object):
+    airline_facade_object.get_airline_by_id(1)  # loading the airlines to the cache
+    airline_facade_object.update_airline(Airline_Company(name='Yoniiiiii', country_id=2, user_id=3))
+    assert airline_facade_object.get_airline_by_id(1) == [Airline_Company(id=1, name='Yoniiiiii', country_id=2, user_id=3)]
@@ -6,14 +6,15 @@ from facades.AdministratorFacade import AdministratorFacade
 from custom_errors.UserRoleTableError import UserRoleTableError
 from custom_errors.WrongLoginDataError import WrongLoginDataError
 from data_access_objects.DbRepoPool import DbRepoPool
+from login_token.LoginToken import LoginToken
 
 
-@pytest.fixture(scope='session')
+@pytest.fixture(scope='module')
 def anonymous_facade_object():
-    print('Setting up same DAO for all tests.')
+    print('Setting up same DAO for all the tests in the module.')
     repool = DbRepoPool.get_instance()
-    repo = repool.get_connection()
-    return AnonymousFacade(repo)
+    with repool.connection() as repo:  # the repo goes back to the pool (and its transaction ends) after the module
+        yield AnonymousFacade(repo)
 
 
 @pytest.fixture(autouse=True)
@@ -41,3 +42,18 @@ def test_anonymous_facade_log_in_raise_wronglogindataerror(anonymous_facade_obje
 def test_anonymous_facade_log_in_raise_userroletableerror(anonymous_facade_object):
     with pytest.raises(UserRoleTableError):
         anonymous_facade_object.login('not legal', '123')
+
+
+def test_anonymous_facade_get_login_token(anonymous_facade_object):
+    login_token = anonymous_facade_object.get_login_token('Yoni', '123')
+    assert (login_token.id, login_token.name, login_token.role) == (1, 'Yoni', 'airline_companies')
+    facade = AnonymousFacade.facade_by_login_token(login_token, anonymous_facade_object.repo)
+    assert isinstance(facade, AirlineFacade)
+    assert facade.login_token is login_token
+
+
+def test_anonymous_facade_login_token_exists(anonymous_facade_object):
+    login_token = anonymous_facade_object.get_login_token('Elad', '123')
+    assert anonymous_facade_object.login_token_exists(login_token)
+    assert not anonymous_facade_object.login_token_exists(LoginToken(99, 'Deleted', 'customers'))
+    assert not anonymous_facade_object.login_token_exists(LoginToken(1, 'Anonymous', 'Anonymous'))
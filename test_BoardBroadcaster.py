@@ -0,0 +1,74 @@
+import pytest
+import orjson
+from live.BoardBroadcaster import BoardBroadcaster, BoardSubscription
+
+KEY = ('departures', 4, None)
+
+
+def row(id_, remaining_tickets=200):
+    return id_, 'El Al', 'Israel', 'Germany', None, None, remaining_tickets
+
+
+def decode(event):
+    name, data = event.split(b'\n')[:2]
+    return name[len(b'event: '):].decode(), orjson.loads(data[len(b'data: '):])
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    broadcaster = BoardBroadcaster.get_instance()
+    boards = {}
+    monkeypatch.setattr(broadcaster, '_fetch', lambda key: dict(boards[key]))
+    monkeypatch.setattr(broadcaster, '_producer', True)  # the test refreshes the boards itself
+    yield broadcaster, boards
+    broadcaster._boards.clear()
+
+
+def test_board_broadcaster_sends_snapshot_then_deltas(broadcaster):
+    broadcaster, boards = broadcaster
+    boards[KEY] = {1: row(1), 2: row(2)}
+    first = broadcaster.subscribe(KEY)
+    broadcaster._refresh(KEY)
+    name, flights = decode(first.get(0))
+    assert name == 'snapshot' and [flight['id'] for flight in flights] == [1, 2]
+
+    second = broadcaster.subscribe(KEY)  # a board that is already read is not read again for a new screen
+    assert decode(second.get(0))[0] == 'snapshot'
+
+    boards[KEY] = {2: row(2, 199), 3: row(3)}
+    broadcaster._refresh(KEY)
+    for subscription in (first, second):
+        name, delta = decode(subscription.get(0))
+        assert name == 'delta'
+        assert [flight['id'] for flight in delta['added']] == [3]
+        assert [flight['remaining_tickets'] for flight in delta['changed']] == [199]
+        assert delta['removed'] == [1]
+
+    broadcaster._refresh(KEY)  # nothing changed, nothing is sent
+    assert first.get(0) is None
+
+
+def test_board_broadcaster_resyncs_slow_subscriber():
+    subscription = BoardSubscription(KEY, 1)
+    subscription.needs_snapshot = False
+    subscription.put(b'delta 1')
+    subscription.put(b'delta 2')
+    assert subscription.needs_snapshot
+    assert subscription.get(0) is None
+
+
+def test_board_broadcaster_unsubscribe_drops_board(broadcaster):
+    broadcaster, boards = broadcaster
+    subscription = broadcaster.subscribe(KEY)
+    broadcaster.unsubscribe(subscription)
+    assert KEY not in broadcaster._boards
+
+
+def test_board_broadcaster_max_subscribers(broadcaster, monkeypatch):
+    broadcaster, boards = broadcaster
+    monkeypatch.setattr(BoardBroadcaster, 'MAX_SUBSCRIBERS', 2)
+    first = broadcaster.subscribe(KEY)
+    assert broadcaster.subscribe(('arrivals', 4, None)) is not None
+    assert broadcaster.subscribe(KEY) is None  # the limit is of all the boards together
+    broadcaster.unsubscribe(first)
+    assert broadcaster.subscribe(KEY) is not None
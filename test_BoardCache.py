@@ -0,0 +1,46 @@
+import pytest
+import threading
+import time
+from cache.BoardCache import BoardCache
+
+
+@pytest.fixture
+def board_cache():
+    cache = BoardCache.get_instance()
+    cache.invalidate()
+    return cache
+
+
+def test_board_cache_coalesces_identical_requests(board_cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return ['flight']
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(board_cache.get_or_compute(('departures', 4), compute)))
+               for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [['flight']] * 10
+
+
+def test_board_cache_invalidate(board_cache):
+    assert board_cache.get_or_compute(('arrivals', 4), lambda: 1) == 1
+    assert board_cache.get_or_compute(('arrivals', 4), lambda: 2) == 1
+    board_cache.invalidate()
+    assert board_cache.get_or_compute(('arrivals', 4), lambda: 3) == 3
+
+
+def test_board_cache_does_not_cache_errors(board_cache):
+    def compute():
+        raise ZeroDivisionError
+
+    with pytest.raises(ZeroDivisionError):
+        board_cache.get_or_compute(('arrivals', 5), compute)
+    assert board_cache.get_or_compute(('arrivals', 5), lambda: 1) == 1
@@ -0,0 +1,91 @@
+import pytest
+import orjson
+import booking_worker
+from types import SimpleNamespace
+from booking.BookingBatcher import BookingBatcher
+from data_access_objects.DbRepoPool import DbRepoPool
+from tables.Booking import Booking
+from tables.Flight import Flight
+from tables.Ticket import Ticket
+from data_access_objects.DbRepo import DbRepo
+from RabbitConsumerObject import RabbitConsumerObject
+from logger.Logger import Logger
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+
+@pytest.fixture
+def batcher():
+    repool = DbRepoPool.get_instance()
+    with repool.connection() as repo:
+        repo.reset_test_db()
+        repo.get_by_condition(Booking, lambda query: query.delete())
+        repo.local_session.commit()
+    return BookingBatcher(repool, max_batch=10, max_wait=0.05)
+
+
+def remaining_tickets(flight_id):
+    with DbRepoPool.get_instance().connection() as repo:
+        return repo.get_by_condition(Flight, lambda query: query.filter(Flight.id == flight_id).one()).remaining_tickets
+
+
+def request(booking_id, customer_id, flight_id):
+    return {'booking_id': booking_id, 'customer_id': customer_id, 'flight_id': flight_id}
+
+
+def test_booking_batcher_book(batcher):
+    results = batcher.book([request('b1', 2, 1), request('b2', 1, 1), request('b3', 2, 1), request('b4', 1, 2),
+                            request('b5', 1, 99)])
+    assert results['b1'][0] == 'booked' and results['b1'][1] is not None
+    assert results['b2'] == ('duplicate', None)  # customer 1 already has a ticket of flight 1
+    assert results['b3'] == ('duplicate', None)  # the same customer twice in the batch
+    assert results['b4'] == ('sold_out', None)
+    assert results['b5'] == ('not_found', None)
+    assert remaining_tickets(1) == 199
+    with DbRepoPool.get_instance().connection() as repo:
+        assert len(repo.get_all(Booking)) == 5
+
+
+def test_booking_batcher_redelivered_request_keeps_its_result(batcher):
+    first = batcher.book([request('b1', 2, 1)])
+    assert batcher.book([request('b1', 2, 1)]) == first
+    assert remaining_tickets(1) == 199
+    with DbRepoPool.get_instance().connection() as repo:
+        assert len(repo.get_by_column_value(Ticket, Ticket.flight_id, 1)) == 2
+
+
+def test_booking_batcher_submit(batcher):
+    futures = [batcher.submit(request(f'b{i}', customer_id, 1)) for i, customer_id in enumerate((2, 2, 1))]
+    assert [future.result(timeout=5)[0] for future in futures] == ['booked', 'duplicate', 'duplicate']
+
+
+def test_booking_batcher_same_request_twice_in_a_batch(batcher):
+    results = batcher.book([request('b1', 2, 1), request('b1', 2, 1)])
+    assert results['b1'][0] == 'booked'
+    assert remaining_tickets(1) == 199
+    with DbRepoPool.get_instance().connection() as repo:
+        assert len(repo.get_all(Booking)) == 1
+
+
+def test_booking_batcher_bad_request_fails_alone(batcher):
+    requests = [request('b1', 2, 1), request('b2', 99, 1), request('b3', 1, 1)]  # there is no customer 99
+    futures = [batcher.submit(request_) for request_ in requests]
+    assert futures[0].result(timeout=5)[0] == 'booked'
+    with pytest.raises(IntegrityError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == ('duplicate', None)
+    assert remaining_tickets(1) == 199
+
+
+def test_booking_batcher_db_down_requeues_the_message(batcher, monkeypatch):
+    def book_tickets(self, flight_id, customer_ids):
+        raise OperationalError('SELECT', {}, Exception('the db is down'))
+    monkeypatch.setattr(DbRepo, 'book_tickets', book_tickets)
+    consumer = RabbitConsumerObject.__new__(RabbitConsumerObject)  # only its message handling, without a broker
+    consumer.q_name, consumer.callback, consumer.requeue_on = 'Bookings', booking_worker.callback, booking_worker.REQUEUE_ON
+    consumer.logger = Logger.get_instance()
+    answers = []
+    channel = SimpleNamespace(basic_ack=lambda delivery_tag: answers.append('ack'),
+                              basic_nack=lambda delivery_tag, requeue: answers.append(f'nack requeue={requeue}'))
+    consumer._work(SimpleNamespace(add_callback_threadsafe=lambda answer: answer()), channel,
+                   SimpleNamespace(delivery_tag=1), None, orjson.dumps(request('b1', 2, 1)))
+    assert answers == ['nack requeue=True']
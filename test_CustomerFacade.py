@@ -7,13 +7,13 @@ from custom_errors.NotValidDataError import NotValidDataError
 from data_access_objects.DbRepoPool import DbRepoPool
 
 
-@pytest.fixture(scope='session')
+@pytest.fixture(scope='module')
 def customer_facade_object():
-    print('Setting up same DAO for all tests.')
+    print('Setting up same DAO for all the tests in the module.')
     repool = DbRepoPool.get_instance()
-    repo = repool.get_connection()
-    anonfacade = AnonymousFacade(repo)
-    return anonfacade.login('Uri', '123')
+    with repool.connection() as repo:  # the repo goes back to the pool (and its transaction ends) after the module
+        anonfacade = AnonymousFacade(repo)
+        yield anonfacade.login('Uri', '123')
 
 
 @pytest.fixture(autouse=True)
@@ -71,4 +71,11 @@ def test_customer_facade_add_ticket(customer_facade_object, ticket, expected):
 @pytest.mark.parametrize('ticket', ['not ticket', Ticket(flight_id=4)])
 def test_customer_facade_add_ticket_raise_notvaliddataerror(customer_facade_object, ticket):
     with pytest.raises(NotValidDataError):
-        customer_facade_object.add_ticket(ticket)
\ No newline at end of file
+        customer_facade_object.add_ticket(ticket)
+
+
+def test_customer_facade_add_ticket_twice_raise_notvaliddataerror(customer_facade_object):
+    customer_facade_object.add_ticket(Ticket(flight_id=1))
+    with pytest.raises(NotValidDataError):
+        customer_facade_object.add_ticket(Ticket(flight_id=1))
+    assert customer_facade_object.get_flight_by_id(1)[0].remaining_tickets == 199
@@ -0,0 +1,14 @@
+from cache.DataVersion import DataVersion
+
+
+def test_data_version_bump_changes_etag():
+    data_version = DataVersion.get_instance()
+    etag = data_version.etag(data_version.get())
+    data_version.bump()
+    assert data_version.etag(data_version.get()) != etag
+    assert data_version.etag(data_version.get()) == data_version.etag(data_version.get())
+
+
+def test_data_version_etag_bucket():
+    data_version = DataVersion.get_instance()
+    assert data_version.etag(1, 3600).startswith(data_version.etag(1) + '-')
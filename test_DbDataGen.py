@@ -0,0 +1,20 @@
+import random
+from DbDataGen import DbDataGen
+
+
+def test_db_data_gen_tickets_rows_respects_capacity():
+    random.seed(1)
+    sold = {}
+    flights_capacity = [(1, 3), (2, 1), (3, 50)]
+    tickets = list(DbDataGen.tickets_rows(range(1, 41), flights_capacity, 2, sold))
+    assert len(set(tickets)) == len(tickets)  # no customer has 2 tickets of the same flight
+    assert sold == {flight_id: sum(1 for ticket in tickets if ticket[0] == flight_id) for flight_id in sold}
+    assert all(sold[flight_id] <= capacity for flight_id, capacity in flights_capacity if flight_id in sold)
+    assert sold[1] == 3 and sold[2] == 1  # the small flights are sold out, not overbooked
+
+
+def test_db_data_gen_tickets_rows_stops_when_sold_out():
+    sold = {}
+    tickets = list(DbDataGen.tickets_rows(range(1, 1001), [(1, 5), (2, 5)], 1, sold))
+    assert len(tickets) == 10
+    assert sold == {1: 5, 2: 5}
@@ -0,0 +1,16 @@
+import uuid
+from DbDataObject import DbDataObject
+from data_access_objects.DbRepoPool import DbRepoPool
+from tables.Country import Country
+
+
+def test_db_data_object_cancelled_api_job_does_not_start():
+    with DbRepoPool.get_instance().connection() as repo:
+        repo.reset_all_tables_auto_inc()
+        job_id = str(uuid.uuid4())
+        DbDataObject.cancel(job_id)  # still in the queue
+        db_data = DbDataObject(customers=10, airlines=2, flights_per_airline=2, tickets_per_customer=1, job_id=job_id,
+                               progress=lambda message: None, engine='api')
+        assert db_data.generate_data() == 'cancelled'
+        assert repo.get_all(Country) == [] and db_data.timings == {}
+        repo.reset_test_db()
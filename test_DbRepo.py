@@ -0,0 +1,58 @@
+import pytest
+from datetime import datetime
+from data_access_objects.DbRepoPool import DbRepoPool
+from tables.Country import Country
+from tables.Flight import Flight
+from tables.Generation_Job import Generation_Job
+from cache.ReferenceDataCache import ReferenceDataCache
+
+
+@pytest.fixture(scope='module')
+def repo():
+    repool = DbRepoPool.get_instance()
+    with repool.connection() as repo:
+        yield repo
+
+
+@pytest.fixture(autouse=True)
+def reset_db(repo):
+    repo.reset_test_db()
+    return
+
+
+def test_db_repo_bulk_load_returns_ids_in_order(repo):
+    names = [f'Country {i}' for i in range(25)] + ['Tab\tNew\nLine\\Back']
+    ids = repo.bulk_load(Country, ((name,) for name in names), chunk_size=10)
+    assert ids == list(range(3, 3 + len(names)))
+    assert [repo.get_by_column_value(Country, Country.id, id_)[0].name for id_ in (ids[0], ids[-1])] == [names[0], names[-1]]
+
+
+def test_db_repo_bulk_load_explicit_ids_move_the_sequence(repo):
+    times = datetime(2022, 1, 30, 16, 0, 0), datetime(2022, 1, 30, 20, 0, 0)
+    assert repo.bulk_load(Flight, [(100, 1, 1, 2, *times, 200)],
+                          ['id', 'airline_company_id', 'origin_country_id', 'destination_country_id', 'departure_time',
+                           'landing_time', 'remaining_tickets']) == [100]
+    assert repo.bulk_load(Flight, [(1, 1, 2, *times, 200)]) == [101]
+
+
+def test_db_repo_bulk_load_invalidates_the_cache_after_the_outer_commit(repo):
+    cache = ReferenceDataCache.get_instance()
+    assert len(cache.get_all(repo, Country)) == 2
+    with repo.transaction():
+        repo.bulk_load(Country, [('Atlantis',)])
+        assert len(cache.get_all(repo, Country)) == 2  # not invalidated before the commit, the cached rows stay
+    assert len(cache.get_all(repo, Country)) == 3
+
+
+def test_db_repo_reserve_ids_are_never_given_again(repo):
+    reserved = repo.reserve_ids(Country, 10)
+    assert reserved == range(3, 13)
+    assert repo.bulk_load(Country, [('After the range',)]) == [13]
+
+
+def test_db_repo_reset_all_tables_truncates_the_jobs(repo):
+    repo.add(Generation_Job(id='job-1', params='{}'))
+    repo.reset_all_tables_auto_inc(jobs=False)  # the api engine keeps the cancels
+    assert [job.id for job in repo.get_all(Generation_Job)] == ['job-1']
+    repo.reset_all_tables_auto_inc()  # a running job is not resumed against the truncated data
+    assert repo.get_all(Generation_Job) == [] and repo.get_all(Country) == []
@@ -0,0 +1,56 @@
+import pytest
+import threading
+from data_access_objects.DbRepoPool import DbRepoPool
+from custom_errors.NoAvailableConnectionError import NoAvailableConnectionError
+
+
+@pytest.fixture
+def repool():
+    return DbRepoPool.get_instance()
+
+
+def test_db_repo_pool_each_repo_has_its_own_session(repool):
+    repos = [repool.get_connection() for i in range(2)]
+    assert repos[0].local_session is not repos[1].local_session
+    for repo in repos:
+        repool.return_connection(repo)
+
+
+def test_db_repo_pool_connection_returns_repo_on_exception(repool):
+    available = repool.get_available_count()
+    with pytest.raises(ZeroDivisionError):
+        with repool.connection():
+            assert repool.get_available_count() == available - 1
+            1 / 0
+    assert repool.get_available_count() == available
+
+
+def test_db_repo_pool_get_connection_raise_noavailableconnectionerror(repool):
+    failures = repool.get_stats()['checkout_failures']
+    repos = [repool.get_connection() for i in range(repool.get_available_count())]
+    with pytest.raises(NoAvailableConnectionError):
+        repool.get_connection(timeout=0.05)
+    assert repool.get_stats()['checkout_failures'] == failures + 1
+    for repo in repos:
+        repool.return_connection(repo)
+
+
+def test_db_repo_pool_get_connection_waits_for_returned_repo(repool):
+    repos = [repool.get_connection() for i in range(repool.get_available_count())]
+    threading.Timer(0.05, repool.return_connection, args=(repos.pop(),)).start()
+    repo = repool.get_connection(timeout=5)
+    assert repool.get_stats()['in_use'] == len(repos) + 1
+    repos.append(repo)
+    for repo in repos:
+        repool.return_connection(repo)
+
+
+def test_db_repo_pool_reinit(repool):
+    max_connections = repool.get_max_possible_connections()
+    repool.reinit(3)
+    try:
+        assert repool.get_max_possible_connections() == 3
+        assert repool.get_available_count() == 3
+        assert repool.get_stats()['checkouts'] == 0
+    finally:
+        repool.reinit(max_connections)
@@ -0,0 +1,34 @@
+import pytest
+from datetime import datetime
+from serializers.EntitySchema import EntitySchema
+from serializers.Schemas import flight_schema, user_schema, ticket_schema
+from custom_errors.NotValidDataError import NotValidDataError
+from tables.Flight import Flight
+from tables.User import User
+
+
+def test_entity_schema_load():
+    flight = flight_schema.load({'origin_country_id': 1, 'destination_country_id': 2,
+                                 'departure_time': '2022-01-30T16:00:00', 'landing_time': '2022-01-30T20:00:00',
+                                 'remaining_tickets': 200, 'airline_company_id': 5}, id=3)
+    assert isinstance(flight, Flight)
+    assert flight.id == 3
+    assert flight.departure_time == datetime(2022, 1, 30, 16)
+    assert flight.airline_company_id is None  # only the declared fields are taken from the body
+
+
+@pytest.mark.parametrize('data', [None, [], {'flight_id': '1'}, {'flight_id': True}, {}])
+def test_entity_schema_load_raises_notvaliddataerror(data):
+    with pytest.raises(NotValidDataError):
+        ticket_schema.load(data)
+
+
+@pytest.mark.parametrize('body', [b'not json', b'[1, 2]'])
+def test_entity_schema_parse_raises_notvaliddataerror(body):
+    with pytest.raises(NotValidDataError):
+        EntitySchema.parse(body)
+
+
+def test_entity_schema_dump_leaves_out_password():
+    user = User(id=1, username='Elad', password='123', email='elad@gmail.com', user_role=1)
+    assert user_schema.dump_one(user) == b'{"id":1,"username":"Elad","email":"elad@gmail.com","user_role":1}'
@@ -9,12 +9,12 @@ from data_access_objects.DbRepoPool import DbRepoPool
 from custom_errors.NotValidDataError import NotValidDataError
 
 
-@pytest.fixture(scope='session')
+@pytest.fixture(scope='module')
 def dao_connection_singleton():
-    print('Setting up same DAO for all tests.')
+    print('Setting up same DAO for all the tests in the module.')
     repool = DbRepoPool.get_instance()
-    repo = repool.get_connection()
-    return AnonymousFacade(repo)
+    with repool.connection() as repo:  # the repo goes back to the pool (and its transaction ends) after the module
+        yield AnonymousFacade(repo)
 
 
 @pytest.fixture(autouse=True)
@@ -133,3 +133,30 @@ def test_airline_facade_get_flights_by_airline_id(dao_connection_singleton, airl
 def test_facade_base_get_flights_by_airline_id_raise_notvaliddataerror(dao_connection_singleton, airline_id):
     with pytest.raises(NotValidDataError):
         dao_connection_singleton.get_flights_by_airline_id(airline_id)
+
+
+def test_facade_base_repo_transaction_rolls_back_on_error(dao_connection_singleton):
+    with pytest.raises(NotValidDataError):
+        with dao_connection_singleton.repo.transaction():
+            dao_connection_singleton.repo.add(Country(name='France'))
+            raise NotValidDataError
+    actual = dao_connection_singleton.get_all_countries()
+    assert actual == [Country(id=1, name='Israel'), Country(id=2, name='Germany')]
+
+
+def test_facade_base_get_all_flights_page(dao_connection_singleton):
+    actual = dao_connection_singleton.get_all_flights(after_id=1, limit=1)
+    assert actual == [Flight(id=2, airline_company_id=2, origin_country_id=1, destination_country_id=2,
+                             departure_time=datetime(2022, 1, 30, 16, 0, 0),
+                             landing_time=datetime(2022, 1, 30, 20, 0, 0), remaining_tickets=0)]
+
+
+@pytest.mark.parametrize('after_id, limit', [(-1, 1), ('1', 1), (0, 0), (0, 'not int')])
+def test_facade_base_get_all_flights_page_raise_notvaliddataerror(dao_connection_singleton, after_id, limit):
+    with pytest.raises(NotValidDataError):
+        dao_connection_singleton.get_all_flights(after_id=after_id, limit=limit)
+
+
+def test_facade_base_stream_all_flights(dao_connection_singleton):
+    actual = list(dao_connection_singleton.stream_all_flights(batch_size=1))
+    assert actual == dao_connection_singleton.get_all_flights()
@@ -0,0 +1,27 @@
+import gzip
+import orjson
+from datetime import datetime
+from serializers.FlightsSerializer import FlightsSerializer
+
+rows = [(1, 'Yoni', 'Israel', 'Germany', datetime(2022, 1, 30, 16, 0, 0), datetime(2022, 1, 30, 20, 0, 0), 200),
+        (2, 'Yishay', 'Israel', 'Germany', datetime(2022, 1, 30, 16, 0, 0), datetime(2022, 1, 30, 20, 0, 0), 0)]
+
+
+def test_flights_serializer_encode():
+    actual = orjson.loads(FlightsSerializer.encode(rows[:1]))
+    assert actual == [{'id': 1, 'airline_company': 'Yoni', 'origin_country': 'Israel', 'destination_country': 'Germany',
+                       'departure_time': '2022-01-30T16:00:00', 'landing_time': '2022-01-30T20:00:00',
+                       'remaining_tickets': 200}]
+
+
+def test_flights_serializer_encode_items_in_chunks():
+    actual = b'[' + FlightsSerializer.encode_items(rows[:1]) + b',' + FlightsSerializer.encode_items(rows[1:]) + b']'
+    assert actual == FlightsSerializer.encode(rows)
+
+
+def test_flights_serializer_payload():
+    payload = FlightsSerializer.payload(rows * 100, compress=True)
+    assert payload.count == 200
+    assert payload.last_id == 2
+    assert gzip.decompress(payload.gzipped) == payload.body
+    assert FlightsSerializer.payload([]).last_id is None
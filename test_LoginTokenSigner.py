@@ -0,0 +1,38 @@
+import pytest
+from login_token.LoginToken import LoginToken
+from login_token.LoginTokenSigner import LoginTokenSigner
+from custom_errors.WrongLoginTokenError import WrongLoginTokenError
+
+
+def test_login_token_signer_sign_and_load():
+    token = LoginTokenSigner.sign(LoginToken(1, 'Elad', 'customers'))
+    login_token = LoginTokenSigner.load(token)
+    assert (login_token.id, login_token.name, login_token.role) == (1, 'Elad', 'customers')
+
+
+def test_login_token_signer_raise_wronglogintokenerror_changed_token():
+    payload, signature = LoginTokenSigner.sign(LoginToken(1, 'Elad', 'customers')).split('.')
+    other_payload = LoginTokenSigner.sign(LoginToken(1, 'Elad', 'administrators')).split('.')[0]
+    with pytest.raises(WrongLoginTokenError):
+        LoginTokenSigner.load(f'{other_payload}.{signature}')
+
+
+@pytest.mark.parametrize('token', ['', 'abc', 'a.b.c', None])
+def test_login_token_signer_raise_wronglogintokenerror_not_valid(token):
+    with pytest.raises(WrongLoginTokenError):
+        LoginTokenSigner.load(token)
+
+
+def test_login_token_signer_raise_wronglogintokenerror_expired():
+    token = LoginTokenSigner.sign(LoginToken(1, 'Elad', 'customers'), ttl=-1)
+    with pytest.raises(WrongLoginTokenError):
+        LoginTokenSigner.load(token)
+
+
+def test_login_token_signer_has_default_key(monkeypatch):
+    monkeypatch.setattr(LoginTokenSigner, 'SECRET_KEY', LoginTokenSigner.DEFAULT_SECRET_KEY.encode())
+    assert LoginTokenSigner.has_default_key()
+    monkeypatch.setattr(LoginTokenSigner, 'SECRET_KEY', b'')
+    assert LoginTokenSigner.has_default_key()
+    monkeypatch.setattr(LoginTokenSigner, 'SECRET_KEY', b'a production key')
+    assert not LoginTokenSigner.has_default_key()
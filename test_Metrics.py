@@ -0,0 +1,33 @@
+import pytest
+from prometheus_client import REGISTRY
+from metrics.Metrics import Metrics
+from custom_errors.NotValidDataError import NotValidDataError
+
+
+@Metrics.instrument_facade
+class FakeFacade:
+
+    def ok(self):
+        return True
+
+    def fail(self):
+        raise NotValidDataError
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_instrument_facade_counts_calls_and_errors():
+    calls = sample('flights_facade_calls_total', facade='FakeFacade', method='fail')
+    errors = sample('flights_facade_errors_total', facade='FakeFacade', method='fail', error='NotValidDataError')
+    assert FakeFacade().ok()
+    with pytest.raises(NotValidDataError):
+        FakeFacade().fail()
+    assert sample('flights_facade_calls_total', facade='FakeFacade', method='fail') == calls + 1
+    assert sample('flights_facade_errors_total', facade='FakeFacade', method='fail', error='NotValidDataError') == errors + 1
+
+
+def test_metrics_render():
+    FakeFacade().ok()
+    assert b'flights_facade_calls_total{facade="FakeFacade",method="ok"}' in Metrics.render()
@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+from cache.ReferenceDataCache import ReferenceDataCache
+from tables.Country import Country
+
+
+class StubRepo:  # the rows of the countries table, as another process may have changed them
+    def __init__(self, names):
+        self.names = names
+        self.loads = 0
+
+    def get_all_order_by(self, table_class, column):
+        self.loads += 1
+        return [SimpleNamespace(id=i, name=name) for i, name in enumerate(self.names, 1)]
+
+
+def test_reference_data_cache_miss_reloads_once():
+    cache = ReferenceDataCache.get_instance()
+    cache.invalidate()
+    repo = StubRepo(['Israel'])
+    assert cache.exists(repo, Country, 1) and repo.loads == 1
+    repo.names.append('Germany')  # added by another process, the cached table does not have it
+    assert cache.exists(repo, Country, 2) and repo.loads == 2
+    assert not cache.exists(repo, Country, 3) and repo.loads == 3  # one reload, then the miss is answered
+    assert cache.get_by_id(repo, Country, 1)['name'] == 'Israel' and repo.loads == 3  # a hit does not reload
+    cache.invalidate()
@@ -0,0 +1,62 @@
+import pytest
+import json
+import uuid
+from ShardedDataGen import ShardedDataGen
+from data_access_objects.DbRepoPool import DbRepoPool
+from tables.Flight import Flight
+from tables.Ticket import Ticket
+from tables.Customer import Customer
+from tables.Generation_Job import Generation_Job
+
+
+def test_sharded_data_gen_split():
+    shards = ShardedDataGen.split(range(10, 20), 3)
+    assert [list(shard) for shard in shards] == [[10, 11, 12], [13, 14, 15], [16, 17, 18, 19]]
+    assert ShardedDataGen.split(range(2), 4) == [range(0, 1), range(1, 2)]  # no empty shards
+    assert ShardedDataGen.split(range(0), 4) == []
+
+
+@pytest.fixture
+def repo():
+    with DbRepoPool.get_instance().connection() as repo:
+        repo.reset_all_tables_auto_inc()
+        yield repo
+        repo.reset_test_db()
+
+
+def new_job(repo, status='running'):
+    params = {'airlines': 3, 'customers': 100, 'flights_per_airline': 5, 'tickets_per_customer': 2}
+    job_id = str(uuid.uuid4())
+    repo.add(Generation_Job(id=job_id, params=json.dumps(params), status=status))
+    return ShardedDataGen(job_id, processes=2, batch_rows=10, **params)
+
+
+def assert_generated(repo):
+    assert len(repo.get_all(Customer)) == 100 and len(repo.get_all(Flight)) == 15
+    tickets = repo.get_all(Ticket)
+    assert len(tickets) == len({(ticket.flight_id, ticket.customer_id) for ticket in tickets})
+    sold = sum(200 - flight.remaining_tickets for flight in repo.get_all(Flight))
+    assert sold == len(tickets)  # the remaining tickets match the generated tickets
+
+
+def test_sharded_data_gen_generate(repo):
+    messages = []
+    assert new_job(repo).generate(messages.append) == 'done'
+    assert_generated(repo)
+    assert messages[-1]['percent'] == 100 and messages[0]['rows_done'] < messages[-2]['rows_done']
+
+
+def test_sharded_data_gen_resumes_after_the_saved_batches(repo):
+    gen = new_job(repo)
+    plan = gen.load_plan(repo)
+    for batch in plan['first_phase'][:3]:  # as if the consumer stopped after 3 batches
+        ShardedDataGen.run_batch(batch)
+    messages = []
+    assert gen.generate(messages.append) == 'done'
+    assert not {message.get('batch') for message in messages} & {batch['key'] for batch in plan['first_phase'][:3]}
+    assert_generated(repo)
+
+
+def test_sharded_data_gen_cancelled_job_does_not_start(repo):
+    assert new_job(repo, status='cancelled').generate() == 'cancelled'
+    assert repo.get_all(Flight) == []
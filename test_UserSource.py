@@ -0,0 +1,68 @@
+import pytest
+import json
+import threading
+import trio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from UserSource import RandomUserApiSource, FileUserSource
+
+
+def make_user(i):
+    return {'login': {'username': f'user{i}', 'password': '123'}, 'email': f'user{i}@gmail.com', 'phone': f'{i}',
+            'name': {'first': 'First', 'last': 'Last'},
+            'location': {'street': {'number': i, 'name': 'Street'}, 'state': 'State', 'country': 'Country'}}
+
+
+@pytest.fixture
+def stub_server():  # a local stand in for randomuser.me, the first request of every batch (page) fails
+    requests = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            num, page = int(query['results'][0]), int(query['page'][0])
+            with lock:  # the batches are fetched concurrently
+                first = page not in [request[0] for request in requests]
+                requests.append((page, num))
+            if first:
+                self.send_response(503)
+                self.end_headers()
+                return
+            body = json.dumps({'results': [make_user(i) for i in range(num)]}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}/api/?nat=us', requests
+    server.shutdown()
+
+
+def test_random_user_api_source_fetches_batches_and_retries(stub_server):
+    url, requests = stub_server
+    source = RandomUserApiSource(url=url, batch_size=10, concurrency=2, retries=3, backoff=0.01)
+    users = trio.run(source.fetch, 25)
+    assert len(users) == 25
+    assert sorted(requests) == [(1, 10), (1, 10), (2, 10), (2, 10), (3, 5), (3, 5)]  # every batch failed once, retried
+
+
+def test_random_user_api_source_gives_up(stub_server):
+    url, requests = stub_server
+    source = RandomUserApiSource(url=url, batch_size=10, retries=1, backoff=0.01)
+    with pytest.raises(Exception):
+        trio.run(source.fetch, 10)
+
+
+def test_file_user_source(tmp_path):
+    path = tmp_path / 'users.json'
+    path.write_text(json.dumps({'results': [make_user(i) for i in range(3)]}))
+    source = FileUserSource(str(path))
+    assert [user['login']['username'] for user in trio.run(source.fetch, 4)] == ['user0', 'user1', 'user2', 'user0']
+    assert trio.run(source.fetch, 1)[0]['login']['username'] == 'user1'
@@ -0,0 +1,69 @@
+import pytest
+import numpy as np
+from datetime import datetime
+from VectorDataGen import VectorDataGen
+from DbDataGen import DbDataGen
+
+
+def generate(seed):
+    gen = VectorDataGen(seed, start=datetime(2022, 1, 1))
+    flights = gen.flights(1, np.arange(1, 11), 100, 200)
+    tickets = gen.tickets(1, np.arange(1, 1001), flights, 5)
+    return flights, tickets
+
+
+def test_same_seed_same_data():
+    flights1, tickets1 = generate(7)
+    flights2, tickets2 = generate(7)
+    for name in flights1:
+        assert (flights1[name] == flights2[name]).all()
+    for name in tickets1:
+        assert (tickets1[name] == tickets2[name]).all()
+    assert not (generate(8)[0]['departure_time'] == flights1['departure_time']).all()
+
+
+def test_flights():
+    flights, tickets = generate(1)
+    assert len(flights['id']) == 1000
+    hours = (flights['landing_time'] - flights['departure_time']).astype('timedelta64[h]').astype(int)
+    assert hours.min() >= 2 and hours.max() <= DbDataGen.max_hours_delta_t
+    assert flights['departure_time'].min() >= np.datetime64('2022-01-01')
+    assert flights['origin_country_id'].min() >= 1 and flights['origin_country_id'].max() <= 200
+
+
+def test_tickets():
+    flights, tickets = generate(1)
+    assert len(tickets['id']) == 5000
+    pairs = set(zip(tickets['customer_id'].tolist(), tickets['flight_id'].tolist()))
+    assert len(pairs) == 5000  # no customer has 2 tickets of the same flight
+    sold = np.bincount(tickets['flight_id'] - 1, minlength=1000)
+    assert (flights['remaining_tickets'] == DbDataGen.remaining_tickets_per_flight - sold).all()
+
+
+def test_tickets_over_capacity():
+    gen = VectorDataGen(3)
+    flights = gen.flights(1, np.array([1]), 2, 10)
+    tickets = gen.tickets(1, np.arange(1, 301), flights, 1)
+    assert len(tickets['id']) <= 2 * DbDataGen.remaining_tickets_per_flight
+    assert (flights['remaining_tickets'] >= 0).all()
+
+
+def test_customers_unique_columns():
+    customers = VectorDataGen(1).customers(1, np.arange(10, 1010))
+    for name in ('phone_no', 'credit_card_no'):
+        assert len(set(customers[name].tolist())) == 1000
+    assert all(len(ccn) == 12 for ccn in customers['credit_card_no'].tolist())
+
+
+def test_tickets_of_every_flight():
+    gen = VectorDataGen(5)
+    flights = gen.flights(1, np.arange(1, 5), 5, 10)  # 20 flights, 20 tickets per customer
+    tickets = gen.tickets(1, np.arange(1, 101), flights, 20)
+    assert len(tickets['id']) == 2000
+    for customer_id in range(1, 101):
+        assert sorted(tickets['flight_id'][tickets['customer_id'] == customer_id].tolist()) == list(range(1, 21))
+
+
+def test_more_airlines_than_names():
+    with pytest.raises(ValueError):
+        VectorDataGen(1).airlines(1, np.arange(1, 4), ['a', 'b'], 10)
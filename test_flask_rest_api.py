@@ -0,0 +1,162 @@
+import pytest
+from base64 import b64encode
+import flask_rest_api
+from flask_rest_api import app
+from booking.BookingPublisher import BookingPublisher
+from data_access_objects.DbRepoPool import DbRepoPool
+from tables.Booking import Booking
+from custom_errors.NoAvailableConnectionError import NoAvailableConnectionError
+
+FLIGHT = {'origin_country_id': 1, 'destination_country_id': 2, 'departure_time': '2030-01-30T16:00:00',
+          'landing_time': '2030-01-30T20:00:00', 'remaining_tickets': 150}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(BookingPublisher, 'ASYNC', False)
+    with DbRepoPool.get_instance().connection() as repo:
+        repo.reset_test_db()
+    return app.test_client()
+
+
+def basic(username, password='123'):
+    return {'Authorization': 'Basic ' + b64encode(f'{username}:{password}'.encode()).decode()}
+
+
+def bearer(client, username, password='123'):
+    response = client.post('/login', json={'username': username, 'password': password})
+    assert response.status_code == 200
+    return {'Authorization': f'Bearer {response.get_json()["token"]}'}
+
+
+def test_rest_api_auth_failures(client):
+    response = client.get('/customer/tickets')
+    assert response.status_code == 401 and 'WWW-Authenticate' in response.headers
+    assert client.get('/customer/tickets', headers=basic('Elad', 'wrong')).status_code == 401
+    assert client.get('/customer/tickets', headers={'Authorization': 'Bearer not.valid'}).status_code == 401
+    assert client.post('/login', json={'username': 'Elad', 'password': 'wrong'}).status_code == 401
+    assert client.get('/airline/flights', headers=basic('Elad')).status_code == 403  # a customer on an airline route
+
+
+def test_rest_api_customer_tickets(client):
+    headers = bearer(client, 'Elad')
+    assert [ticket['flight_id'] for ticket in client.get('/customer/tickets', headers=headers).get_json()] == [1]
+    assert client.delete('/customer/tickets/1', headers=headers).status_code == 200
+    assert client.get('/customer/tickets', headers=headers).get_json() == []
+    response = client.post('/customer/tickets', json={'flight_id': 1}, headers=headers)
+    assert response.status_code == 201 and response.get_json()['customer_id'] == 1
+    assert client.post('/customer/tickets', json={'flight_id': 2}, headers=headers).status_code == 409  # sold out
+
+
+def test_rest_api_customer_ticket_queued(client, monkeypatch):
+    monkeypatch.setattr(BookingPublisher, 'ASYNC', True)
+    published = []
+    monkeypatch.setattr(BookingPublisher, 'request', lambda self, *message: published.append(message))
+    headers = basic('Uri')
+    response = client.post('/customer/tickets', json={'flight_id': 1}, headers=headers)
+    booking_id = response.get_json()['id']
+    assert response.status_code == 202 and response.headers['Location'] == f'/customer/bookings/{booking_id}'
+    assert published == [(booking_id, 2, 1)]
+    response = client.get(f'/customer/bookings/{booking_id}', headers=headers)
+    assert response.get_json()['status'] == 'pending' and 'Retry-After' in response.headers
+    assert client.get(f'/customer/bookings/{booking_id}', headers=basic('Elad')).status_code == 404  # another customer's
+    assert client.get('/customer/bookings/made-up', headers=headers).status_code == 404
+
+
+def test_rest_api_customer_ticket_not_queued(client, monkeypatch):
+    monkeypatch.setattr(BookingPublisher, 'ASYNC', True)
+    def request(self, *message):
+        raise ConnectionError('the broker is down')
+    monkeypatch.setattr(BookingPublisher, 'request', request)
+    assert client.post('/customer/tickets', json={'flight_id': 1}, headers=basic('Uri')).status_code == 500
+    with DbRepoPool.get_instance().connection() as repo:
+        assert [booking.status for booking in repo.get_all(Booking)] == ['failed']
+
+
+def test_rest_api_airline_flights(client):
+    headers = basic('Yoni')
+    response = client.post('/airline/flights', json=FLIGHT, headers=headers)
+    assert response.status_code == 201
+    flight_id = response.get_json()['id']
+    assert flight_id in [flight['id'] for flight in client.get('/airline/flights', headers=headers).get_json()]
+    assert client.put(f'/airline/flights/{flight_id}', json=dict(FLIGHT, remaining_tickets=120),
+                      headers=headers).status_code == 200
+    assert client.delete(f'/airline/flights/{flight_id}', headers=headers).status_code == 200
+    assert flight_id not in [flight['id'] for flight in client.get('/airline/flights', headers=headers).get_json()]
+
+
+def test_rest_api_admin_customers(client):
+    headers = bearer(client, 'Boris')
+    response = client.post('/admin/customers', headers=headers, json={
+        'user': {'username': 'Dana', 'password': '123', 'email': 'dana@gmail.com'},
+        'customer': {'first_name': 'Dana', 'last_name': 'Levi', 'address': 'Herzl 1', 'phone_no': '0501234567',
+                     'credit_card_no': '0002'}})
+    assert response.status_code == 201
+    customer_id = response.get_json()['id']
+    customers = client.get('/admin/customers', headers=headers).get_json()
+    assert customer_id in [customer['id'] for customer in customers]
+    assert 'credit_card_no' not in customers[0]
+    assert client.delete(f'/admin/customers/{customer_id}', headers=headers).status_code == 200
+
+
+def test_rest_api_deleted_customer_token(client):
+    headers = bearer(client, 'Uri')
+    assert client.delete('/admin/customers/2', headers=basic('Boris')).status_code == 200
+    assert client.post('/customer/tickets', json={'flight_id': 1}, headers=headers).status_code == 401
+
+
+@pytest.mark.parametrize('body, error', [({}, 'missing'), ({'flight_id': '1'}, 'must be a int'),
+                                         (b'not json', 'not valid JSON'), ([1], 'JSON object')])
+def test_rest_api_validation(client, body, error):
+    kwargs = {'data': body} if isinstance(body, bytes) else {'json': body}
+    response = client.post('/customer/tickets', headers=basic('Elad'), **kwargs)
+    assert response.status_code == 400 and error in response.get_json()['error']
+
+
+def test_rest_api_flight_times_validation(client):
+    flight = dict(FLIGHT, landing_time='2030-01-30T16:30:00')  # less than an hour
+    assert client.post('/airline/flights', json=flight, headers=basic('Yoni')).status_code == 400
+
+
+def test_rest_api_conditional_get(client):
+    response = client.get('/flights')
+    assert response.status_code == 200 and response.headers['Cache-Control'] == 'no-cache'
+    etag = response.headers['ETag']
+    response = client.get('/flights', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.data == b''
+    client.delete('/customer/tickets/1', headers=basic('Elad'))  # a write changes the etag
+    assert client.get('/flights', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_rest_api_flights_pages(client):
+    response = client.get('/flights?limit=1')
+    assert [flight['id'] for flight in response.get_json()] == [1]
+    assert response.headers['X-Next-After-Id'] == '1'
+    response = client.get('/flights?after_id=1')
+    assert [flight['id'] for flight in response.get_json()] == [2] and 'X-Next-After-Id' not in response.headers
+
+
+def test_rest_api_pool_exhausted(client, monkeypatch):
+    def connection(timeout=None):
+        raise NoAvailableConnectionError
+    monkeypatch.setattr(flask_rest_api.repool, 'connection', connection)
+    response = client.get('/customer/tickets', headers=basic('Elad'))
+    assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+
+
+@pytest.mark.parametrize('path', ['/flights', '/arrivals/4?country_id=99', '/departures/4?country_id=99'])
+def test_rest_api_public_routes_checkout_timeout(client, monkeypatch, path):
+    timeouts = []
+    def connection(timeout=None):
+        timeouts.append(timeout)
+        raise NoAvailableConnectionError
+    monkeypatch.setattr(flask_rest_api.repool, 'connection', connection)
+    assert client.get(path).status_code == 503 and timeouts == [flask_rest_api.CHECKOUT_TIMEOUT]
+
+
+def test_rest_api_stream_pool_exhausted(client, monkeypatch):
+    def get_connection(timeout=None):
+        raise NoAvailableConnectionError
+    monkeypatch.setattr(flask_rest_api.repool, 'get_connection', get_connection)
+    response = client.get('/flights?stream=1')
+    assert response.status_code == 503 and response.headers['Retry-After'] == '1'